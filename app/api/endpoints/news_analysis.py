@@ -1,49 +1,49 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.models.schemas import CompanyAnalysisResponse, NewsItemWithInsight, CategoryOutput, SentimentOutput
-from app.services.data_aggregator_service import DataAggregatorService
+from fastapi import APIRouter, HTTPException, Depends, Query
+from app.models.schemas import CompanyAnalysisResponse, NewsItemWithInsight, CategoryOutput, SentimentOutput, BatchAnalysisRequest
+from app.services.data_aggregator_service import DataAggregatorService, data_aggregator_service
 from app.services.ai_processing_service import AIProcessingService
+from app.core.streaming import StreamEvent, stream_events
+from app.core.inference_executor import InferenceError, inference_executor
+import asyncio
 import datetime
-from typing import List, Optional
+from typing import Any, AsyncIterator, List, Optional, Tuple
 
 router = APIRouter()
 
-# Simple dependency injection
+# Simple dependency injection; the data service shares one connection pool across requests
 def get_data_service():
-    return DataAggregatorService()
+    return data_aggregator_service
 
-def get_ai_service():
-    return AIProcessingService()
-
-@router.post("/analyze/{ticker}", response_model=CompanyAnalysisResponse, tags=["analysis"])
-async def analyze_company(
-    ticker: str,
-    data_service: DataAggregatorService = Depends(get_data_service),
-    ai_service: AIProcessingService = Depends(get_ai_service)
-):
-    # 1. Get Company Profile
-    profile = data_service.get_company_profile(ticker)
-
-    # If profile is None, it might be an invalid ticker or API error.
-    # For MVP, if we can't find the profile, we treat it as not found.
-    if not profile:
-        raise HTTPException(status_code=404, detail=f"Company profile not found for ticker {ticker}. Please check the ticker or API key configuration.")
+# Stateless; the sentiment model itself lives in the shared model registry
+ai_service = AIProcessingService()
 
-    # 2. Get Stock Data (Optional, don't fail if missing)
-    stock_data = data_service.get_stock_prices(ticker)
+def get_ai_service():
+    return ai_service
 
-    # 3. Get News
+def _news_window() -> Tuple[str, str]:
     end_date = datetime.date.today()
     start_date = end_date - datetime.timedelta(days=7) # Last 7 days
-    news = data_service.get_company_news(ticker, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+    return start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
 
-    # 4. Analyze News
-    analyzed_news: List[NewsItemWithInsight] = []
+async def _fetch_company_data(data_service: DataAggregatorService, ticker: str) -> Tuple[Any, Any, List[Any]]:
+    """Fetches Company Profile, Stock Data and News concurrently."""
+    start_date, end_date = _news_window()
+    profile, stock_data, news = await asyncio.gather(
+        data_service.get_company_profile(ticker),
+        data_service.get_stock_prices(ticker), # Optional, don't fail if missing
+        data_service.get_company_news(ticker, start_date, end_date)
+    )
+    return profile, stock_data, news
 
-    # Limit to top 10 news items to save processing time/resources in this demo
-    for article in news[:10]:
-        text_to_analyze = f"{article.headline}. {article.summary}"
+def _headline_text(article: Any) -> str:
+    return f"{article.headline}. {article.summary}"
+
+def _build_analysis(ticker: str, profile: Any, stock_data: Any, news: List[Any],
+                    sentiments: List[Optional[SentimentOutput]], ai_service: AIProcessingService) -> CompanyAnalysisResponse:
+    analyzed_news: List[NewsItemWithInsight] = []
+    for article, sentiment in zip(news, sentiments):
+        text_to_analyze = _headline_text(article)
 
-        sentiment = ai_service.get_sentiment(text_to_analyze)
         # Fallback if sentiment is None
         if not sentiment:
             sentiment = SentimentOutput(label="NEUTRAL", score=0.0)
@@ -66,3 +66,132 @@ async def analyze_company(
         news=analyzed_news,
         stock_data=stock_data
     )
+
+@router.post("/analyze/{ticker}", response_model=CompanyAnalysisResponse, tags=["analysis"])
+async def analyze_company(
+    ticker: str,
+    data_service: DataAggregatorService = Depends(get_data_service),
+    ai_service: AIProcessingService = Depends(get_ai_service)
+):
+    profile, stock_data, news = await _fetch_company_data(data_service, ticker)
+
+    # If profile is None, it might be an invalid ticker or API error.
+    # For MVP, if we can't find the profile, we treat it as not found.
+    if not profile:
+        raise HTTPException(status_code=404, detail=f"Company profile not found for ticker {ticker}. Please check the ticker or API key configuration.")
+
+    # Limit to top 10 news items to save processing time/resources in this demo; one batched sentiment pass
+    news = news[:10]
+    sentiments = await inference_executor.run(ai_service.get_sentiments, [_headline_text(article) for article in news])
+    return _build_analysis(ticker, profile, stock_data, news, sentiments, ai_service)
+
+@router.post("/analyze/{ticker}/stream", tags=["analysis"])
+async def analyze_company_stream(
+    ticker: str,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    data_service: DataAggregatorService = Depends(get_data_service),
+    ai_service: AIProcessingService = Depends(get_ai_service)
+):
+    """
+    Streaming variant of analyze_company. Each NewsItemWithInsight is sent as a
+    `news_item` event as soon as it is scored; the `analysis` event with profile
+    and stock data comes last (or an `error` event if the profile is missing).
+    Sent as NDJSON lines or, with ?format=sse, as Server-Sent Events.
+    """
+    start_date, end_date = _news_window()
+
+    async def events() -> AsyncIterator[StreamEvent]:
+        # Profile and prices load in the background while articles are streamed
+        profile_task = asyncio.create_task(data_service.get_company_profile(ticker))
+        stock_task = asyncio.create_task(data_service.get_stock_prices(ticker))
+        try:
+            news = (await data_service.get_company_news(ticker, start_date, end_date))[:10]
+            for article in news:
+                text_to_analyze = _headline_text(article)
+                try:
+                    sentiment = await inference_executor.run(ai_service.get_sentiment, text_to_analyze)
+                except InferenceError as e:
+                    # Headers are already sent, so overload and timeouts are reported in-band
+                    yield "error", {"ticker": ticker, "error": str(e)}
+                    return
+                yield "news_item", NewsItemWithInsight(
+                    **article.model_dump(),
+                    sentiment=sentiment or SentimentOutput(label="NEUTRAL", score=0.0),
+                    ai_category=ai_service.get_category(text_to_analyze)
+                )
+
+            profile, stock_data = await asyncio.gather(profile_task, stock_task)
+            if not profile:
+                yield "error", {"ticker": ticker, "error": f"Company profile not found for ticker {ticker}."}
+                return
+            yield "analysis", {
+                "ticker": ticker,
+                "profile": profile.model_dump(mode="json"),
+                "stock_data": stock_data.model_dump(mode="json") if stock_data else None,
+                "news_count": len(news)
+            }
+        finally:
+            profile_task.cancel()
+            stock_task.cancel()
+
+    return stream_events(events(), format)
+
+@router.post("/analyze", tags=["analysis"])
+async def analyze_companies(
+    request: BatchAnalysisRequest,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    data_service: DataAggregatorService = Depends(get_data_service),
+    ai_service: AIProcessingService = Depends(get_ai_service)
+):
+    """
+    Analyzes many tickers in one call. Data for all tickers is fetched concurrently;
+    whenever fetches complete, the headlines of every ticker completed so far go
+    through one batched sentiment pass, and their results are streamed back as they
+    are ready: an `analysis` event (a CompanyAnalysisResponse) per ticker, or an
+    `error` event ({"ticker": ..., "error": ...}) for tickers that could not be
+    analyzed. Same envelope as the single-ticker stream: NDJSON or, with ?format=sse, SSE.
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in request.tickers if t.strip()))
+
+    async def events() -> AsyncIterator[StreamEvent]:
+        tasks = {asyncio.create_task(_fetch_company_data(data_service, t)): t for t in tickers}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                ready: List[Tuple[str, Any, Any, List[Any]]] = []
+                for task in done:
+                    ticker = tasks[task]
+                    try:
+                        profile, stock_data, news = task.result()
+                    except Exception as e:
+                        yield "error", {"ticker": ticker, "error": str(e)}
+                        continue
+                    if not profile:
+                        yield "error", {"ticker": ticker, "error": "Company profile not found"}
+                        continue
+                    ready.append((ticker, profile, stock_data, news[:request.max_news_per_ticker]))
+
+                if not ready:
+                    continue
+
+                # One batched forward pass over every headline of this wave, off the event loop
+                texts = [_headline_text(article) for _, _, _, news in ready for article in news]
+                try:
+                    sentiments = await inference_executor.run(ai_service.get_sentiments, texts)
+                except InferenceError as e:
+                    for ticker, *_ in ready:
+                        yield "error", {"ticker": ticker, "error": str(e)}
+                    continue
+
+                offset = 0
+                for ticker, profile, stock_data, news in ready:
+                    ticker_sentiments = sentiments[offset:offset + len(news)]
+                    offset += len(news)
+                    yield "analysis", _build_analysis(ticker, profile, stock_data, news, ticker_sentiments, ai_service)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    return stream_events(events(), format)
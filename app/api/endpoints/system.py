@@ -1,6 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from app.services.system_monitor import system_monitor
 from app.core.async_utils import task_manager
+from app.core.event_bus import event_bus
+from app.core.inference_cache import inference_cache
+from app.core.inference_executor import inference_executor
+from app.core.micro_batcher import get_batcher_stats
+from app.core.model_registry import model_registry
+from app.core.provider_guard import provider_guards
+from app.core.ttl_cache import get_cache_stats
 
 router = APIRouter()
 
@@ -11,3 +18,41 @@ async def get_system_status():
 @router.get("/tasks")
 async def get_tasks():
     return task_manager.get_all_tasks()
+
+@router.get("/task-pools")
+async def get_task_pools():
+    return task_manager.get_pool_stats()
+
+@router.post("/tasks/{task_id}/cancel")
+async def cancel_task(task_id: str):
+    if not task_manager.cancel(task_id):
+        raise HTTPException(status_code=404, detail=f"No active task {task_id}")
+    return {"id": task_id, "cancelled": True}
+
+@router.get("/inference-cache")
+async def get_inference_cache_stats():
+    return inference_cache.get_stats()
+
+@router.get("/inference")
+async def get_inference_executor_stats():
+    return inference_executor.get_stats()
+
+@router.get("/batchers")
+async def get_batchers():
+    return get_batcher_stats()
+
+@router.get("/event-bus")
+async def get_event_bus_stats():
+    return event_bus.get_stats()
+
+@router.get("/models")
+async def get_models():
+    return model_registry.get_stats()
+
+@router.get("/providers")
+async def get_provider_stats():
+    return provider_guards.get_stats()
+
+@router.get("/caches")
+async def get_caches():
+    return get_cache_stats()
@@ -1,59 +1,190 @@
 import asyncio
-from typing import Dict, Any, List
+import heapq
+import itertools
+from collections import deque
+from typing import Any, Coroutine, Deque, Dict, List, Optional, Set, Tuple
 import uuid
 from datetime import datetime
 import logging
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+class TaskPool:
+    """A named group of tasks with a concurrency limit (0 = unlimited) and a priority queue for the rest."""
+
+    def __init__(self, name: str, max_concurrency: int = 0):
+        self.name = name
+        self.max_concurrency = max(0, max_concurrency)
+        self.running = 0
+        self.queued = 0
+        # (priority, sequence, task_id); entries of cancelled tasks are skipped when popped
+        self._heap: List[Tuple[int, int, str]] = []
+
+    def has_capacity(self) -> bool:
+        return not self.max_concurrency or self.running < self.max_concurrency
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "max_concurrency": self.max_concurrency, "running": self.running, "queued": self.queued}
+
 class AsyncTaskManager:
-    def __init__(self):
-        self.tasks: Dict[str, asyncio.Task] = {}
-        self.task_metadata: Dict[str, Dict[str, Any]] = {}
+    """
+    Runs named background coroutines in pools.
 
-    async def start_task(self, name: str, coro) -> str:
+    A task starts right away if its pool has a free slot, otherwise it waits in the
+    pool's queue; queued tasks start in priority order (lower number first, FIFO among
+    equals) as slots free up. Pool limits are meant for jobs that finish: a task that
+    runs until stopped (`long_running`) is refused rather than queued behind a full
+    pool, where it would wait forever. Active (running or queued) tasks are indexed by id and
+    by name, so lookups, cancellation and counts don't depend on how many tasks have
+    ever run; finished tasks are kept in a ring buffer of `history_size` entries.
+    """
+
+    def __init__(self, history_size: int = 1000, pools: Optional[Dict[str, int]] = None):
+        self.tasks: Dict[str, asyncio.Task] = {} # Running tasks
+        self._active: Dict[str, Dict[str, Any]] = {} # Metadata of running and queued tasks
+        self._by_name: Dict[str, Set[str]] = {}
+        self._queued: Dict[str, Coroutine] = {}
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=max(1, history_size))
+        self.pools: Dict[str, TaskPool] = {name: TaskPool(name, limit) for name, limit in (pools or {}).items()}
+        self._sequence = itertools.count()
+
+    def _get_pool(self, name: str) -> TaskPool:
+        if name not in self.pools:
+            self.pools[name] = TaskPool(name)
+            logger.info(f"Created task pool {name} (no concurrency limit)")
+        return self.pools[name]
+
+    async def start_task(self, name: str, coro, pool: str = "default", priority: int = 0,
+                         long_running: bool = False) -> str:
+        """Starts or queues `coro`; returns the task id, or "" if it could not be started."""
         task_id = str(uuid.uuid4())
         try:
-            task = asyncio.create_task(coro)
-            self.tasks[task_id] = task
-            self.task_metadata[task_id] = {
+            task_pool = self._get_pool(pool)
+            if long_running and not task_pool.has_capacity():
+                coro.close()
+                logger.error(f"Cannot start long-running task {name}: pool {pool} is full "
+                             f"({task_pool.running}/{task_pool.max_concurrency}) and its tasks never finish.")
+                return ""
+            self._active[task_id] = {
+                "id": task_id,
                 "name": name,
-                "start_time": datetime.now().isoformat(),
-                "status": "running"
+                "pool": pool,
+                "priority": priority,
+                "submit_time": datetime.now().isoformat(),
+                "status": "queued"
             }
-            task.add_done_callback(lambda t: self._cleanup_task(task_id, t))
-            logger.info(f"Started task {name} ({task_id})")
+            self._by_name.setdefault(name, set()).add(task_id)
+            if task_pool.has_capacity():
+                self._launch(task_id, coro, task_pool)
+                logger.info(f"Started task {name} ({task_id})")
+            else:
+                self._queued[task_id] = coro
+                heapq.heappush(task_pool._heap, (priority, next(self._sequence), task_id))
+                task_pool.queued += 1
+                logger.info(f"Queued task {name} ({task_id}) in pool {pool} ({task_pool.running} running)")
             return task_id
         except Exception as e:
             logger.error(f"Failed to start task {name}: {e}")
+            self._forget(task_id)
             return ""
 
+    def _launch(self, task_id: str, coro, task_pool: TaskPool):
+        metadata = self._active[task_id]
+        task = asyncio.create_task(coro, name=metadata["name"])
+        self.tasks[task_id] = task
+        metadata["status"] = "running"
+        metadata["start_time"] = datetime.now().isoformat()
+        task_pool.running += 1
+        task.add_done_callback(lambda t: self._cleanup_task(task_id, t))
+
+    def _forget(self, task_id: str) -> Optional[Dict[str, Any]]:
+        metadata = self._active.pop(task_id, None)
+        if metadata is not None:
+            names = self._by_name.get(metadata["name"])
+            if names is not None:
+                names.discard(task_id)
+                if not names:
+                    del self._by_name[metadata["name"]]
+        return metadata
+
+    def _finish(self, task_id: str, status: str, error: Optional[str] = None):
+        metadata = self._forget(task_id)
+        if metadata is None:
+            return
+        metadata["status"] = status
+        metadata["end_time"] = datetime.now().isoformat()
+        if error is not None:
+            metadata["error"] = error
+        self.history.append(metadata)
+
     def _cleanup_task(self, task_id: str, task: asyncio.Task):
-        if task_id in self.task_metadata:
-            self.task_metadata[task_id]["status"] = "completed"
-            self.task_metadata[task_id]["end_time"] = datetime.now().isoformat()
-
-            # Check for exceptions
-            try:
-                task.result()
-            except Exception as e:
-                self.task_metadata[task_id]["status"] = "failed"
-                self.task_metadata[task_id]["error"] = str(e)
-                logger.error(f"Task {task_id} failed: {e}")
-
-            # Remove from active tasks map
-            if task_id in self.tasks:
-                del self.tasks[task_id]
+        self.tasks.pop(task_id, None)
+        pool = self._active.get(task_id, {}).get("pool")
+
+        if task.cancelled():
+            self._finish(task_id, "cancelled")
+        elif task.exception() is not None:
+            self._finish(task_id, "failed", str(task.exception()))
+            logger.error(f"Task {task_id} failed: {task.exception()}")
+        else:
+            self._finish(task_id, "completed")
+
+        if pool is not None:
+            task_pool = self.pools[pool]
+            task_pool.running -= 1
+            self._start_queued(task_pool)
+
+    def _start_queued(self, task_pool: TaskPool):
+        while task_pool.has_capacity() and task_pool._heap:
+            _, _, task_id = heapq.heappop(task_pool._heap)
+            coro = self._queued.pop(task_id, None)
+            if coro is None:
+                continue # Cancelled while queued
+            task_pool.queued -= 1
+            self._launch(task_id, coro, task_pool)
+            logger.info(f"Started queued task {self._active[task_id]['name']} ({task_id})")
+
+    def cancel(self, task_id: str) -> bool:
+        """Cancels a running or queued task. Returns False if no such task is active."""
+        coro = self._queued.pop(task_id, None)
+        if coro is not None:
+            coro.close() # Never started, so there is nothing to unwind
+            self.pools[self._active[task_id]["pool"]].queued -= 1
+            self._finish(task_id, "cancelled")
+            return True
+        task = self.tasks.get(task_id)
+        if task is not None and not task.done():
+            task.cancel() # Recorded as cancelled by the done callback
+            return True
+        return False
+
+    def cancel_by_name(self, name: str) -> int:
+        """Cancels every active task called `name`; returns how many were cancelled."""
+        return sum(self.cancel(task_id) for task_id in list(self._by_name.get(name, ())))
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        metadata = self._active.get(task_id)
+        if metadata is None:
+            metadata = next((m for m in reversed(self.history) if m["id"] == task_id), None)
+        return dict(metadata) if metadata is not None else None
+
+    def active_count(self) -> int:
+        return len(self.tasks)
+
+    def queued_count(self) -> int:
+        return len(self._queued)
 
     def get_active_tasks(self) -> List[Dict[str, Any]]:
-        return [
-            {"id": k, **v}
-            for k, v in self.task_metadata.items()
-            if v["status"] == "running"
-        ]
+        return [dict(metadata) for metadata in self._active.values() if metadata["status"] == "running"]
 
     def get_all_tasks(self) -> List[Dict[str, Any]]:
-        return [{"id": k, **v} for k, v in self.task_metadata.items()]
+        """Active tasks, then the most recent finished ones (newest last)."""
+        return [dict(metadata) for metadata in self._active.values()] + [dict(metadata) for metadata in self.history]
+
+    def get_pool_stats(self) -> List[Dict[str, Any]]:
+        return [pool.get_stats() for pool in self.pools.values()]
 
 # Global instance
-task_manager = AsyncTaskManager()
+task_manager = AsyncTaskManager(history_size=settings.TASK_HISTORY_SIZE, pools=settings.TASK_POOLS)
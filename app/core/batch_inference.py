@@ -0,0 +1,59 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+class BatchedSequenceClassifier:
+    """
+    Runs a Hugging Face sequence classification model over many texts at once.
+
+    All texts are tokenized in one call, sorted by token length and split into
+    buckets of at most `max_batch_size`, so each forward pass only pads up to the
+    longest text in its own bucket. Results are returned in input order.
+    """
+
+    def __init__(self, tokenizer: Any, model: Any, max_batch_size: int = 32,
+                 num_threads: Optional[int] = None, max_length: int = 512):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_length = max_length
+        self.num_threads = num_threads
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+            logger.info(f"Batched inference using {num_threads} torch threads.")
+
+        if hasattr(self.model, "eval"):
+            self.model.eval()
+
+    def _length_buckets(self, lengths: List[int]) -> List[List[int]]:
+        """Groups input indices into batches of similar token length."""
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        return [order[i:i + self.max_batch_size] for i in range(0, len(order), self.max_batch_size)]
+
+    def predict_proba(self, texts: List[str]) -> List[List[float]]:
+        """
+        Returns the softmax class probabilities for each text, in input order.
+        """
+        if not texts:
+            return []
+
+        encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        lengths = [len(ids) for ids in encodings["input_ids"]]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+
+        with torch.inference_mode():
+            for bucket in self._length_buckets(lengths):
+                features: Dict[str, List[Any]] = {
+                    key: [values[i] for i in bucket] for key, values in encodings.items()
+                }
+                batch = self.tokenizer.pad(features, padding="longest", return_tensors="pt")
+                logits = self.model(**batch).logits
+                probs = torch.softmax(logits, dim=-1).tolist()
+                for index, row in zip(bucket, probs):
+                    results[index] = row
+
+        return results
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Any, Dict, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "NewsBot Nexus"
@@ -12,6 +12,72 @@ class Settings(BaseSettings):
 
     # HuggingFace
     HF_TOKEN: Optional[str] = None
+    MODEL_WARMUP: bool = False # Load all registered models at startup instead of on first use
+    INFERENCE_BACKEND: str = "pytorch" # "pytorch" (fp32), "quantized" (dynamic int8) or "onnx" (needs optimum[onnxruntime]); CPU only
+
+    # Inference executor: model calls from routes run on this many worker threads, with at most
+    # INFERENCE_MAX_QUEUE more waiting (further requests get a 503) and a per-request timeout (504)
+    INFERENCE_MAX_WORKERS: int = 8 # Mostly waiting on the micro-batchers below, which run the models
+    INFERENCE_MAX_QUEUE: int = 32
+    INFERENCE_TIMEOUT_SECONDS: float = 30.0
+    # Threads for the backend's concurrent model stages (sentiment, NER, summarization) of each
+    # inference job; None means one per stage of every job the executor can run at once (3 x INFERENCE_MAX_WORKERS)
+    INFERENCE_STAGE_WORKERS: Optional[int] = None
+
+    # Micro-batching: concurrent single-text model calls are merged into one forward pass of up to
+    # MICRO_BATCH_MAX_SIZE texts, waiting at most MICRO_BATCH_WAIT_MS (per-batcher overrides by the names
+    # listed at /api/system/batchers, e.g. {"summarization:t5-small": 20})
+    MICRO_BATCH_MAX_SIZE: int = 32
+    MICRO_BATCH_WAIT_MS: float = 5.0
+    MICRO_BATCH_WINDOWS_MS: Dict[str, float] = {}
+
+    # Event bus: each subscriber gets a queue of this many events; when it is full, "drop_oldest",
+    # "drop_newest", "block" (publisher waits) or "coalesce" (latest per key); subscribers can override both
+    EVENT_BUS_MAX_QUEUE: int = 1000
+    EVENT_BUS_OVERFLOW: str = "drop_oldest"
+    # Per-topic delivery for state topics: {"latest_only": True} means handlers see only the newest event.
+    # Batching (handlers get lists) is opted into per subscription: subscribe(..., batch_window_ms=...)
+    EVENT_BUS_TOPICS: Dict[str, Dict[str, Any]] = {
+        "fl_model_updated": {"latest_only": True},
+        "evolution_update": {"latest_only": True}
+    }
+    # Sharing events between uvicorn workers: "local" (this process only), "unix" (datagram sockets
+    # in EVENT_BUS_SOCKET_DIR, one host) or "redis" (pub/sub on EVENT_BUS_CHANNEL; needs the redis package)
+    EVENT_BUS_TRANSPORT: str = "local"
+    EVENT_BUS_SOCKET_DIR: str = "/tmp/newsbot-events"
+    EVENT_BUS_REDIS_URL: Optional[str] = None
+    EVENT_BUS_CHANNEL: str = "newsbot:events"
+    # Durable event log (disabled when EVENT_LOG_DIR is empty): segment files of EVENT_LOG_SEGMENT_BYTES,
+    # whole segments removed after EVENT_LOG_RETENTION_HOURS or beyond EVENT_LOG_RETENTION_BYTES in total.
+    # One worker writes it; use a cross-process transport so it sees every worker's events.
+    EVENT_LOG_DIR: Optional[str] = None
+    EVENT_LOG_SEGMENT_BYTES: int = 64 * 1024 * 1024
+    EVENT_LOG_RETENTION_HOURS: float = 72.0
+    EVENT_LOG_RETENTION_BYTES: int = 1024 * 1024 * 1024
+    EVENT_LOG_FSYNC: bool = False # fsync every record (survives power loss, much slower)
+
+    # Background tasks: concurrency limit per pool (0 = unlimited; pools not listed are unlimited) and
+    # how many finished tasks /api/system/tasks remembers. Limits only suit jobs that finish: agent
+    # loops run until stopped, so a limit on "agents" caps how many agents can start at all.
+    TASK_POOLS: Dict[str, int] = {"default": 0, "agents": 0, "maintenance": 2}
+    TASK_HISTORY_SIZE: int = 1000
+
+    # Outbound data providers: per-minute rate overrides (e.g. {"alpha_vantage": 5}) and circuit breaker
+    PROVIDER_RATE_LIMITS: Dict[str, float] = {}
+    PROVIDER_FAILURE_THRESHOLD: int = 5
+    PROVIDER_COOLDOWN_SECONDS: float = 60.0
+    PROVIDER_MAX_RETRIES: int = 2
+
+    # Data service caches: freshness per data type (prices stay fresh until the next market close)
+    # and how long an expired entry is still served while it is refreshed in the background
+    CACHE_PROFILE_TTL_SECONDS: float = 6 * 3600
+    CACHE_NEWS_TTL_SECONDS: float = 5 * 60
+    CACHE_STALE_SECONDS: float = 5 * 60
+    CACHE_MAX_ITEMS: int = 512
+
+    # Inference result cache (empty path keeps the cache in memory only)
+    INFERENCE_CACHE_PATH: Optional[str] = ".cache/inference_cache.sqlite"
+    INFERENCE_CACHE_MAX_ITEMS: int = 10000
 
     model_config = SettingsConfigDict(env_file=".env", env_ignore_empty=True)
 
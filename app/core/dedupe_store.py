@@ -0,0 +1,179 @@
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for `capacity` items at `false_positive_rate`."""
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = max(1, capacity)
+        self.false_positive_rate = false_positive_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> List[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+class RotatingDedupeStore:
+    """
+    Time-windowed "have we seen this key?" store with bounded memory.
+
+    Keys live in one Bloom filter per time slot of `ttl_seconds / num_slots`; slots
+    expire whole, and one slot beyond `num_slots` is kept so a key added late in its
+    slot is still remembered a full `ttl_seconds` later. A key is therefore forgotten
+    between `ttl_seconds` and one slot length after that. Every add is appended to an
+    optional on-disk log, which is replayed on startup (so restarts do not
+    forget recent keys) and compacted as slots expire.
+
+    False positives (a new key reported as seen) happen at roughly
+    `(num_slots + 1) * false_positive_rate`; false negatives do not happen within the TTL.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 24 * 3600,
+                 capacity_per_slot: int = 10000, false_positive_rate: float = 0.001,
+                 num_slots: int = 4):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.capacity_per_slot = capacity_per_slot
+        self.false_positive_rate = false_positive_rate
+        self.num_slots = max(1, num_slots)
+        self.slot_seconds = ttl_seconds / self.num_slots
+        self._slots: Dict[int, BloomFilter] = {}
+        self._lock = threading.Lock()
+        self._last_compacted_slot: Optional[int] = None
+        self._load()
+
+    def _slot_for(self, timestamp: float) -> int:
+        return int(timestamp // self.slot_seconds)
+
+    def _oldest_live_slot(self, now: float) -> int:
+        # num_slots + 1 live slots: the oldest one still holds keys added less than ttl_seconds ago
+        return self._slot_for(now) - self.num_slots
+
+    def _filter_for(self, slot: int) -> BloomFilter:
+        if slot not in self._slots:
+            self._slots[slot] = BloomFilter(self.capacity_per_slot, self.false_positive_rate)
+        return self._slots[slot]
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        cutoff = self._oldest_live_slot(time.time()) * self.slot_seconds
+        loaded = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 2:
+                        continue
+                    try:
+                        timestamp = float(parts[0])
+                    except ValueError:
+                        continue
+                    if timestamp >= cutoff:
+                        self._filter_for(self._slot_for(timestamp)).add(parts[1])
+                        loaded += 1
+            logger.info(f"Dedupe store replayed {loaded} keys from {self.path}.")
+        except OSError as e:
+            logger.error(f"Could not read dedupe log {self.path}: {e}")
+
+    def _append_log(self, timestamp: float, digest: str):
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(f"{timestamp:.3f}\t{digest}\n")
+        except OSError as e:
+            logger.error(f"Could not append to dedupe log {self.path}: {e}")
+
+    def _compact_log(self, cutoff: float):
+        if not self.path or not os.path.exists(self.path):
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(self.path, "r", encoding="utf-8") as src, open(tmp_path, "w", encoding="utf-8") as dst:
+                for line in src:
+                    try:
+                        if float(line.split("\t", 1)[0]) >= cutoff:
+                            dst.write(line)
+                    except ValueError:
+                        continue
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Could not compact dedupe log {self.path}: {e}")
+
+    def expire(self, now: Optional[float] = None):
+        """Drops slots older than the TTL and compacts the on-disk log (at most once per slot)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            oldest = self._oldest_live_slot(now)
+            for slot in [s for s in self._slots if s < oldest]:
+                del self._slots[slot]
+            if self._last_compacted_slot != oldest:
+                self._compact_log(oldest * self.slot_seconds)
+                self._last_compacted_slot = oldest
+
+    def __contains__(self, key: str) -> bool:
+        digest = self._digest(key)
+        oldest = self._oldest_live_slot(time.time())
+        with self._lock:
+            return any(digest in bloom for slot, bloom in self._slots.items() if slot >= oldest)
+
+    def add(self, key: str, now: Optional[float] = None) -> bool:
+        """Adds a key. Returns True if it was not already present within the TTL."""
+        now = time.time() if now is None else now
+        digest = self._digest(key)
+        oldest = self._oldest_live_slot(now)
+        with self._lock:
+            if any(digest in bloom for slot, bloom in self._slots.items() if slot >= oldest):
+                return False
+            self._filter_for(self._slot_for(now)).add(digest)
+            self._append_log(now, digest)
+        if len(self._slots) > self.num_slots + 1:
+            self.expire(now)
+        return True
+
+    def memory_footprint(self) -> int:
+        """Bytes held by the Bloom filter bit arrays."""
+        return sum(bloom.memory_bytes for bloom in self._slots.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "slots": len(self._slots),
+            "keys": sum(bloom.count for bloom in self._slots.values()),
+            "memory_bytes": self.memory_footprint(),
+            "ttl_seconds": self.ttl_seconds,
+            "false_positive_rate": self.false_positive_rate,
+            "path": self.path
+        }
@@ -1,28 +1,361 @@
 import asyncio
-from typing import Callable, List, Dict, Any, Awaitable
+import inspect
+import time
+from collections import deque
+from typing import Callable, List, Dict, Any, Awaitable, Deque, Hashable, Iterable, Optional, Union
 import logging
 
+from app.core.config import settings
+from app.core.event_log import EventLog, create_event_log
+from app.core.event_transport import EventTransport, create_transport
+from app.core.micro_batcher import Histogram, QUEUE_WAIT_MS_BUCKETS
+
 logger = logging.getLogger(__name__)
 
+# What `publish` does when a subscriber's queue is full:
+#   block       - wait until the subscriber has room (backpressure on the publisher)
+#   drop_oldest - evict the oldest queued event
+#   drop_newest - discard the event being published
+#   coalesce    - keep only the latest queued event per key (see `coalesce_key`); evicts the oldest when still full
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest", "coalesce")
+
+Handler = Callable[[Any], Awaitable[None]] # Called with one event dict, or a list of them for batched subscriptions
+
+CoalesceKey = Union[str, Callable[[Dict[str, Any]], Hashable], None]
+
+class Subscription:
+    """
+    One handler's subscription to an event type: a bounded queue drained by its own
+    worker task, so a slow handler only ever delays (or drops) its own events.
+
+    With `batch_window_ms` the worker waits that long after the first queued event and
+    then calls the handler once with the list of queued events (at most `max_batch`).
+    With `latest_only` a queued event is replaced by the next one, so the handler only
+    sees the latest state (the single-key case of `coalesce_key`).
+    """
+
+    def __init__(self, event_type: str, handler: Handler, max_queue: int = 1000, overflow: str = "drop_oldest",
+                 coalesce_key: CoalesceKey = None, name: Optional[str] = None, batch_window_ms: float = 0,
+                 max_batch: Optional[int] = None, latest_only: bool = False):
+        if latest_only:
+            coalesce_key = lambda data: event_type
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Expected one of {OVERFLOW_POLICIES}.")
+        if overflow == "coalesce" and coalesce_key is None:
+            raise ValueError("The 'coalesce' overflow policy needs a coalesce_key.")
+        self.event_type = event_type
+        self.handler = handler
+        self.name = name or getattr(handler, "__qualname__", repr(handler))
+        self.max_queue = max(1, max_queue)
+        self.overflow = overflow
+        self.batch_window_ms = max(0.0, batch_window_ms or 0)
+        self.max_batch = max(1, max_batch) if max_batch else None
+        self.latest_only = latest_only
+        self._key_fn = (lambda data: data.get(coalesce_key)) if isinstance(coalesce_key, str) else coalesce_key
+        # Entries are [key, data, enqueued_at]; coalescing replaces `data` in place
+        self._pending: Deque[List[Any]] = deque()
+        self._by_key: Dict[Hashable, List[Any]] = {}
+        self._worker: Optional[asyncio.Task] = None
+        self._not_empty: Optional[asyncio.Event] = None
+        self._not_full: Optional[asyncio.Event] = None
+        self._held: Optional[Deque[Dict[str, Any]]] = None # Live events arriving while replaying the log
+        self._replay: Optional[asyncio.Task] = None
+        self.lag_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self.metrics: Dict[str, int] = {
+            "published": 0, "delivered": 0, "dropped": 0, "coalesced": 0, "failed": 0, "handler_calls": 0
+        }
+
+    def _ensure_worker(self):
+        if self._worker is not None and not self._worker.done() and self._worker.get_loop() is asyncio.get_running_loop():
+            return
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        if self._pending:
+            self._not_empty.set()
+        self._worker = asyncio.create_task(self._run(), name=f"event-subscriber-{self.event_type}-{self.name}")
+
+    def _evict_oldest(self):
+        key = self._pending.popleft()[0]
+        if key is not None:
+            self._by_key.pop(key, None)
+        self.metrics["dropped"] += 1
+
+    async def put(self, data: Dict[str, Any]) -> bool:
+        """Queues an event for the handler. Returns False if the event was dropped."""
+        self.metrics["published"] += 1
+        if self._held is not None:
+            self._held.append(data)
+            return True
+        return await self._enqueue(data)
+
+    def start_replay(self, records: Iterable[Dict[str, Any]]):
+        """
+        Feeds logged events to the handler before live ones. Live events arriving in the
+        meantime are all held (not bounded by max_queue, so none are lost at the switch)
+        and queued after the replay; the overflow policy applies again once they are in.
+        """
+        self._held = deque()
+        self._replay = asyncio.create_task(self._run_replay(records), name=f"event-replay-{self.event_type}-{self.name}")
+
+    async def _run_replay(self, records: Iterable[Dict[str, Any]]):
+        try:
+            for count, data in enumerate(records, 1):
+                self.metrics["published"] += 1
+                # Replay waits for room instead of dropping, whatever the overflow policy
+                await self._enqueue(data, block=True)
+                if count % 1000 == 0:
+                    await asyncio.sleep(0) # Reading the log doesn't yield on its own
+        except asyncio.CancelledError:
+            self._held = None
+            raise
+        except Exception as e:
+            logger.error(f"Replay for {self.event_type} in {self.name} failed: {e}")
+        while self._held:
+            await self._enqueue(self._held.popleft(), block=True)
+        self._held = None
+
+    async def _enqueue(self, data: Dict[str, Any], block: bool = False) -> bool:
+        self._ensure_worker()
+
+        key = None
+        if self._key_fn is not None:
+            key = self._key_fn(data)
+            entry = self._by_key.get(key)
+            if entry is not None:
+                entry[1] = data # Latest value wins; keeps its place (and age) in the queue
+                self.metrics["coalesced"] += 1
+                return True
+
+        if block or self.overflow == "block":
+            while len(self._pending) >= self.max_queue:
+                self._not_full.clear()
+                await self._not_full.wait()
+        elif len(self._pending) >= self.max_queue:
+            if self.overflow == "drop_newest":
+                self.metrics["dropped"] += 1
+                return False
+            self._evict_oldest()
+
+        entry = [key, data, time.monotonic()]
+        self._pending.append(entry)
+        if key is not None:
+            self._by_key[key] = entry
+        self._not_empty.set()
+        return True
+
+    async def _run(self):
+        while True:
+            while not self._pending:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+            if self.batch_window_ms:
+                # Let the window fill up (coalescing keeps working meanwhile), then take it in one call
+                await asyncio.sleep(self.batch_window_ms / 1000.0)
+                count = min(len(self._pending), self.max_batch or len(self._pending))
+            else:
+                count = 1
+            entries = [self._pending.popleft() for _ in range(count)]
+            for key, _, _ in entries:
+                if key is not None:
+                    self._by_key.pop(key, None)
+            self._not_full.set()
+
+            now = time.monotonic()
+            for _, _, enqueued_at in entries:
+                self.lag_ms.observe((now - enqueued_at) * 1000)
+            payload = [data for _, data, _ in entries] if self.batch_window_ms else entries[0][1]
+            self.metrics["handler_calls"] += 1
+            try:
+                result = self.handler(payload)
+                if inspect.isawaitable(result):
+                    await result
+                self.metrics["delivered"] += count
+            except Exception as e:
+                self.metrics["failed"] += count
+                logger.error(f"Error handling event {self.event_type} in {self.name}: {e}")
+
+    async def close(self):
+        if self._replay is not None and not self._replay.done():
+            self._replay.cancel()
+        worker, self._worker = self._worker, None
+        if worker is not None and not worker.done():
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "event_type": self.event_type,
+            "name": self.name,
+            "overflow": self.overflow,
+            "max_queue": self.max_queue,
+            "batch_window_ms": self.batch_window_ms,
+            "latest_only": self.latest_only,
+            "queue_depth": len(self._pending),
+            **self.metrics,
+            "lag_ms": self.lag_ms.get_stats()
+        }
+
 class EventBus:
-    def __init__(self):
-        self.subscribers: Dict[str, List[Callable[[Dict[str, Any]], Awaitable[None]]]] = {}
+    """
+    Publish/subscribe between agents, services and plugins.
+
+    Every subscription has its own bounded queue and worker task (see Subscription),
+    so `publish` only enqueues: memory stays bounded under bursts and a slow handler
+    cannot hold up the others. With the "block" policy `publish` waits for room instead.
+
+    State topics can be made latest-only once (`configure_topic`, or EVENT_BUS_TOPICS in
+    settings) for every subscriber of the topic; publishers don't change. Batching changes
+    what the handler is called with, so it is only ever asked for by the subscriber
+    itself (`subscribe(..., batch_window_ms=...)`).
+
+    With a cross-process `transport` (see app/core/event_transport.py), events are also
+    sent to the buses of the other API workers, and theirs are delivered here, so a
+    subscriber sees every event whichever worker published it.
+
+    With an `event_log` every event delivered here is also appended to a durable log
+    (unless the log is open read-only because another worker writes it), and `resume`
+    subscribes a handler starting from a past offset or timestamp.
+    """
+
+    def __init__(self, max_queue: int = 1000, overflow: str = "drop_oldest",
+                 topic_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 transport: Optional[EventTransport] = None, event_log: Optional[EventLog] = None):
+        self.subscribers: Dict[str, List[Subscription]] = {}
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.transport = transport or EventTransport()
+        self.event_log = event_log
+        self._started = False
+        self.event_counts: Dict[str, int] = {} # Every event delivered here, local or from other workers
+        self.topic_options: Dict[str, Dict[str, Any]] = {}
+        for event_type, options in (topic_options or {}).items():
+            unsupported = set(options) - {"latest_only"}
+            if unsupported:
+                logger.warning(f"Ignoring topic options {sorted(unsupported)} for {event_type}: only 'latest_only' "
+                               f"can be set per topic; pass the others to subscribe().")
+            self.configure_topic(event_type, latest_only=options.get("latest_only"))
 
-    def subscribe(self, event_type: str, handler: Callable[[Dict[str, Any]], Awaitable[None]]):
+    def configure_topic(self, event_type: str, latest_only: Optional[bool] = None):
+        """
+        Default delivery for subscribers of `event_type` (explicit `subscribe` arguments win).
+        Only `latest_only` can be set here: it thins out events but handlers still get one event.
+        """
+        self.topic_options[event_type] = {"latest_only": latest_only} if latest_only is not None else {}
+
+    def subscribe(self, event_type: str, handler: Handler, max_queue: Optional[int] = None,
+                  overflow: Optional[str] = None, coalesce_key: CoalesceKey = None, name: Optional[str] = None,
+                  batch_window_ms: Optional[float] = None, max_batch: Optional[int] = None,
+                  latest_only: Optional[bool] = None) -> Subscription:
+        """
+        Registers `handler` for `event_type`. `coalesce_key` (an event field name or a function
+        of the event) keeps only the latest queued event per key, whatever the overflow policy;
+        `latest_only` keeps only the latest event. With a `batch_window_ms` the handler is
+        called with a list of events instead of one event.
+        """
+        options = dict(self.topic_options.get(event_type, {}))
+        explicit = {
+            "coalesce_key": coalesce_key,
+            "batch_window_ms": batch_window_ms,
+            "max_batch": max_batch,
+            "latest_only": latest_only
+        }
+        options.update({option: value for option, value in explicit.items() if value is not None})
+        coalescing = options.get("coalesce_key") is not None or options.get("latest_only")
+        subscription = Subscription(
+            event_type,
+            handler,
+            max_queue=max_queue or self.max_queue,
+            overflow=overflow or ("coalesce" if coalescing else self.overflow),
+            name=name,
+            **options
+        )
         if event_type not in self.subscribers:
             self.subscribers[event_type] = []
-        self.subscribers[event_type].append(handler)
+        self.subscribers[event_type].append(subscription)
         logger.info(f"Subscribed to {event_type}")
+        return subscription
+
+    async def resume(self, event_type: str, handler: Handler, from_offset: Optional[int] = None,
+                     since: Optional[float] = None, **options: Any) -> Subscription:
+        """
+        Like `subscribe`, but the handler first gets the logged `event_type` events from
+        `from_offset` (inclusive) or from Unix time `since`, then live ones, with none
+        missed or repeated in between. Without an event log this is a plain subscribe.
+
+        On a worker that only reads the log (another worker writes it), an event that is
+        still in flight between the workers at the moment of resuming may be seen twice.
+        """
+        subscription = self.subscribe(event_type, handler, **options)
+        if self.event_log is not None and (from_offset is not None or since is not None):
+            # Everything below this offset comes from the log; later events arrive live
+            until_offset = self.event_log.end_offset()
+            records = self.event_log.read(from_offset=from_offset, since=since, event_types=[event_type],
+                                          until_offset=until_offset)
+            subscription.start_replay(record.data for record in records)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription):
+        subscriptions = self.subscribers.get(subscription.event_type, [])
+        if subscription in subscriptions:
+            subscriptions.remove(subscription)
+        await subscription.close()
+
+    async def start(self):
+        """Connects the transport, so events from other workers start arriving. Safe to call twice."""
+        if not self._started:
+            self._started = True
+            await self.transport.start(self._dispatch)
+
+    async def _dispatch(self, event_type: str, data: Dict[str, Any]) -> Optional[int]:
+        self.event_counts[event_type] = self.event_counts.get(event_type, 0) + 1
+        offset = None
+        if self.event_log is not None and not self.event_log.read_only:
+            try:
+                offset = self.event_log.append(event_type, data)
+            except Exception as e:
+                logger.error(f"Failed to append event {event_type} to the event log: {e}")
+        for subscription in list(self.subscribers.get(event_type, ())):
+            try:
+                await subscription.put(data)
+            except Exception as e:
+                # E.g. a coalesce_key that can't handle this event: one subscriber's problem, not the publisher's
+                subscription.metrics["failed"] += 1
+                logger.error(f"Error queueing event {event_type} for {subscription.name}: {e}")
+        return offset
+
+    async def publish(self, event_type: str, data: Dict[str, Any]) -> Optional[int]:
+        """Delivers the event; returns its event log offset (None without a log)."""
+        await self.start()
+        offset = await self._dispatch(event_type, data)
+        await self.transport.send(event_type, data)
+        return offset
+
+    async def close(self):
+        await self.transport.close()
+        if self.event_log is not None:
+            self.event_log.close()
+            self.event_log = None
+        self._started = False
+        for subscriptions in self.subscribers.values():
+            for subscription in subscriptions:
+                await subscription.close()
 
-    async def publish(self, event_type: str, data: Dict[str, Any]):
-        # Notify system monitor implicitly if we had circular imports, but better to keep it clean.
-        # We can add a 'system' channel later.
-        if event_type in self.subscribers:
-            for handler in self.subscribers[event_type]:
-                try:
-                    asyncio.create_task(handler(data))
-                except Exception as e:
-                    logger.error(f"Error handling event {event_type}: {e}")
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "transport": self.transport.get_stats(),
+            "event_counts": dict(self.event_counts),
+            "event_log": self.event_log.get_stats() if self.event_log is not None else None,
+            "subscriptions": [s.get_stats() for subscriptions in self.subscribers.values() for s in subscriptions]
+        }
 
 # Global instance
-event_bus = EventBus()
+event_bus = EventBus(
+    max_queue=settings.EVENT_BUS_MAX_QUEUE,
+    overflow=settings.EVENT_BUS_OVERFLOW,
+    topic_options=settings.EVENT_BUS_TOPICS,
+    transport=create_transport(settings.EVENT_BUS_TRANSPORT),
+    event_log=create_event_log()
+)
@@ -0,0 +1,314 @@
+import argparse
+import bisect
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETENTION_CHECK_SECONDS = 60.0 # Time-based retention is also checked this often, not only when a segment fills
+
+# Record: payload length, CRC32 of the payload, offset, timestamp; then the payload (JSON {"t": type, "d": data})
+_HEADER = struct.Struct("<IIQd")
+SEGMENT_SUFFIX = ".log"
+
+class LogRecord(NamedTuple):
+    offset: int
+    timestamp: float
+    event_type: str
+    data: Dict[str, Any]
+
+def _encode_payload(event_type: str, data: Any) -> bytes:
+    return json.dumps({"t": event_type, "d": data}, default=str, separators=(",", ":")).encode()
+
+class _Segment:
+    __slots__ = ("base_offset", "path", "first_timestamp")
+
+    def __init__(self, base_offset: int, path: str, first_timestamp: Optional[float]):
+        self.base_offset = base_offset
+        self.path = path
+        self.first_timestamp = first_timestamp
+
+def _iter_segment(path: str, decode: bool = True) -> Iterator[tuple]:
+    """(offset, timestamp, end position, payload) for each complete, intact record; stops at a torn tail."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            position = 0
+            while position + _HEADER.size <= size:
+                length, crc, offset, timestamp = _HEADER.unpack_from(view, position)
+                start = position + _HEADER.size
+                if start + length > size:
+                    return
+                payload = view[start:start + length]
+                if zlib.crc32(payload) != crc:
+                    return
+                position = start + length
+                yield offset, timestamp, position, payload if decode else None
+
+class EventLog:
+    """
+    Durable, append-only log of bus events in fixed-size segment files.
+
+    Each record is length-prefixed (with a CRC, its offset and timestamp) so a torn
+    write at the end of the last segment is detected and cut off on reopen. Offsets
+    increase by one per record across segments; a segment file is named after its
+    first offset. Reads memory-map the segments, so replay runs at disk speed.
+    Whole segments are deleted once older than `retention_seconds` or when the log
+    outgrows `retention_bytes` (the segment being written is always kept).
+
+    A directory has one writer: it is locked while open for writing, so with several
+    workers each needs its own directory. Any number of `read_only` instances may read.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024,
+                 retention_seconds: Optional[float] = None, retention_bytes: Optional[int] = None,
+                 fsync: bool = False, read_only: bool = False):
+        self.directory = directory
+        self.segment_bytes = max(_HEADER.size + 1, segment_bytes)
+        self.retention_seconds = retention_seconds
+        self.retention_bytes = retention_bytes
+        self.fsync = fsync
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._lock_file = None
+        if not read_only:
+            os.makedirs(directory, exist_ok=True)
+            self._lock_file = open(os.path.join(directory, "writer.lock"), "w")
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._lock_file.close()
+                raise RuntimeError(f"Event log {directory} is already open for writing by another process.")
+
+        self._segments: List[_Segment] = self._load_segments(directory)
+        self.next_offset = 0
+        self._file = None
+        self._size = 0
+        self._recover()
+        self._retention_checked_at = time.monotonic()
+        self.metrics: Dict[str, int] = {"appended": 0, "bytes_appended": 0, "segments_deleted": 0}
+
+    @staticmethod
+    def _load_segments(directory: str) -> List[_Segment]:
+        segments = []
+        for name in os.listdir(directory):
+            if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit():
+                path = os.path.join(directory, name)
+                first = next(_iter_segment(path, decode=False), None)
+                segments.append(_Segment(int(name[:-len(SEGMENT_SUFFIX)]), path, first[1] if first else None))
+        segments.sort(key=lambda segment: segment.base_offset)
+        return segments
+
+    def _recover(self):
+        if not self._segments:
+            if not self.read_only:
+                self._roll(0)
+            return
+        last = self._segments[-1]
+        end, next_offset = 0, last.base_offset
+        for offset, _, end, _ in _iter_segment(last.path, decode=False):
+            next_offset = offset + 1
+        self.next_offset = next_offset
+        if self.read_only:
+            return
+        size = os.path.getsize(last.path)
+        if end < size:
+            logger.warning(f"Event log {last.path}: cutting off {size - end} bytes of a torn record.")
+            with open(last.path, "r+b") as f:
+                f.truncate(end)
+        self._file = open(last.path, "ab")
+        self._size = end
+
+    def _roll(self, base_offset: int):
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.directory, f"{base_offset:020d}{SEGMENT_SUFFIX}")
+        self._file = open(path, "ab")
+        self._size = 0
+        self._segments.append(_Segment(base_offset, path, None))
+
+    def append(self, event_type: str, data: Dict[str, Any], timestamp: Optional[float] = None) -> int:
+        """Appends one event and returns its offset. Data is flushed to the OS (and fsynced with `fsync`)."""
+        if self.read_only:
+            raise RuntimeError(f"Event log {self.directory} is open read-only.")
+        payload = _encode_payload(event_type, data)
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._size and self._size + _HEADER.size + len(payload) > self.segment_bytes:
+                self._roll(self.next_offset)
+                self._apply_retention()
+            elif time.monotonic() - self._retention_checked_at > RETENTION_CHECK_SECONDS:
+                self._apply_retention()
+            offset = self.next_offset
+            self._file.write(_HEADER.pack(len(payload), zlib.crc32(payload), offset, timestamp) + payload)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            segment = self._segments[-1]
+            if segment.first_timestamp is None:
+                segment.first_timestamp = timestamp
+            self._size += _HEADER.size + len(payload)
+            self.next_offset = offset + 1
+            self.metrics["appended"] += 1
+            self.metrics["bytes_appended"] += _HEADER.size + len(payload)
+        return offset
+
+    def _sync(self):
+        if self._file is not None:
+            self._file.flush()
+        else:
+            # Read-only: pick up what the writer has appended since we opened
+            self._segments = self._load_segments(self.directory)
+            self._recover()
+
+    def end_offset(self) -> int:
+        """The offset the next appended record will get (read-only logs check the writer's progress first)."""
+        with self._lock:
+            self._sync()
+            return self.next_offset
+
+    def _apply_retention(self):
+        self._retention_checked_at = time.monotonic()
+        now = time.time()
+        sizes = [os.path.getsize(segment.path) for segment in self._segments]
+        total = sum(sizes)
+        while len(self._segments) > 1:
+            oldest, following = self._segments[0], self._segments[1]
+            # Every record in the oldest segment is older than the first one of the next
+            expired = (self.retention_seconds is not None and following.first_timestamp is not None
+                       and now - following.first_timestamp > self.retention_seconds)
+            oversized = self.retention_bytes is not None and total > self.retention_bytes
+            if not (expired or oversized):
+                break
+            os.unlink(oldest.path)
+            total -= sizes.pop(0)
+            self._segments.pop(0)
+            self.metrics["segments_deleted"] += 1
+            logger.info(f"Event log retention removed segment {oldest.path}.")
+
+    def enforce_retention(self):
+        if self.read_only:
+            return # Retention is the writer's job
+        with self._lock:
+            self._apply_retention()
+
+    def _start_segment(self, segments: Sequence[_Segment], from_offset: Optional[int], since: Optional[float]) -> int:
+        if from_offset is not None:
+            return max(0, bisect.bisect_right([s.base_offset for s in segments], from_offset) - 1)
+        if since is not None:
+            # Last segment that starts at or before `since`; earlier ones are entirely older
+            starts = [s.first_timestamp if s.first_timestamp is not None else float("inf") for s in segments]
+            return max(0, bisect.bisect_right(starts, since) - 1)
+        return 0
+
+    def read_raw(self, from_offset: Optional[int] = None, since: Optional[float] = None,
+                 event_types: Optional[Sequence[str]] = None,
+                 until_offset: Optional[int] = None) -> Iterator[Tuple[int, float, bytes]]:
+        """
+        (offset, timestamp, JSON payload) from `from_offset` (inclusive) or from timestamp
+        `since`, in offset order, optionally only of `event_types` and only below `until_offset`.
+        Event types are matched on the encoded payload, so filtering doesn't decode records.
+        """
+        with self._lock:
+            self._sync()
+            segments = list(self._segments)
+            end = self.next_offset if until_offset is None else min(until_offset, self.next_offset)
+        # Payloads are encoded with the type first: {"t":"<type>","d":...}
+        prefixes = tuple(_encode_payload(event_type, None)[:-len(b',"d":null}')] + b"," for event_type in event_types or ())
+        for segment in segments[self._start_segment(segments, from_offset, since):]:
+            if segment.base_offset >= end:
+                return
+            try:
+                records = _iter_segment(segment.path)
+                for offset, timestamp, _, payload in records:
+                    if offset >= end:
+                        return
+                    if (from_offset is not None and offset < from_offset) or (since is not None and timestamp < since):
+                        continue
+                    if not prefixes or payload.startswith(prefixes):
+                        yield offset, timestamp, payload
+            except FileNotFoundError:
+                continue # Removed by retention while we were reading
+
+    def read(self, from_offset: Optional[int] = None, since: Optional[float] = None,
+             event_types: Optional[Sequence[str]] = None, until_offset: Optional[int] = None) -> Iterator[LogRecord]:
+        """Decoded records; same arguments as `read_raw`."""
+        for offset, timestamp, payload in self.read_raw(from_offset, since, event_types, until_offset):
+            message = json.loads(payload)
+            yield LogRecord(offset, timestamp, message["t"], message["d"])
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            segments = list(self._segments)
+            next_offset = self.next_offset
+        return {
+            "directory": self.directory,
+            "segments": len(segments),
+            "first_offset": segments[0].base_offset if segments else 0,
+            "next_offset": next_offset,
+            "bytes": sum(os.path.getsize(s.path) for s in segments if os.path.exists(s.path)),
+            **self.metrics
+        }
+
+def create_event_log() -> Optional[EventLog]:
+    """
+    The event log configured by EVENT_LOG_DIR (None when unset). Only one worker can
+    write it; the others open it read-only, so `EventBus.resume` replays there too.
+    """
+    if not settings.EVENT_LOG_DIR:
+        return None
+    try:
+        return EventLog(
+            settings.EVENT_LOG_DIR,
+            segment_bytes=settings.EVENT_LOG_SEGMENT_BYTES,
+            retention_seconds=settings.EVENT_LOG_RETENTION_HOURS * 3600 if settings.EVENT_LOG_RETENTION_HOURS else None,
+            retention_bytes=settings.EVENT_LOG_RETENTION_BYTES or None,
+            fsync=settings.EVENT_LOG_FSYNC
+        )
+    except RuntimeError as e:
+        # Another worker is the writer; with a cross-process transport it logs this worker's events too
+        logger.info(f"{e} This worker reads the event log without writing it.")
+        return EventLog(settings.EVENT_LOG_DIR, read_only=True)
+
+if __name__ == "__main__":
+    # Offline replay, e.g. to backfill analytics: python -m app.core.event_log <dir> --since 1700000000 > events.ndjson
+    parser = argparse.ArgumentParser(description="Replay an event log as NDJSON on stdout.")
+    parser.add_argument("directory")
+    parser.add_argument("--from-offset", type=int, default=None)
+    parser.add_argument("--since", type=float, default=None, help="Unix timestamp")
+    parser.add_argument("--type", action="append", dest="event_types", help="Only this event type (repeatable)")
+    args = parser.parse_args()
+
+    log = EventLog(args.directory, read_only=True)
+    started = time.perf_counter()
+    count = 0
+    out = sys.stdout.buffer
+    # Payloads are already JSON; wrapping them as-is keeps replay close to disk speed
+    for offset, timestamp, payload in log.read_raw(from_offset=args.from_offset, since=args.since,
+                                                   event_types=args.event_types):
+        out.write(b'{"offset":%d,"timestamp":%r,"event":%s}\n' % (offset, timestamp, payload))
+        count += 1
+    elapsed = time.perf_counter() - started
+    log.close()
+    print(f"Replayed {count} events in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f}/s).", file=sys.stderr)
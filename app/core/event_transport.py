@@ -0,0 +1,320 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ("local", "unix", "redis")
+
+Deliver = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+def _encode(origin: str, event_type: str, data: Dict[str, Any]) -> bytes:
+    return json.dumps({"o": origin, "t": event_type, "d": data}, default=str, separators=(",", ":")).encode()
+
+def _decode(payload: bytes) -> Tuple[str, str, Dict[str, Any]]:
+    message = json.loads(payload)
+    return message["o"], message["t"], message["d"]
+
+class EventTransport:
+    """
+    Carries events between processes for EventBus.
+
+    The bus always delivers to its own subscribers directly and hands every published
+    event to `send`; the transport delivers events published by *other* processes by
+    calling `deliver(event_type, data)`. This base class is the in-process transport:
+    nothing leaves the process.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._deliver: Optional[Deliver] = None
+        self.metrics: Dict[str, int] = {"sent": 0, "received": 0, "send_errors": 0, "receive_errors": 0}
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    async def send(self, event_type: str, data: Dict[str, Any]):
+        pass
+
+    async def close(self):
+        pass
+
+    async def _receive(self, payload: bytes):
+        try:
+            origin, event_type, data = _decode(payload)
+        except Exception as e:
+            self.metrics["receive_errors"] += 1
+            logger.warning(f"Dropping malformed event from {self.name} transport: {e}")
+            return
+        if origin == self.origin:
+            return # Our own event, already delivered locally
+        self.metrics["received"] += 1
+        try:
+            await self._deliver(event_type, data)
+        except Exception as e:
+            # The reader must outlive one bad event, or this process stops hearing from the others
+            self.metrics["receive_errors"] += 1
+            logger.error(f"Failed to deliver event {event_type} from {self.name} transport: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"transport": self.name, "origin": self.origin, **self.metrics}
+
+InProcessTransport = EventTransport
+
+class UnixSocketTransport(EventTransport):
+    """
+    Fans events out to the other processes on this host over Unix datagram sockets.
+
+    Every process binds one socket in `directory` and sends each event to all other
+    sockets there, so no broker process is needed. Datagrams on Unix sockets are not
+    reordered; sends never wait, so when a peer's receive buffer is full (it has stopped
+    reading) the event is dropped for that peer and counted in `dropped`, rather than
+    holding up the publisher. Sockets left behind by dead processes are removed on the
+    first failed send. New peers are picked up within `peer_refresh_seconds`.
+    """
+
+    name = "unix"
+    MAX_MESSAGE_BYTES = 200 * 1024 # Around the default Linux limit for one datagram
+
+    def __init__(self, directory: str, peer_refresh_seconds: float = 1.0):
+        super().__init__()
+        self.directory = directory
+        self.peer_refresh_seconds = peer_refresh_seconds
+        self.path = os.path.join(directory, f"{os.getpid()}-{self.origin.rsplit(':', 1)[-1]}.sock")
+        self._recv_sock: Optional[socket.socket] = None
+        self._send_sock: Optional[socket.socket] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._peers: List[str] = []
+        self._peers_listed_at = 0.0
+        self.metrics["dropped"] = 0
+
+    async def start(self, deliver: Deliver):
+        await super().start(deliver)
+        os.makedirs(self.directory, exist_ok=True)
+        self._recv_sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._recv_sock.bind(self.path)
+        self._recv_sock.setblocking(False)
+        self._send_sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._send_sock.setblocking(False)
+        self._reader = asyncio.create_task(self._read_loop(), name="event-transport-unix")
+        logger.info(f"Event bus listening on {self.path}")
+
+    async def _read_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                payload = await loop.sock_recv(self._recv_sock, self.MAX_MESSAGE_BYTES)
+            except asyncio.CancelledError:
+                raise
+            except OSError as e:
+                self.metrics["receive_errors"] += 1
+                logger.error(f"Event bus failed to read from {self.path}: {e}")
+                await asyncio.sleep(0.1)
+                continue
+            await self._receive(payload)
+
+    def _get_peers(self) -> List[str]:
+        now = time.monotonic()
+        if now - self._peers_listed_at >= self.peer_refresh_seconds:
+            try:
+                names = os.listdir(self.directory)
+            except FileNotFoundError:
+                names = []
+            self._peers = [os.path.join(self.directory, name) for name in names
+                           if name.endswith(".sock") and os.path.join(self.directory, name) != self.path]
+            self._peers_listed_at = now
+        return self._peers
+
+    def _drop_peer(self, peer: str):
+        if peer in self._peers:
+            self._peers.remove(peer)
+        try:
+            os.unlink(peer)
+        except OSError:
+            pass
+
+    def _send_to(self, peer: str, payload: bytes) -> bool:
+        try:
+            self._send_sock.sendto(payload, peer)
+        except BlockingIOError:
+            # Peer's buffer is full: it is stuck or far behind, and waiting would stall every publisher here
+            self.metrics["dropped"] += 1
+            logger.debug(f"Event bus peer {peer} is not reading; dropped an event.")
+        except (ConnectionRefusedError, FileNotFoundError):
+            logger.info(f"Removing stale event bus peer {peer}")
+            self._drop_peer(peer)
+        except OSError as e:
+            logger.error(f"Failed to send an event to {peer}: {e}")
+            return False
+        return True
+
+    async def send(self, event_type: str, data: Dict[str, Any]):
+        if self._send_sock is None:
+            return
+        payload = _encode(self.origin, event_type, data)
+        if len(payload) > self.MAX_MESSAGE_BYTES:
+            self.metrics["send_errors"] += 1
+            logger.error(f"Event {event_type} is too large for the unix transport ({len(payload)} bytes).")
+            return
+        for peer in list(self._get_peers()):
+            if not self._send_to(peer, payload):
+                self.metrics["send_errors"] += 1
+        self.metrics["sent"] += 1
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        for sock in (self._recv_sock, self._send_sock):
+            if sock is not None:
+                sock.close()
+        self._recv_sock = self._send_sock = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**super().get_stats(), "path": self.path, "peers": len(self._peers)}
+
+class RedisTransport(EventTransport):
+    """
+    Publishes events on one Redis pub/sub channel, for processes spread over hosts.
+
+    `client` is anything with the redis.asyncio interface used here: `publish(channel,
+    message)` and `pubsub()` returning an object with `subscribe`, `get_message` and
+    `unsubscribe`. Without a client one is created from `url` (needs the redis package).
+    LocalPubSub below is an in-memory stand-in with the same interface.
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any = None, url: Optional[str] = None, channel: str = "newsbot:events"):
+        super().__init__()
+        self.client = client
+        self.url = url
+        self.channel = channel
+        self._pubsub: Any = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver):
+        await super().start(deliver)
+        if self.client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                raise RuntimeError("The redis event bus transport needs the 'redis' package (pip install redis).")
+            self.client = redis.from_url(self.url or "redis://localhost:6379/0")
+        self._pubsub = self.client.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._reader = asyncio.create_task(self._read_loop(), name="event-transport-redis")
+        logger.info(f"Event bus subscribed to Redis channel {self.channel}")
+
+    async def _read_loop(self):
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics["receive_errors"] += 1
+                logger.error(f"Event bus lost its Redis subscription: {e}. Retrying.")
+                await asyncio.sleep(1.0)
+                continue
+            if message is not None and message.get("type") == "message":
+                await self._receive(message["data"])
+
+    async def send(self, event_type: str, data: Dict[str, Any]):
+        if self._pubsub is None:
+            return
+        try:
+            await self.client.publish(self.channel, _encode(self.origin, event_type, data))
+            self.metrics["sent"] += 1
+        except Exception as e:
+            self.metrics["send_errors"] += 1
+            logger.error(f"Failed to publish event {event_type} to Redis: {e}")
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.channel)
+            self._pubsub = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**super().get_stats(), "channel": self.channel}
+
+class LocalPubSub:
+    """
+    In-memory stand-in for a Redis client's pub/sub (same calls as redis.asyncio).
+    Transports sharing one instance behave like processes sharing one Redis server.
+    """
+
+    def __init__(self):
+        self._channels: Dict[str, List["_LocalSubscriber"]] = {}
+
+    async def publish(self, channel: str, message: Any) -> int:
+        subscribers = self._channels.get(channel, [])
+        for subscriber in subscribers:
+            subscriber.queue.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(subscribers)
+
+    def pubsub(self) -> "_LocalSubscriber":
+        return _LocalSubscriber(self)
+
+class _LocalSubscriber:
+    def __init__(self, server: LocalPubSub):
+        self.server = server
+        self.channels: List[str] = []
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            self.server._channels.setdefault(channel, []).append(self)
+            self.channels.append(channel)
+            self.queue.put_nowait({"type": "subscribe", "channel": channel, "data": 1})
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: Optional[float] = 0.0):
+        try:
+            message = await asyncio.wait_for(self.queue.get(), timeout=timeout or None)
+        except asyncio.TimeoutError:
+            return None
+        if ignore_subscribe_messages and message["type"] == "subscribe":
+            return None
+        return message
+
+    async def unsubscribe(self, *channels: str):
+        for channel in channels or list(self.channels):
+            if self in self.server._channels.get(channel, []):
+                self.server._channels[channel].remove(self)
+            if channel in self.channels:
+                self.channels.remove(channel)
+
+def create_transport(name: Optional[str] = None) -> EventTransport:
+    """Builds the transport named in EVENT_BUS_TRANSPORT ("local", "unix" or "redis")."""
+    name = (name or settings.EVENT_BUS_TRANSPORT or "local").lower()
+    if name == "unix":
+        return UnixSocketTransport(settings.EVENT_BUS_SOCKET_DIR)
+    if name == "redis":
+        return RedisTransport(url=settings.EVENT_BUS_REDIS_URL, channel=settings.EVENT_BUS_CHANNEL)
+    if name != "local":
+        logger.warning(f"Unknown event bus transport '{name}'. Using 'local'. Valid options: {TRANSPORTS}")
+    return InProcessTransport()
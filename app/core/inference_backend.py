@@ -0,0 +1,204 @@
+import argparse
+import io
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import torch
+from transformers import (
+    AutoModelForSeq2SeqLM,
+    AutoModelForSequenceClassification,
+    AutoModelForTokenClassification,
+    AutoTokenizer,
+    pipeline,
+)
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("pytorch", "quantized", "onnx")
+
+# Pipeline task -> model kind
+TASK_KINDS = {
+    "sentiment-analysis": "sequence-classification",
+    "text-classification": "sequence-classification",
+    "ner": "token-classification",
+    "summarization": "seq2seq-lm",
+}
+
+_AUTO_CLASSES = {
+    "sequence-classification": AutoModelForSequenceClassification,
+    "token-classification": AutoModelForTokenClassification,
+    "seq2seq-lm": AutoModelForSeq2SeqLM,
+}
+
+# optimum.onnxruntime class names, looked up lazily since optimum is optional
+_ORT_CLASSES = {
+    "sequence-classification": "ORTModelForSequenceClassification",
+    "token-classification": "ORTModelForTokenClassification",
+    "seq2seq-lm": "ORTModelForSeq2SeqLM",
+}
+
+PARITY_SAMPLE_TEXTS = [
+    "Apple reported record quarterly revenue, beating analyst expectations.",
+    "Shares of Tesla fell sharply after the company missed delivery targets.",
+    "The Federal Reserve left interest rates unchanged at its meeting in Washington.",
+    "Microsoft and NVIDIA announced a new partnership to expand AI data centers.",
+    "Oil prices were flat as traders awaited the OPEC decision.",
+    "The bank warned of rising loan defaults and cut its full-year guidance.",
+    "Amazon unveils a new line of devices ahead of the holiday season.",
+    "Regulators opened an investigation into the merger of the two airlines.",
+]
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Returns a valid backend name, defaulting to settings.INFERENCE_BACKEND."""
+    backend = (backend or settings.INFERENCE_BACKEND or "pytorch").lower()
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown inference backend '{backend}'. Using 'pytorch'. Valid options: {BACKENDS}")
+        return "pytorch"
+    if backend != "pytorch" and torch.cuda.is_available():
+        # Dynamic int8 quantization only runs on CPU; GPU hosts keep the fp32 model
+        logger.info(f"CUDA is available; ignoring '{backend}' inference backend.")
+        return "pytorch"
+    return backend
+
+def quantize_model(model: torch.nn.Module) -> torch.nn.Module:
+    """Dynamic int8 quantization of every Linear layer (weights int8, activations quantized on the fly)."""
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def load_model(model_name: str, kind: str, backend: Optional[str] = None) -> Any:
+    """
+    Loads a model of the given kind ("sequence-classification", "token-classification"
+    or "seq2seq-lm") with the selected backend applied. The "onnx" backend needs
+    optimum[onnxruntime] and falls back to "quantized" when it is not installed.
+    """
+    backend = resolve_backend(backend)
+    if backend == "onnx":
+        try:
+            from optimum import onnxruntime as ort
+            model = getattr(ort, _ORT_CLASSES[kind]).from_pretrained(model_name, export=True)
+            model.inference_backend = backend
+            logger.info(f"Exported {model_name} to ONNX Runtime.")
+            return model
+        except ImportError:
+            logger.warning("optimum[onnxruntime] is not installed. Falling back to dynamic int8 quantization.")
+            backend = "quantized"
+
+    model = _AUTO_CLASSES[kind].from_pretrained(model_name)
+    model.eval()
+    if backend == "quantized":
+        model = quantize_model(model)
+        model.inference_backend = backend
+        logger.info(f"Quantized {model_name} to int8.")
+    return model
+
+def load_pipeline(task: str, model_name: str, backend: Optional[str] = None, **kwargs) -> Any:
+    """Builds a Hugging Face pipeline whose model is loaded through `load_model`."""
+    backend = resolve_backend(backend)
+    if backend == "pytorch":
+        device = 0 if torch.cuda.is_available() else -1
+        return pipeline(task, model=model_name, device=device, **kwargs)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = load_model(model_name, TASK_KINDS[task], backend)
+    return pipeline(task, model=model, tokenizer=tokenizer, device=-1, **kwargs)
+
+def serialized_size(model: Any) -> int:
+    """Bytes of the model's state dict when saved (counts packed int8 weights correctly)."""
+    if not hasattr(model, "state_dict"):
+        return 0
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+def _prediction_key(prediction: Any) -> Any:
+    """The part of a pipeline output that must match exactly: labels (and entity spans)."""
+    if isinstance(prediction, list): # NER returns a list of entities per text
+        return tuple(sorted((e.get("entity_group", e.get("entity")), e.get("start"), e.get("end")) for e in prediction))
+    if isinstance(prediction, dict):
+        return prediction.get("label", prediction.get("summary_text"))
+    return prediction
+
+def _prediction_scores(prediction: Any) -> List[float]:
+    if isinstance(prediction, list):
+        return [float(e.get("score", 0.0)) for e in prediction]
+    if isinstance(prediction, dict) and "score" in prediction:
+        return [float(prediction["score"])]
+    return []
+
+def compare_predictions(reference: List[Any], candidate: List[Any]) -> Dict[str, Any]:
+    """
+    Compares two lists of pipeline outputs (one entry per input text).
+    Returns label agreement and the largest score difference among agreeing predictions.
+    """
+    if len(reference) != len(candidate):
+        raise ValueError(f"Prediction counts differ: {len(reference)} vs {len(candidate)}")
+    agreed = 0
+    max_score_delta = 0.0
+    for ref, cand in zip(reference, candidate):
+        if _prediction_key(ref) != _prediction_key(cand):
+            continue
+        agreed += 1
+        for ref_score, cand_score in zip(_prediction_scores(ref), _prediction_scores(cand)):
+            max_score_delta = max(max_score_delta, abs(ref_score - cand_score))
+    return {
+        "count": len(reference),
+        "agreement": agreed / len(reference) if reference else 1.0,
+        "max_score_delta": round(max_score_delta, 4)
+    }
+
+def _timed_run(run: Callable[[List[str]], List[Any]], texts: List[str], repeats: int) -> Dict[str, Any]:
+    outputs = [run([text])[0] for text in texts] # Warm-up pass; also the outputs we compare
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            run([text])
+    seconds_per_text = (time.perf_counter() - start) / max(1, repeats * len(texts))
+    return {"outputs": outputs, "ms_per_text": round(seconds_per_text * 1000, 2)}
+
+def check_parity(task: str, model_name: str, backend: str, texts: Optional[List[str]] = None,
+                 min_agreement: float = 0.95, repeats: int = 3, **pipeline_kwargs) -> Dict[str, Any]:
+    """
+    Runs the fp32 model and the `backend` variant of `model_name` on the same texts
+    and reports label agreement, score drift, per-text latency and model size.
+    `passed` is True when agreement reaches `min_agreement`.
+    """
+    texts = texts or PARITY_SAMPLE_TEXTS
+    reference = load_pipeline(task, model_name, backend="pytorch", **pipeline_kwargs)
+    candidate = load_pipeline(task, model_name, backend=backend, **pipeline_kwargs)
+
+    def runner(pipe):
+        return lambda batch: pipe(batch, truncation=True)
+
+    ref_run = _timed_run(runner(reference), texts, repeats)
+    cand_run = _timed_run(runner(candidate), texts, repeats)
+
+    report = compare_predictions(ref_run["outputs"], cand_run["outputs"])
+    report.update({
+        "task": task,
+        "model": model_name,
+        "backend": getattr(candidate.model, "inference_backend", "pytorch"), # After any fallback
+        "fp32_ms_per_text": ref_run["ms_per_text"],
+        "backend_ms_per_text": cand_run["ms_per_text"],
+        "speedup": round(ref_run["ms_per_text"] / cand_run["ms_per_text"], 2) if cand_run["ms_per_text"] else None,
+        "fp32_bytes": serialized_size(reference.model),
+        "backend_bytes": serialized_size(candidate.model),
+    })
+    report["passed"] = report["agreement"] >= min_agreement
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy/latency parity check of an inference backend against fp32.")
+    parser.add_argument("--task", default="sentiment-analysis", choices=sorted(TASK_KINDS))
+    parser.add_argument("--model", default="distilbert-base-uncased-finetuned-sst-2-english")
+    parser.add_argument("--backend", default="quantized", choices=[b for b in BACKENDS if b != "pytorch"])
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    args = parser.parse_args()
+
+    extra = {"aggregation_strategy": "simple"} if args.task == "ner" else {}
+    result = check_parity(args.task, args.model, args.backend, min_agreement=args.min_agreement, **extra)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    raise SystemExit(0 if result["passed"] else 1)
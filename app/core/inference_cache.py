@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalizes text and collapses whitespace so trivially different copies share a key."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+def model_revision(model: Any) -> str:
+    """
+    Best-effort revision (commit hash) of a loaded Hugging Face model or pipeline.
+    Quantized/ONNX variants get their backend appended, since their outputs differ slightly from fp32.
+    """
+    model = getattr(model, "model", model) # Pipelines wrap the model
+    config = getattr(model, "config", None)
+    revision = getattr(config, "_commit_hash", None) or "unknown"
+    backend = getattr(model, "inference_backend", None)
+    return f"{revision}+{backend}" if backend else revision
+
+class InferenceCache:
+    """
+    Model-aware cache for inference results.
+
+    Entries are keyed on (model name, model revision, normalized text hash) and
+    live in two tiers: an in-memory LRU and an optional SQLite file that survives
+    restarts. Values must be JSON-serializable.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_memory_items: int = 10000):
+        self.db_path = db_path
+        self.max_memory_items = max_memory_items
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name: str, text: str, revision: str = "unknown") -> str:
+        text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{model_name}@{revision}:{text_hash}"
+
+    def _get_conn(self) -> Optional[sqlite3.Connection]:
+        if not self.db_path:
+            return None
+        if self._conn is None:
+            try:
+                directory = os.path.dirname(self.db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS inference_cache ("
+                    "key TEXT PRIMARY KEY, model TEXT, revision TEXT, value TEXT, created_at REAL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Could not open inference cache at {self.db_path}: {e}. Using memory tier only.")
+                self.db_path = None
+                self._conn = None
+        return self._conn
+
+    def _remember(self, key: str, value: Any):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, model_name: str, text: str, revision: str = "unknown") -> Optional[Any]:
+        key = self.make_key(model_name, text, revision)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+            conn = self._get_conn()
+            if conn is not None:
+                row = conn.execute("SELECT value FROM inference_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, model_name: str, text: str, value: Any, revision: str = "unknown"):
+        self.set_many(model_name, [text], [value], revision)
+
+    def set_many(self, model_name: str, texts: List[str], values: List[Any], revision: str = "unknown"):
+        rows = []
+        with self._lock:
+            for text, value in zip(texts, values):
+                key = self.make_key(model_name, text, revision)
+                self._remember(key, value)
+                rows.append((key, model_name, revision, json.dumps(value), time.time()))
+
+            conn = self._get_conn()
+            if conn is not None and rows:
+                try:
+                    conn.executemany("INSERT OR REPLACE INTO inference_cache VALUES (?, ?, ?, ?, ?)", rows)
+                    conn.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to persist {len(rows)} inference cache entries: {e}")
+
+    def get_or_compute(self, model_name: str, texts: List[str],
+                       compute: Callable[[List[str]], List[Any]], revision: str = "unknown") -> List[Any]:
+        """
+        Returns one result per text, calling `compute` once with only the cache misses.
+        Texts that share a cache key (repeats, or the same text up to whitespace) are
+        computed once and the result is used for each of them.
+        Results that `compute` returns as None are not cached.
+        """
+        results: List[Any] = [self.get(model_name, text, revision) for text in texts]
+        # Cache key -> positions of the missing texts with that key
+        missing: Dict[str, List[int]] = {}
+        for i, value in enumerate(results):
+            if value is None:
+                missing.setdefault(self.make_key(model_name, texts[i], revision), []).append(i)
+        if not missing:
+            return results
+
+        positions = list(missing.values())
+        computed = compute([texts[indexes[0]] for indexes in positions])
+        to_store = [(texts[indexes[0]], value) for indexes, value in zip(positions, computed) if value is not None]
+        for indexes, value in zip(positions, computed):
+            for i in indexes:
+                results[i] = value
+        if to_store:
+            self.set_many(model_name, [t for t, _ in to_store], [v for _, v in to_store], revision)
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            conn = self._get_conn()
+            if conn is not None:
+                conn.execute("DELETE FROM inference_cache")
+                conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_items": len(self._memory),
+            "max_memory_items": self.max_memory_items,
+            "db_path": self.db_path
+        }
+
+# Global instance
+inference_cache = InferenceCache(
+    db_path=settings.INFERENCE_CACHE_PATH,
+    max_memory_items=settings.INFERENCE_CACHE_MAX_ITEMS
+)
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class InferenceError(Exception):
+    """Base class for jobs the inference executor could not run to completion."""
+
+class InferenceOverloadedError(InferenceError):
+    """Raised instead of queueing a job when the executor's queue is full (load shedding)."""
+
+    def __init__(self, pending: int, retry_after: float = 1.0):
+        super().__init__(f"Inference queue is full ({pending} jobs pending). Try again later.")
+        self.pending = pending
+        self.retry_after = retry_after
+
+class InferenceTimeoutError(InferenceError):
+    """Raised when a job does not finish within its timeout."""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"Inference did not finish within {timeout:.1f}s.")
+        self.timeout = timeout
+
+class InferenceExecutor:
+    """
+    Runs blocking model calls on a bounded worker pool so async routes await them
+    instead of stalling the event loop.
+
+    At most `max_workers` jobs run at once and at most `max_queue` more wait for a
+    worker; beyond that `run` sheds load with InferenceOverloadedError. A job that
+    times out while still queued is dropped; one already running finishes in the
+    background (threads cannot be interrupted) but its caller gets
+    InferenceTimeoutError right away.
+
+    Threads rather than processes: models are loaded once per process in the
+    model registry, and torch releases the GIL during forward passes.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 32, default_timeout: Optional[float] = 30.0):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.default_timeout = default_timeout
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0 # Queued or running
+        self._running = 0
+        self.metrics: Dict[str, float] = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "queue_wait_seconds": 0.0,
+            "max_queue_wait_seconds": 0.0,
+            "run_seconds": 0.0,
+        }
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+            return self._pool
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.metrics["rejected"] += 1
+                raise InferenceOverloadedError(self._pending)
+            self._pending += 1
+            self.metrics["submitted"] += 1
+
+    def _release(self, future: Future):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                return
+            self.metrics["completed" if future.exception() is None else "failed"] += 1
+
+    def _invoke(self, submitted_at: float, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        started = time.monotonic()
+        waited = started - submitted_at
+        with self._lock:
+            self._running += 1
+            self.metrics["queue_wait_seconds"] += waited
+            self.metrics["max_queue_wait_seconds"] = max(self.metrics["max_queue_wait_seconds"], waited)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.metrics["run_seconds"] += time.monotonic() - started
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Runs `fn(*args, **kwargs)` on the pool and awaits its result.
+        `timeout` defaults to the executor's default (None disables it).
+        """
+        self._admit()
+        try:
+            future = self._get_pool().submit(self._invoke, time.monotonic(), fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release)
+
+        timeout = self.default_timeout if timeout is None else timeout
+        try:
+            # Cancelling the awaiting task (timeout, client disconnect) also drops the job if it hasn't started
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout or None)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.metrics["timeouts"] += 1
+            logger.warning(f"Inference job {getattr(fn, '__qualname__', fn)} timed out after {timeout}s.")
+            raise InferenceTimeoutError(timeout) from None
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self.metrics)
+            pending, running = self._pending, self._running
+        started = metrics["completed"] + metrics["failed"]
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": running,
+            "queue_depth": max(0, pending - running),
+            "submitted": int(metrics["submitted"]),
+            "completed": int(metrics["completed"]),
+            "failed": int(metrics["failed"]),
+            "rejected": int(metrics["rejected"]),
+            "timeouts": int(metrics["timeouts"]),
+            "avg_queue_wait_ms": round(metrics["queue_wait_seconds"] / started * 1000, 2) if started else 0.0,
+            "max_queue_wait_ms": round(metrics["max_queue_wait_seconds"] * 1000, 2),
+            "avg_run_ms": round(metrics["run_seconds"] / started * 1000, 2) if started else 0.0,
+        }
+
+def register_exception_handlers(app: Any):
+    """Maps executor errors to HTTP responses: 503 with Retry-After when shedding load, 504 on timeout."""
+    from fastapi.responses import JSONResponse
+
+    @app.exception_handler(InferenceOverloadedError)
+    async def _overloaded(request, exc: InferenceOverloadedError):
+        return JSONResponse(status_code=503, content={"detail": str(exc)},
+                            headers={"Retry-After": str(int(max(1, exc.retry_after)))})
+
+    @app.exception_handler(InferenceTimeoutError)
+    async def _timed_out(request, exc: InferenceTimeoutError):
+        return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+# Global instance
+inference_executor = InferenceExecutor(
+    max_workers=settings.INFERENCE_MAX_WORKERS,
+    max_queue=settings.INFERENCE_MAX_QUEUE,
+    default_timeout=settings.INFERENCE_TIMEOUT_SECONDS
+)
@@ -0,0 +1,210 @@
+import asyncio
+import bisect
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUEUE_WAIT_MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram; percentiles are reported as bucket upper bounds."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1) # Last bucket is +Inf
+        self.total = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+            self.total += 1
+            self.sum += value
+
+    def _percentile(self, q: float) -> Optional[float]:
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(self.bounds + [float("inf")], self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buckets = {f"le_{bound:g}": count for bound, count in zip(self.bounds, self.counts)}
+            buckets["le_inf"] = self.counts[-1]
+            return {
+                "count": self.total,
+                "mean": round(self.sum / self.total, 3) if self.total else None,
+                "p50": self._percentile(0.50),
+                "p95": self._percentile(0.95),
+                "p99": self._percentile(0.99),
+                "buckets": buckets
+            }
+
+class _Request:
+    __slots__ = ("payload", "future", "enqueued_at")
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+def _payload_length(payload: Any) -> int:
+    text = payload[0] if isinstance(payload, tuple) else payload
+    return len(text) if isinstance(text, str) else 0
+
+class MicroBatcher:
+    """
+    Coalesces single-item model calls from concurrent callers into batched forward passes.
+
+    Requests are queued to one worker thread per model. The worker waits up to
+    `max_wait_ms` after the first request of a batch (or until `max_batch_size`
+    requests arrived), sorts the batch by text length so padding stays small, and
+    calls `batch_fn(payloads) -> results` once. Each caller gets its own result (or
+    the batch's exception). `batch_fn` should look up the model on every call, so
+    a model reloaded in the registry is picked up.
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self.batches = 0
+        self.errors = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f"microbatch-{self.name}", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[_Request]:
+        batch = [self._queue.get()]
+        deadline = batch[0].enqueued_at + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [r for r in self._collect() if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            started = time.monotonic()
+            for request in batch:
+                self.queue_wait_ms.observe((started - request.enqueued_at) * 1000)
+            self.batch_sizes.observe(len(batch))
+            self.batches += 1
+
+            batch.sort(key=lambda r: _payload_length(r.payload))
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_Request]):
+        try:
+            results = self.batch_fn([r.payload for r in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name} batch returned {len(results)} results for {len(batch)} inputs")
+        except Exception as e:
+            self.errors += 1
+            if len(batch) > 1:
+                # One bad input must not fail its batch-mates: rerun each request on its own
+                logger.warning(f"Micro-batch of {len(batch)} for {self.name} failed ({e}). Retrying items individually.")
+                for request in batch:
+                    self._run_batch([request])
+                return
+            logger.error(f"Micro-batch item for {self.name} failed: {e}", exc_info=True)
+            batch[0].future.set_exception(e)
+            return
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+
+    def submit(self, payload: Any) -> Future:
+        self._ensure_worker()
+        request = _Request(payload)
+        self._queue.put(request)
+        return request.future
+
+    def predict(self, payload: Any, timeout: Optional[float] = None) -> Any:
+        """Blocks until the batch containing `payload` has run and returns its result."""
+        return self.submit(payload).result(timeout=timeout)
+
+    def predict_many(self, payloads: List[Any], timeout: Optional[float] = None,
+                     return_exceptions: bool = False) -> List[Any]:
+        """
+        Queues all payloads at once (they may share batches with other callers) and returns
+        results in order. With `return_exceptions`, a failed item's exception is returned
+        in its place instead of raised.
+        """
+        futures = [self.submit(payload) for payload in payloads]
+        if not return_exceptions:
+            return [future.result(timeout=timeout) for future in futures]
+        results: List[Any] = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout=timeout))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def predict_async(self, payload: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(payload))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self._queue.qsize(),
+            "batches": self.batches,
+            "errors": self.errors,
+            "batch_size": self.batch_sizes.get_stats(),
+            "queue_wait_ms": self.queue_wait_ms.get_stats()
+        }
+
+# Every batcher created by `get_micro_batcher`, by name
+_batchers: Dict[str, MicroBatcher] = {}
+_batchers_lock = threading.Lock()
+
+def get_micro_batcher(name: str, batch_fn: Callable[[List[Any]], List[Any]]) -> MicroBatcher:
+    """
+    Returns the process-wide batcher for `name`, creating it on first use with the
+    configured window (MICRO_BATCH_WAIT_MS, overridable per batcher name in MICRO_BATCH_WINDOWS_MS).
+    """
+    with _batchers_lock:
+        if name not in _batchers:
+            _batchers[name] = MicroBatcher(
+                name,
+                batch_fn,
+                max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+                max_wait_ms=settings.MICRO_BATCH_WINDOWS_MS.get(name, settings.MICRO_BATCH_WAIT_MS)
+            )
+        return _batchers[name]
+
+def get_batcher_stats() -> List[Dict[str, Any]]:
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+    return [batcher.get_stats() for batcher in batchers]
@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def _weights_bytes(obj: Any) -> int:
+    """Bytes held by torch parameters and buffers of a model, pipeline or tuple of them."""
+    if isinstance(obj, (tuple, list)):
+        return sum(_weights_bytes(item) for item in obj)
+    model = getattr(obj, "model", obj) # Pipelines wrap the model
+    total = 0
+    for attr in ("parameters", "buffers"):
+        tensors = getattr(model, attr, None)
+        if callable(tensors):
+            try:
+                total += sum(t.numel() * t.element_size() for t in tensors())
+            except Exception:
+                pass
+    return total
+
+class ModelRegistry:
+    """
+    Process-wide registry of ML models.
+
+    Each model is registered with a zero-argument loader and is loaded once, on
+    first use (or during warm-up). Concurrent first uses wait on a per-model lock
+    so the loader never runs twice. Failed loads are remembered and return None
+    until `reload` is called.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Registers a loader. Re-registering an existing name is a no-op."""
+        with self._registry_lock:
+            if name not in self._loaders:
+                self._loaders[name] = loader
+                self._locks[name] = threading.Lock()
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def get(self, name: str) -> Optional[Any]:
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._loaders:
+            raise KeyError(f"Model '{name}' is not registered.")
+
+        with self._locks[name]:
+            if name in self._instances:
+                return self._instances[name]
+            if name in self._errors:
+                return None
+
+            logger.info(f"Loading model '{name}'...")
+            start = time.perf_counter()
+            try:
+                instance = self._loaders[name]()
+            except Exception as e:
+                logger.error(f"Error loading model '{name}': {e}", exc_info=True)
+                self._errors[name] = str(e)
+                return None
+
+            load_seconds = time.perf_counter() - start
+            self._instances[name] = instance
+            self._stats[name] = {
+                "load_seconds": round(load_seconds, 3),
+                "weights_bytes": _weights_bytes(instance),
+                "loaded_at": time.time()
+            }
+            logger.info(f"Model '{name}' loaded in {load_seconds:.2f}s.")
+            return instance
+
+    def reload(self, name: str) -> Optional[Any]:
+        """Drops a loaded (or failed) model and loads it again."""
+        with self._locks[name]:
+            self._instances.pop(name, None)
+            self._errors.pop(name, None)
+        return self.get(name)
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """Loads the given (default: all registered) models. Returns the names that loaded."""
+        names = list(names) if names is not None else list(self._loaders)
+        return [name for name in names if self.get(name) is not None]
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": name,
+                "loaded": name in self._instances,
+                "error": self._errors.get(name),
+                **self._stats.get(name, {})
+            }
+            for name in self._loaders
+        ]
+
+# Global instance
+model_registry = ModelRegistry()
@@ -0,0 +1,120 @@
+import re
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Set
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_WORD_RE = re.compile(r"\w+")
+
+class NearDuplicateDetector:
+    """
+    Collapses near-duplicate articles (syndicated copies of the same story) using
+    word shingles, MinHash signatures and LSH banding.
+
+    `num_perm` hash functions are split into `bands` bands; two articles become
+    candidates when any band matches, and are merged when their estimated Jaccard
+    similarity reaches `threshold`.
+    """
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 128, bands: int = 32,
+                 shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands}).")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # a < 2^31 and shingle hashes < 2^32 keep a * x + b below 2^64
+        self._a = rng.randint(1, 2 ** 31 - 1, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 2 ** 31 - 1, size=num_perm).astype(np.uint64)
+
+    def shingles(self, text: str) -> Set[int]:
+        words = _WORD_RE.findall(text.lower())
+        if not words:
+            return set()
+        k = min(self.shingle_size, len(words))
+        return {
+            zlib.crc32(" ".join(words[i:i + k]).encode("utf-8"))
+            for i in range(len(words) - k + 1)
+        }
+
+    def signature(self, shingles: Set[int]) -> np.ndarray:
+        x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        hashes = (self._a[:, None] * x[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return hashes.min(axis=1)
+
+    def similarity(self, sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float(np.mean(sig_a == sig_b))
+
+    def find_clusters(self, texts: List[str]) -> List[List[int]]:
+        """Groups text indices into clusters of near-duplicates, in first-seen order."""
+        parent = list(range(len(texts)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        signatures: Dict[int, np.ndarray] = {}
+        for i, text in enumerate(texts):
+            shingles = self.shingles(text)
+            if shingles:
+                signatures[i] = self.signature(shingles)
+
+        buckets: Dict[Any, List[int]] = defaultdict(list)
+        for i, sig in signatures.items():
+            for band in range(self.bands):
+                band_key = (band, sig[band * self.rows:(band + 1) * self.rows].tobytes())
+                buckets[band_key].append(i)
+
+        checked = set()
+        for members in buckets.values():
+            for pos, i in enumerate(members):
+                for j in members[pos + 1:]:
+                    if (i, j) in checked:
+                        continue
+                    checked.add((i, j))
+                    if find(i) != find(j) and self.similarity(signatures[i], signatures[j]) >= self.threshold:
+                        parent[max(find(i), find(j))] = min(find(i), find(j))
+
+        clusters: Dict[int, List[int]] = defaultdict(list)
+        for i in range(len(texts)):
+            clusters[find(i)].append(i)
+        return sorted(clusters.values(), key=lambda c: c[0])
+
+def _source_name(article: Dict[str, Any]) -> str:
+    source = article.get('source')
+    if isinstance(source, dict):
+        return source.get('name') or 'Unknown'
+    return source or 'Unknown'
+
+def collapse_near_duplicates(articles: List[Dict[str, Any]], detector: NearDuplicateDetector) -> List[Dict[str, Any]]:
+    """
+    Returns one canonical article per near-duplicate cluster (the first copy seen).
+    The canonical article gains 'sources' (every source that carried the story)
+    and 'duplicate_links' (URLs of the collapsed copies). Both are merged with what
+    the articles already carry, so collapsing again (e.g. a later batch against
+    articles collapsed earlier) only adds to them.
+    """
+    texts = [f"{a.get('title') or ''} {a.get('description') or ''}" for a in articles]
+    collapsed: List[Dict[str, Any]] = []
+    for cluster in detector.find_clusters(texts):
+        canonical = articles[cluster[0]]
+        if len(cluster) > 1:
+            copies = [articles[i] for i in cluster]
+            sources = [name for a in copies for name in (a.get('sources') or [_source_name(a)])]
+            links = list(canonical.get('duplicate_links', []))
+            for copy in copies[1:]:
+                link = copy.get('link', copy.get('url'))
+                links.extend(([link] if link else []) + copy.get('duplicate_links', []))
+            canonical_link = canonical.get('link', canonical.get('url'))
+            canonical['sources'] = list(dict.fromkeys(sources))
+            canonical['duplicate_links'] = [link for link in dict.fromkeys(links) if link != canonical_link]
+        collapsed.append(canonical)
+    return collapsed
@@ -1,7 +1,10 @@
+import asyncio
+import heapq
 import requests
+import httpx
 import nltk
 from nltk.sentiment import SentimentIntensityAnalyzer
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import time
 from pycoingecko import CoinGeckoAPI
 import json
@@ -11,7 +14,7 @@ from datetime import datetime
 import random
 from sklearn.metrics import pairwise_distances_argmin_min
 
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List
 import feedparser # Added import
 import time # For parsing published_at if needed
 from datetime import timezone # For timezone aware datetime objects
@@ -23,7 +26,16 @@ from core.agents.agent_base import AgentBase
 # from core.utils.secrets_utils import get_api_key
 
 import torch # Added import
-from transformers import AutoTokenizer, AutoModelForSequenceClassification # Added import
+from transformers import AutoTokenizer # Added import
+
+from app.core.batch_inference import BatchedSequenceClassifier
+from app.core.inference_cache import inference_cache, model_revision
+from app.core.portfolio_matcher import PortfolioMatcher
+from app.core.dedupe_store import RotatingDedupeStore
+from app.core.near_duplicates import NearDuplicateDetector, collapse_near_duplicates
+from app.core.model_registry import model_registry
+from app.core.inference_backend import load_model, resolve_backend
+from app.core.provider_guard import provider_guards, ProviderUnavailableError
 
 # Initialize NLTK sentiment analyzer - REMOVED
 # try:
@@ -33,7 +45,25 @@ from transformers import AutoTokenizer, AutoModelForSequenceClassification # Add
 # sia = SentimentIntensityAnalyzer() - REMOVED
 
 import nltk # Added import for sentence tokenization in summarizer fallback
-from transformers import AutoModelForSeq2SeqLM # Added import for summarization model
+
+FINBERT_MODEL_NAME = "ProsusAI/finbert"
+SUMMARIZER_MODEL_NAME = "sshleifer/distilbart-cnn-12-6" # Using a smaller model due to space constraints
+
+def _load_finbert():
+    tokenizer = AutoTokenizer.from_pretrained(FINBERT_MODEL_NAME)
+    model = load_model(FINBERT_MODEL_NAME, "sequence-classification")
+    print(f"FinBERT model ({FINBERT_MODEL_NAME}) loaded successfully with '{resolve_backend()}' backend.")
+    return tokenizer, model
+
+def _load_summarizer():
+    tokenizer = AutoTokenizer.from_pretrained(SUMMARIZER_MODEL_NAME)
+    model = load_model(SUMMARIZER_MODEL_NAME, "seq2seq-lm")
+    print(f"Summarization model ({SUMMARIZER_MODEL_NAME}) loaded successfully with '{resolve_backend()}' backend.")
+    return tokenizer, model
+
+# Models are shared by every NewsBot in the process and loaded on first use
+model_registry.register(FINBERT_MODEL_NAME, _load_finbert)
+model_registry.register(SUMMARIZER_MODEL_NAME, _load_summarizer)
 
 # Define the "NewsBot" class, now inheriting from AgentBase
 class NewsBot(AgentBase):
@@ -51,7 +81,8 @@ class NewsBot(AgentBase):
         self.user_preferences = self.config.get('user_preferences', {})
         self.news_api_key = self.config.get('news_api_key', None)
         self.search_api_key = self.config.get('search_api_key', None) # Added search_api_key
-        self.portfolio = self.config.get('portfolio', {})
+        self.portfolio_aliases = self.config.get('portfolio_aliases', {}) # symbol -> list of aliases
+        self.portfolio = self.config.get('portfolio', {}) # Also builds the portfolio matcher
         self.user_api_sources = self.config.get('user_api_sources', [])
         
         if not self.news_api_key:
@@ -64,36 +95,108 @@ class NewsBot(AgentBase):
         self.user_interactions: Dict[str, int] = defaultdict(int)
         self.custom_news_sources = self.load_custom_sources()
 
-        # Load FinBERT model and tokenizer
-        self.finbert_tokenizer = None
-        self.finbert_model = None
-        self.summarizer_tokenizer = None
-        self.summarizer_model = None
-        self.seen_alert_urls = set() # For tracking alerted articles in the current session
+        # Concurrent fan-out settings (used by aggregate_news_async)
+        self.concurrent_fetch = self.config.get('concurrent_fetch', False)
+        self.source_timeout_seconds = self.config.get('source_timeout_seconds', 5.0)
+        self.cycle_deadline_seconds = self.config.get('cycle_deadline_seconds', 10.0)
+        self.max_connections = self.config.get('max_connections', 20)
+        self._http_client: Optional[httpx.AsyncClient] = None # Shared pooled client, created lazily
+
+        # Streaming mode: execute_stream yields articles and alerts as sources return
+        self.stream_execution = self.config.get('stream_execution', False)
+        self.stream_batch_size = self.config.get('stream_batch_size', self.config.get('inference_max_batch_size', 32))
+
+        # Incremental mode: per-source watermarks, seen articles and the last summary
+        self.incremental = self.config.get('incremental_monitoring', False)
+        self.summary_top_k = self.config.get('summary_top_k', 5)
+        self.incremental_feed_limit = self.config.get('incremental_feed_limit', 500)
+        self.incremental_seen_limit = self.config.get('incremental_seen_limit', 10000)
+        self.source_watermarks: Dict[str, Dict[str, Any]] = {} # source key -> {'etag', 'modified', 'published_at'}
+        self._seen_article_keys: "OrderedDict[str, None]" = OrderedDict()
+        self._last_summary: Optional[str] = None
+        self._last_summary_keys: Optional[frozenset] = None
+
+        # FinBERT and the summarizer come from the shared model registry (see properties below)
+        self.finbert_model_name = FINBERT_MODEL_NAME
+        self.summarizer_model_name = SUMMARIZER_MODEL_NAME
+        self._finbert_engine: Optional[BatchedSequenceClassifier] = None
+
+        # Near-duplicate (syndicated copy) collapsing before scoring
+        self.collapse_duplicates = self.config.get('collapse_near_duplicates', True)
+        self.duplicate_detector = NearDuplicateDetector(
+            threshold=self.config.get('near_duplicate_threshold', 0.7),
+            num_perm=self.config.get('minhash_num_perm', 128),
+            bands=self.config.get('lsh_bands', 32),
+            shingle_size=self.config.get('shingle_size', 3)
+        )
+
+        # Alerted article keys, remembered for a TTL window and across restarts
+        self.alert_dedupe = RotatingDedupeStore(
+            path=self.config.get('alert_dedupe_path', ".cache/newsbot_alerts.log"),
+            ttl_seconds=self.config.get('alert_dedupe_ttl_hours', 24) * 3600,
+            capacity_per_slot=self.config.get('alert_dedupe_capacity', 10000),
+            false_positive_rate=self.config.get('alert_dedupe_false_positive_rate', 0.001)
+        )
+
+        if self.config.get('warm_up_models', False):
+            model_registry.warm_up([self.finbert_model_name, self.summarizer_model_name])
+
+    # --- Shared models (loaded lazily through model_registry) ---
+
+    def _registry_part(self, model_name: str, index: int) -> Any:
+        loaded = model_registry.get(model_name) # (tokenizer, model) or None if loading failed
+        return loaded[index] if loaded else None
+
+    @property
+    def finbert_tokenizer(self) -> Any:
+        return self._registry_part(self.finbert_model_name, 0)
+
+    @property
+    def finbert_model(self) -> Any:
+        return self._registry_part(self.finbert_model_name, 1)
+
+    @property
+    def summarizer_tokenizer(self) -> Any:
+        return self._registry_part(self.summarizer_model_name, 0)
+
+    @property
+    def summarizer_model(self) -> Any:
+        return self._registry_part(self.summarizer_model_name, 1)
+
+    @property
+    def finbert_engine(self) -> Optional[BatchedSequenceClassifier]:
+        """Batched FinBERT scorer, built on first use. None if FinBERT could not be loaded."""
+        if self._finbert_engine is None and self.finbert_model is not None:
+            self._finbert_engine = BatchedSequenceClassifier(
+                self.finbert_tokenizer,
+                self.finbert_model,
+                max_batch_size=self.config.get('inference_max_batch_size', 32),
+                num_threads=self.config.get('inference_num_threads')
+            )
+        return self._finbert_engine
+
+    @property
+    def portfolio(self) -> Dict[str, Any]:
+        return self._portfolio
 
-        # Load FinBERT model and tokenizer
-        try:
-            model_name_finbert = "ProsusAI/finbert"
-            self.finbert_tokenizer = AutoTokenizer.from_pretrained(model_name_finbert)
-            self.finbert_model = AutoModelForSequenceClassification.from_pretrained(model_name_finbert)
-            print(f"FinBERT model ({model_name_finbert}) loaded successfully.")
-        except Exception as e:
-            print(f"Error loading FinBERT model: {e}. Sentiment analysis will be impacted.")
+    @portfolio.setter
+    def portfolio(self, portfolio: Dict[str, Any]):
+        """Replaces the portfolio and recompiles the symbol matcher once."""
+        self._portfolio = portfolio or {}
+        self.portfolio_matcher = PortfolioMatcher(self._portfolio_symbols())
 
-        # Load Summarization model and tokenizer
-        try:
-            model_name_summarizer = "sshleifer/distilbart-cnn-12-6" # Using a smaller model due to space constraints
-            self.summarizer_tokenizer = AutoTokenizer.from_pretrained(model_name_summarizer)
-            self.summarizer_model = AutoModelForSeq2SeqLM.from_pretrained(model_name_summarizer)
-            print(f"Summarization model ({model_name_summarizer}) loaded successfully.")
-        except Exception as e:
-            print(f"Error loading Summarization model: {e}. Summarization will use fallback.")
-            # Ensure NLTK's punkt is available for fallback
-            try:
-                nltk.data.find('tokenizers/punkt')
-            except nltk.downloader.DownloadError:
-                print("NLTK 'punkt' not found. Downloading...")
-                nltk.download('punkt', quiet=True) # quiet=True to avoid verbose output if already there or successful
+    def _portfolio_symbols(self) -> Dict[str, List[str]]:
+        """
+        Flattens the portfolio into {symbol: aliases}. Accepts both the grouped shape
+        ({"stocks": ["AAPL"], "crypto": ["BTC"]}) and a flat {symbol: holding} mapping.
+        """
+        symbols: Dict[str, List[str]] = {}
+        for key, value in self._portfolio.items():
+            group = value if isinstance(value, (list, tuple, set)) else [key]
+            for symbol in group:
+                symbol = str(symbol)
+                symbols[symbol] = list(self.portfolio_aliases.get(symbol, []))
+        return symbols
 
     def load_custom_sources(self) -> Dict[str, str]:
         """Load custom news APIs provided by the user."""
@@ -146,125 +249,294 @@ class NewsBot(AgentBase):
 
         return filtered_news
 
+    # NewsAPI 'everything' queries keyed by user preference topic
+    NEWSAPI_URL = "https://newsapi.org/v2/everything"
+    NEWSAPI_TOPIC_QUERIES = {
+        'finance': 'finance',
+        'stocks': 'stocks',
+        'commodities': 'commodities',
+        'treasuries': 'treasury bonds',
+        'forex': 'forex',
+    }
+    COINGECKO_TRENDING_URL = "https://api.coingecko.com/api/v3/search/trending"
+    REUTERS_BUSINESS_RSS_URL = "http://feeds.reuters.com/reuters/businessNews"
+
+    # --- Incremental mode helpers ---
+
+    def _article_key(self, article: Dict[str, Any]) -> str:
+        """Stable identity for an article: its URL when present, otherwise its title."""
+        article_url = article.get('link', article.get('url'))
+        if article_url and isinstance(article_url, str) and article_url.strip():
+            return article_url
+        return article.get('title', 'No Title')
+
+    def _unseen(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Articles not seen in earlier cycles (the first of any that share a key). Marks nothing."""
+        unseen: List[Dict[str, Any]] = []
+        keys = set()
+        for article in articles:
+            key = self._article_key(article)
+            if key not in self._seen_article_keys and key not in keys:
+                keys.add(key)
+                unseen.append(article)
+        return unseen
+
+    def _mark_seen(self, article: Dict[str, Any]) -> bool:
+        """
+        Records an article (and any collapsed copies of it) as seen. Called once the
+        article has been scored, so one that fails to score is retried next cycle.
+        Returns True if it had not been seen before.
+        """
+        key = self._article_key(article)
+        is_new = key not in self._seen_article_keys
+        for seen_key in [key, *article.get('duplicate_links', [])]:
+            self._seen_article_keys[seen_key] = None
+            self._seen_article_keys.move_to_end(seen_key)
+        while len(self._seen_article_keys) > self.incremental_seen_limit:
+            self._seen_article_keys.popitem(last=False)
+        return is_new
+
+    def _conditional_headers(self, source_key: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers from the source's last response."""
+        headers: Dict[str, str] = {}
+        if not self.incremental:
+            return headers
+        watermark = self.source_watermarks.get(source_key, {})
+        if watermark.get('etag'):
+            headers['If-None-Match'] = watermark['etag']
+        if watermark.get('modified'):
+            headers['If-Modified-Since'] = watermark['modified']
+        return headers
+
+    def _update_validators(self, source_key: str, etag: Optional[str], modified: Optional[str]):
+        if not self.incremental:
+            return
+        watermark = self.source_watermarks.setdefault(source_key, {})
+        if etag:
+            watermark['etag'] = etag
+        if modified:
+            watermark['modified'] = modified
+
+    def _newsapi_params(self, query: str) -> Dict[str, Any]:
+        params = {
+            'q': query,
+            'apiKey': self.news_api_key,
+            'language': 'en',
+            'sortBy': 'relevancy'
+        }
+        # Only ask for articles published since the newest one already received
+        newest = self.source_watermarks.get(f"newsapi:{query}", {}).get('published_at')
+        if self.incremental and newest:
+            params['from'] = newest
+        return params
+
+    def _update_newsapi_watermark(self, query: str, articles: List[Dict[str, Any]]):
+        if not self.incremental:
+            return
+        published = [a.get('publishedAt') for a in articles if a.get('publishedAt')]
+        if published:
+            watermark = self.source_watermarks.setdefault(f"newsapi:{query}", {})
+            watermark['published_at'] = max(published + [watermark.get('published_at', '')])
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Returns the shared pooled HTTP client, creating it on first use."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=self.source_timeout_seconds,
+                follow_redirects=True
+            )
+        return self._http_client
+
+    async def aclose(self):
+        """Closes the shared HTTP client. Call when the agent is shut down."""
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        self._http_client = None
+
+    async def _fetch_json_async(self, url: str, params: Optional[Dict[str, Any]] = None,
+                                provider: Optional[str] = None) -> Any:
+        """GETs JSON; with a `provider`, the call goes through its rate limit, circuit breaker and retries."""
+        async def fetch() -> Any:
+            client = self._get_http_client()
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        if provider is None:
+            return await fetch()
+        return await provider_guards.get(provider).call_async(fetch)
+
+    async def _fetch_newsapi_async(self, query: str) -> List[Dict[str, Any]]:
+        data = await self._fetch_json_async(self.NEWSAPI_URL, params=self._newsapi_params(query), provider="newsapi")
+        articles = data.get('articles', [])
+        self._update_newsapi_watermark(query, articles)
+        return articles
+
+    async def _fetch_crypto_news_async(self) -> List[Dict[str, Any]]:
+        data = await self._fetch_json_async(self.COINGECKO_TRENDING_URL, provider="coingecko")
+        return self._parse_crypto_trending(data)
+
+    async def _fetch_reuters_rss_async(self) -> List[Dict[str, Any]]:
+        source_key = "rss:reuters"
+        client = self._get_http_client()
+        response = await client.get(self.REUTERS_BUSINESS_RSS_URL, headers=self._conditional_headers(source_key))
+        if response.status_code == 304: # Feed unchanged since the last cycle
+            return []
+        response.raise_for_status()
+        self._update_validators(source_key, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return self._parse_reuters_feed(feedparser.parse(response.content))
+
+    async def _fetch_custom_news_async(self, api_url: str) -> List[Dict[str, Any]]:
+        source_key = f"custom:{api_url}"
+        client = self._get_http_client()
+        response = await client.get(api_url, headers=self._conditional_headers(source_key))
+        if response.status_code == 304:
+            return []
+        response.raise_for_status()
+        self._update_validators(source_key, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response.json().get('articles', [])
+
+    def _build_source_jobs(self) -> Dict[str, Any]:
+        """Builds one coroutine per enabled source, keyed by a readable source name."""
+        topics = self.user_preferences.get('topics', [])
+        jobs: Dict[str, Any] = {}
+
+        if 'crypto' in topics:
+            jobs['CoinGecko Trending'] = self._fetch_crypto_news_async()
+
+        if self.news_api_key:
+            for topic, query in self.NEWSAPI_TOPIC_QUERIES.items():
+                if topic in topics:
+                    jobs[f"NewsAPI ({topic})"] = self._fetch_newsapi_async(query)
+
+        jobs['Reuters Business News'] = self._fetch_reuters_rss_async()
+
+        for source_name, source_url in self.custom_news_sources.items():
+            jobs[f"Custom ({source_name})"] = self._fetch_custom_news_async(source_url)
+
+        return jobs
+
+    async def aggregate_news_async(self) -> List[Dict[str, Any]]:
+        """
+        Aggregates news from all enabled sources concurrently over a shared pooled HTTP client.
+
+        Each source is bounded by 'source_timeout_seconds' and the whole cycle by
+        'cycle_deadline_seconds'. Sources that fail or miss the deadline are skipped,
+        so the result may be partial.
+
+        Returns:
+            list: Aggregated news articles filtered by portfolio.
+        """
+        jobs = self._build_source_jobs()
+        tasks = {
+            asyncio.create_task(asyncio.wait_for(coro, timeout=self.source_timeout_seconds)): name
+            for name, coro in jobs.items()
+        }
+        if not tasks:
+            return []
+
+        done, pending = await asyncio.wait(tasks.keys(), timeout=self.cycle_deadline_seconds)
+
+        for task in pending:
+            task.cancel()
+            print(f"Warning: source '{tasks[task]}' missed the {self.cycle_deadline_seconds}s cycle deadline. Skipping.")
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        all_news: List[Dict[str, Any]] = []
+        # Iterate in job order so results are deterministic regardless of completion order
+        for task, name in tasks.items():
+            if task not in done:
+                continue
+            try:
+                all_news.extend(task.result())
+            except asyncio.TimeoutError:
+                print(f"Warning: source '{name}' timed out after {self.source_timeout_seconds}s. Skipping.")
+            except Exception as e:
+                print(f"Error fetching news from '{name}': {e}")
+
+        return self.filter_news_by_portfolio(all_news)
+
+    def _get_newsapi_articles(self, query: str, label: str) -> List[Dict[str, Any]]:
+        """Runs one NewsAPI 'everything' query, honouring the incremental watermark."""
+        if not self.news_api_key: return []
+        def fetch() -> requests.Response:
+            response = requests.get(self.NEWSAPI_URL, params=self._newsapi_params(query), timeout=self.source_timeout_seconds)
+            response.raise_for_status() # Raise an exception for HTTP errors
+            return response
+
+        try:
+            response = provider_guards.get("newsapi").call(fetch)
+            articles = response.json().get('articles', [])
+            self._update_newsapi_watermark(query, articles)
+            return articles
+        except ProviderUnavailableError as e:
+            print(f"Skipping {label} news from NewsAPI: {e}")
+            return []
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching {label} news from NewsAPI: {e}")
+            return []
+
     def get_crypto_news(self) -> List[Dict[str, Any]]: # Added return type hint
         """Fetch cryptocurrency news using the CoinGeckoAPI."""
         try:
             # Assuming get_trending_searches returns a list of dicts or similar
             # The original pycoingecko might return a more complex structure.
             # This is a simplification.
-            trending_searches = self.cg.get_trending_searches() # Removed language='en' as it's not a standard param
-            # Convert trending searches to a news-like format if necessary
-            news_items = []
-            if isinstance(trending_searches, dict) and 'coins' in trending_searches:
-                for coin_info in trending_searches['coins']:
-                    item = coin_info.get('item', {})
-                    news_items.append({
-                        'title': f"Trending: {item.get('name', 'Unknown Coin')} ({item.get('symbol', '')})",
-                        'description': f"Market Cap Rank: {item.get('market_cap_rank', 'N/A')}, Score: {item.get('score', 'N/A')}",
-                        'source': {'name': 'CoinGecko Trending'},
-                        'url': f"https://www.coingecko.com/en/coins/{item.get('id', '')}" if item.get('id') else None
-                    })
-            return news_items
+            trending_searches = provider_guards.get("coingecko").call(self.cg.get_trending_searches) # Removed language='en' as it's not a standard param
+            return self._parse_crypto_trending(trending_searches)
         except Exception as e:
             print(f"Error fetching crypto news from CoinGecko: {e}")
             return []
 
+    def _parse_crypto_trending(self, trending_searches: Any) -> List[Dict[str, Any]]:
+        """Converts a CoinGecko trending payload to a news-like format."""
+        news_items = []
+        if isinstance(trending_searches, dict) and 'coins' in trending_searches:
+            for coin_info in trending_searches['coins']:
+                item = coin_info.get('item', {})
+                news_items.append({
+                    'title': f"Trending: {item.get('name', 'Unknown Coin')} ({item.get('symbol', '')})",
+                    'description': f"Market Cap Rank: {item.get('market_cap_rank', 'N/A')}, Score: {item.get('score', 'N/A')}",
+                    'source': {'name': 'CoinGecko Trending'},
+                    'url': f"https://www.coingecko.com/en/coins/{item.get('id', '')}" if item.get('id') else None
+                })
+        return news_items
+
 
     def get_finance_news(self) -> List[Dict[str, Any]]: # Added return type hint
         """Fetch general finance news using NewsAPI."""
-        if not self.news_api_key: return []
-        url = "https://newsapi.org/v2/everything"
-        params = {
-            'q': 'finance',
-            'apiKey': self.news_api_key,
-            'language': 'en',
-            'sortBy': 'relevancy'
-        }
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status() # Raise an exception for HTTP errors
-            return response.json().get('articles', [])
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching finance news from NewsAPI: {e}")
-            return []
+        return self._get_newsapi_articles('finance', 'finance')
 
     def get_stock_news(self) -> List[Dict[str, Any]]: # Added return type hint
         """Fetch stock-related news using an API or data source."""
-        if not self.news_api_key: return []
-        url = "https://newsapi.org/v2/everything"
-        params = {
-            'q': 'stocks',
-            'apiKey': self.news_api_key,
-            'language': 'en',
-            'sortBy': 'relevancy'
-        }
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json().get('articles', [])
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching stock news from NewsAPI: {e}")
-            return []
+        return self._get_newsapi_articles('stocks', 'stock')
 
     def get_commodities_news(self) -> List[Dict[str, Any]]: # Added return type hint
         """Fetch commodities-related news (gold, oil, etc.)."""
-        if not self.news_api_key: return []
-        url = "https://newsapi.org/v2/everything"
-        params = {
-            'q': 'commodities',
-            'apiKey': self.news_api_key,
-            'language': 'en',
-            'sortBy': 'relevancy'
-        }
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json().get('articles', [])
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching commodities news from NewsAPI: {e}")
-            return []
+        return self._get_newsapi_articles('commodities', 'commodities')
 
     def get_treasuries_news(self) -> List[Dict[str, Any]]: # Added return type hint
         """Fetch treasury bond-related news."""
-        if not self.news_api_key: return []
-        url = "https://newsapi.org/v2/everything"
-        params = {
-            'q': 'treasury bonds',
-            'apiKey': self.news_api_key,
-            'language': 'en',
-            'sortBy': 'relevancy'
-        }
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json().get('articles', [])
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching treasuries news from NewsAPI: {e}")
-            return []
+        return self._get_newsapi_articles('treasury bonds', 'treasuries')
 
     def get_forex_news(self) -> List[Dict[str, Any]]: # Added return type hint
         """Fetch foreign exchange news."""
-        if not self.news_api_key: return []
-        url = "https://newsapi.org/v2/everything"
-        params = {
-            'q': 'forex',
-            'apiKey': self.news_api_key,
-            'language': 'en',
-            'sortBy': 'relevancy'
-        }
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json().get('articles', [])
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching forex news from NewsAPI: {e}")
-            return []
+        return self._get_newsapi_articles('forex', 'forex')
 
     def get_custom_news(self, api_url: str) -> List[Dict[str, Any]]: # Added type hints
         """Fetch custom news from user-provided sources."""
+        source_key = f"custom:{api_url}"
         try:
-            response = requests.get(api_url)
+            response = requests.get(api_url, headers=self._conditional_headers(source_key), timeout=self.source_timeout_seconds)
+            if response.status_code == 304: # Unchanged since the last cycle
+                return []
             response.raise_for_status()
+            self._update_validators(source_key, response.headers.get('ETag'), response.headers.get('Last-Modified'))
             return response.json().get('articles', [])
         except requests.exceptions.RequestException as e:
             print(f"Error fetching custom news from {api_url}: {e}")
@@ -275,33 +547,47 @@ class NewsBot(AgentBase):
 
     def get_reuters_business_news_rss(self) -> List[Dict[str, Any]]:
         """Fetches and parses Reuters Business News RSS feed."""
-        feed_url = "http://feeds.reuters.com/reuters/businessNews"
         news_items: List[Dict[str, Any]] = []
         try:
-            feed = feedparser.parse(feed_url)
-            for entry in feed.entries:
-                # Ensure published_parsed is available and convert to ISO format
-                published_at = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    # Create a datetime object, assuming UTC if no timezone info
-                    dt_object = datetime.fromtimestamp(time.mktime(entry.published_parsed), tz=timezone.utc)
-                    published_at = dt_object.isoformat()
-                elif hasattr(entry, 'updated_parsed') and entry.updated_parsed: # Fallback to updated
-                    dt_object = datetime.fromtimestamp(time.mktime(entry.updated_parsed), tz=timezone.utc)
-                    published_at = dt_object.isoformat()
-
-                news_items.append({
-                    'title': entry.title if hasattr(entry, 'title') else 'No Title',
-                    'description': entry.summary if hasattr(entry, 'summary') else 'No Description',
-                    'link': entry.link if hasattr(entry, 'link') else '',
-                    'published_at': published_at,
-                    'source': {'name': 'Reuters Business News'}
-                })
+            source_key = "rss:reuters"
+            watermark = self.source_watermarks.get(source_key, {}) if self.incremental else {}
+            feed = feedparser.parse(
+                self.REUTERS_BUSINESS_RSS_URL,
+                etag=watermark.get('etag'),
+                modified=watermark.get('modified')
+            )
+            if feed.get('status') == 304: # Feed unchanged since the last cycle
+                return []
+            self._update_validators(source_key, feed.get('etag'), feed.get('modified'))
+            news_items = self._parse_reuters_feed(feed)
         except Exception as e:
             print(f"Error fetching or parsing Reuters RSS feed: {e}")
             # Optionally, log the error more formally or raise it depending on desired handling
         return news_items
 
+    def _parse_reuters_feed(self, feed: Any) -> List[Dict[str, Any]]:
+        """Converts parsed Reuters feed entries to the article dict format."""
+        news_items: List[Dict[str, Any]] = []
+        for entry in feed.entries:
+            # Ensure published_parsed is available and convert to ISO format
+            published_at = None
+            if hasattr(entry, 'published_parsed') and entry.published_parsed:
+                # Create a datetime object, assuming UTC if no timezone info
+                dt_object = datetime.fromtimestamp(time.mktime(entry.published_parsed), tz=timezone.utc)
+                published_at = dt_object.isoformat()
+            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed: # Fallback to updated
+                dt_object = datetime.fromtimestamp(time.mktime(entry.updated_parsed), tz=timezone.utc)
+                published_at = dt_object.isoformat()
+
+            news_items.append({
+                'title': entry.title if hasattr(entry, 'title') else 'No Title',
+                'description': entry.summary if hasattr(entry, 'summary') else 'No Description',
+                'link': entry.link if hasattr(entry, 'link') else '',
+                'published_at': published_at,
+                'source': {'name': 'Reuters Business News'}
+            })
+        return news_items
+
     def filter_news_by_portfolio(self, news_articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]: # Added type hints
         """
         Filters news articles based on portfolio holdings (stocks, crypto, etc.).
@@ -318,76 +604,104 @@ class NewsBot(AgentBase):
             description = article.get('description', '')
             if not title and not description: # Skip if no content to check
                 continue
-            for symbol in self.portfolio:
-                if symbol.lower() in title.lower() or symbol.lower() in description.lower():
-                    filtered_news.append(article)
-                    break
+            if self.portfolio_matcher.match_article(article):
+                filtered_news.append(article)
         return filtered_news
 
-    def analyze_sentiment(self, article: Dict[str, Any]) -> float:
-        """Analyze the sentiment of a news article using FinBERT."""
-        text = article.get('title', '') + " " + article.get('description', '')
-        if not text.strip():
-            return 0.0
-
-        if not self.finbert_tokenizer or not self.finbert_model:
-            print("FinBERT model not available. Skipping sentiment analysis.")
-            return 0.0 # Neutral score if model isn't loaded
+    def _article_text(self, article: Dict[str, Any]) -> str:
+        return article.get('title', '') + " " + article.get('description', '')
 
-        try:
-            inputs = self.finbert_tokenizer(text, return_tensors="pt", truncation=True, max_length=512, padding=True)
-
-            with torch.no_grad(): # Disable gradient calculations for inference
-                outputs = self.finbert_model(**inputs)
+    def _sentiment_from_probs(self, probs: List[float]) -> float:
+        """
+        Maps FinBERT class probabilities to a discrete sentiment score.
 
-            probs = torch.softmax(outputs.logits, dim=-1)
+        For "ProsusAI/finbert", the labels are ['positive', 'negative', 'neutral'],
+        so probs[0] is positive, probs[1] is negative and probs[2] is neutral.
+        """
+        positive_prob, negative_prob, neutral_prob = probs[0], probs[1], probs[2]
 
-            # FinBERT typically has labels: 0 for positive, 1 for negative, 2 for neutral
-            # Or it might be ['positive', 'negative', 'neutral'] depending on model config.
-            # Let's assume the order is positive, negative, neutral from common FinBERT usage.
-            # Verify this with model.config.id2label if available and necessary.
-            # For "ProsusAI/finbert", the labels are ['positive', 'negative', 'neutral']
-            # So, probs[0][0] is positive, probs[0][1] is negative, probs[0][2] is neutral.
+        if positive_prob > negative_prob and positive_prob > neutral_prob:
+            return 1.0  # Positive
+        elif negative_prob > positive_prob and negative_prob > neutral_prob:
+            return -1.0 # Negative
+        else:
+            return 0.0  # Neutral
 
-            positive_prob = probs[0][0].item()
-            negative_prob = probs[0][1].item()
-            neutral_prob = probs[0][2].item()
+    def score_sentiments(self, articles: List[Dict[str, Any]]) -> List[float]:
+        """
+        Scores the sentiment of many articles with one batched FinBERT pass.
 
-            if positive_prob > negative_prob and positive_prob > neutral_prob:
-                return 1.0  # Positive
-            elif negative_prob > positive_prob and negative_prob > neutral_prob:
-                return -1.0 # Negative
-            else:
-                return 0.0  # Neutral
+        Returns:
+            list: One sentiment score per article, in input order.
+        """
+        scores = [0.0] * len(articles)
+        if not self.finbert_engine:
+            if articles:
+                print("FinBERT model not available. Skipping sentiment analysis.")
+            return scores # Neutral scores if model isn't loaded
+
+        # Empty articles stay neutral and are not sent to the model
+        indexed_texts = [(i, self._article_text(a)) for i, a in enumerate(articles)]
+        indexed_texts = [(i, text) for i, text in indexed_texts if text.strip()]
+        if not indexed_texts:
+            return scores
 
+        try:
+            # Headlines repeat across polling cycles, so only cache misses reach the model
+            probs = inference_cache.get_or_compute(
+                self.finbert_model_name,
+                [text for _, text in indexed_texts],
+                self.finbert_engine.predict_proba,
+                revision=model_revision(self.finbert_model)
+            )
+            for (i, _), article_probs in zip(indexed_texts, probs):
+                scores[i] = self._sentiment_from_probs(article_probs)
         except Exception as e:
-            print(f"Error during FinBERT sentiment analysis: {e}")
-            return 0.0 # Return neutral on error
+            print(f"Error during batched FinBERT sentiment analysis: {e}")
+        return scores
+
+    def analyze_sentiment(self, article: Dict[str, Any]) -> float:
+        """Analyze the sentiment of a news article using FinBERT."""
+        return self.score_sentiments([article])[0]
 
-    def analyze_impact(self, article: Dict[str, Any]) -> float:
+    def analyze_impact(self, article: Dict[str, Any], sentiment_score: Optional[float] = None) -> float:
         """
         Calculates an 'impact score' based on sentiment, portfolio relevance, and topic.
         
         Args:
             article (dict): The news article to evaluate.
+            sentiment_score (float, optional): Precomputed sentiment score. Computed with FinBERT if omitted.
         
         Returns:
             float: The impact score of the article.
         """
-        sentiment_score = self.analyze_sentiment(article)
-        portfolio_relevance = 0
-        title = article.get('title', '')
-        description = article.get('description', '')
+        if sentiment_score is None:
+            sentiment_score = self.analyze_sentiment(article)
 
-        # Increase impact score if it matches portfolio holdings
-        for symbol in self.portfolio:
-            if symbol.lower() in title.lower() or symbol.lower() in description.lower():
-                portfolio_relevance += 1
+        # Increase impact score by the number of distinct portfolio holdings mentioned
+        portfolio_relevance = len(self.portfolio_matcher.match_article(article))
         
         # Normalize the score
         impact_score = sentiment_score * (1 + portfolio_relevance) # Add 1 to give base sentiment some weight
         return impact_score
 
+    def collapse_duplicates_in_feed(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Collapses syndicated copies of the same story into one article before scoring."""
+        if not self.collapse_duplicates or len(articles) < 2:
+            return articles
+        collapsed = collapse_near_duplicates(articles, self.duplicate_detector)
+        if len(collapsed) < len(articles):
+            print(f"Collapsed {len(articles) - len(collapsed)} near-duplicate articles.")
+        return collapsed
+
+    def _score_articles(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Stores 'sentiment_score' and 'impact_score' on each article (one batched FinBERT pass)."""
+        sentiment_scores = self.score_sentiments(articles)
+        for article, sentiment_score in zip(articles, sentiment_scores):
+            article['sentiment_score'] = sentiment_score
+            article['impact_score'] = self.analyze_impact(article, sentiment_score=sentiment_score)
+        return articles
+
     def personalize_feed(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]: # Added type hints
         """
         Personalizes the news feed based on user preferences and sentiment analysis.
@@ -398,14 +712,8 @@ class NewsBot(AgentBase):
         Returns:
             list: Personalized and ranked news articles.
         """
-        personalized_articles: List[Dict[str, Any]] = [] # Added type hint
-
-        # Rank articles based on sentiment analysis and impact score
-        for article in articles:
-            impact_score = self.analyze_impact(article)
-            article['impact_score'] = impact_score # Storing it in the article dict
-            article['sentiment_score'] = self.analyze_sentiment(article) # Storing it
-            personalized_articles.append(article)
+        # One batched FinBERT pass feeds both the sentiment and impact scores
+        personalized_articles = list(self._score_articles(articles))
 
         # Sort articles by impact score (highest to lowest)
         personalized_articles.sort(key=lambda x: x.get('impact_score', 0), reverse=True)
@@ -448,14 +756,11 @@ class NewsBot(AgentBase):
                 alert_worthy_articles_in_batch.append(article)
                 # Use a more robust check for article_url's presence and content
                 if article_url and isinstance(article_url, str) and article_url.strip():
-                    if article_url not in self.seen_alert_urls:
+                    if self.alert_dedupe.add(article_url):
                         print(f"ALERT: {alert_type} - {title}\nScore: {impact_score:.2f}\nLink: {article_url}")
-                        self.seen_alert_urls.add(article_url)
                 else: # If no valid URL, alert based on title (might lead to duplicates if titles aren't unique)
-                    temp_article_id = title
-                    if temp_article_id not in self.seen_alert_urls:
+                    if self.alert_dedupe.add(title):
                          print(f"ALERT (no URL): {alert_type} - {title}\nScore: {impact_score:.2f}")
-                         self.seen_alert_urls.add(temp_article_id)
 
         return alert_worthy_articles_in_batch
 
@@ -469,29 +774,184 @@ class NewsBot(AgentBase):
         """
         print(f"NewsBot executing cycle at {datetime.now(timezone.utc).isoformat()}")
 
-        news_articles = self.aggregate_news()
-        personalized_feed = self.personalize_feed(news_articles)
-
-        self.send_alerts(personalized_feed)
+        if self.concurrent_fetch:
+            news_articles = await self.aggregate_news_async()
+        else:
+            news_articles = self.aggregate_news()
+        news_articles = self.collapse_duplicates_in_feed(news_articles)
+
+        if self.incremental:
+            # Only articles not seen in earlier cycles are scored and alerted on
+            new_articles = self.personalize_feed(self._unseen(news_articles))
+            for article in new_articles:
+                self._mark_seen(article)
+            self.send_alerts(new_articles)
+            personalized_feed = sorted(
+                new_articles + self.aggregated_news,
+                key=lambda x: x.get('impact_score', 0),
+                reverse=True
+            )[:self.incremental_feed_limit]
+        else:
+            new_articles = self.personalize_feed(news_articles)
+            self.send_alerts(new_articles)
+            personalized_feed = new_articles
 
         self.aggregated_news = personalized_feed
 
-        analysis_report = None
-        # Use a config flag to enable/disable reporting, defaulting to True for now
-        if self.config.get('enable_analysis_reporting', True) and personalized_feed:
-            summary = await self.summarize_articles(personalized_feed[:5])
-            critical_analysis = self.perform_critical_analysis(personalized_feed[:10])
-            actionable_insights = self.draw_conclusions(critical_analysis)
-            analysis_report = self.generate_report(personalized_feed[:5], summary, critical_analysis, actionable_insights)
-            # Removed automatic printing of report from here to avoid clutter during monitoring.
-            # It will be printed by the standalone runner if requested.
         return {
             'personalized_feed': personalized_feed,
-            'analysis_report': analysis_report
+            'new_articles': new_articles,
+            'analysis_report': await self._build_analysis_report(personalized_feed)
+        }
+
+    async def _build_analysis_report(self, personalized_feed: List[Dict[str, Any]]) -> Optional[str]:
+        # Use a config flag to enable/disable reporting, defaulting to True for now
+        if not self.config.get('enable_analysis_reporting', True) or not personalized_feed:
+            return None
+        top_articles = personalized_feed[:self.summary_top_k]
+        summary = await self._summarize_top_articles(top_articles)
+        critical_analysis = self.perform_critical_analysis(personalized_feed[:10])
+        actionable_insights = self.draw_conclusions(critical_analysis)
+        # Not printed here to avoid clutter during monitoring; the standalone runner prints it if requested.
+        return self.generate_report(top_articles, summary, critical_analysis, actionable_insights)
+
+    def _collapse_into_cycle(self, cycle_articles: List[Dict[str, Any]], batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Collapses near-duplicates within a newly arrived batch and against articles already
+        streamed this cycle. Returns only the batch articles that are new stories; earlier
+        canonical articles absorb the copies' sources and links.
+        """
+        if not self.collapse_duplicates or not batch:
+            return batch
+        batch_ids = {id(a) for a in batch}
+        survivors = collapse_near_duplicates(cycle_articles + batch, self.duplicate_detector)
+        kept = [a for a in survivors if id(a) in batch_ids]
+        if len(kept) < len(batch):
+            print(f"Collapsed {len(batch) - len(kept)} near-duplicate articles.")
+        return kept
+
+    async def execute_stream(self, *args: Any, **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of `execute`. Sources are fetched concurrently and each one is
+        filtered, de-duplicated, scored (in batches of 'stream_batch_size') and alerted on
+        as soon as it returns, instead of after the slowest source.
+
+        Yields events:
+            {'type': 'article', 'source': name, 'article': ...} for every scored article,
+            {'type': 'alert', 'source': name, 'article': ...} for articles that meet alert thresholds,
+            {'type': 'source_error', 'source': name, 'error': ...} for failed or timed-out sources,
+            {'type': 'report', ...} last, with the same keys `execute` returns.
+
+        The feed is kept as a running top-K heap of 'incremental_feed_limit' articles.
+        """
+        print(f"NewsBot streaming cycle at {datetime.now(timezone.utc).isoformat()}")
+
+        # Min-heap of (impact_score, -sequence, article): the root is the article to drop first
+        feed_heap: List[Any] = []
+        sequence = 0
+
+        def push_to_feed(article: Dict[str, Any]):
+            nonlocal sequence
+            entry = (article.get('impact_score', 0), -sequence, article)
+            sequence += 1
+            if len(feed_heap) < self.incremental_feed_limit:
+                heapq.heappush(feed_heap, entry)
+            elif entry[:2] > feed_heap[0][:2]:
+                heapq.heapreplace(feed_heap, entry)
+
+        if self.incremental:
+            for article in self.aggregated_news:
+                push_to_feed(article)
+
+        jobs = self._build_source_jobs()
+        tasks = {
+            asyncio.create_task(asyncio.wait_for(coro, timeout=self.source_timeout_seconds)): name
+            for name, coro in jobs.items()
+        }
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.cycle_deadline_seconds
+        pending = set(tasks)
+        cycle_articles: List[Dict[str, Any]] = []
+        new_articles: List[Dict[str, Any]] = []
+
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks[task]
+                    try:
+                        fetched = task.result()
+                    except asyncio.TimeoutError:
+                        yield {'type': 'source_error', 'source': name, 'error': f"timed out after {self.source_timeout_seconds}s"}
+                        continue
+                    except Exception as e:
+                        yield {'type': 'source_error', 'source': name, 'error': str(e)}
+                        continue
+
+                    relevant = self.filter_news_by_portfolio(fetched)
+                    batch = self._collapse_into_cycle(cycle_articles, relevant)
+                    cycle_articles.extend(batch)
+                    if self.incremental:
+                        # Copies folded into an earlier article are seen too, or they come back as new next cycle
+                        kept = {id(a) for a in batch}
+                        for absorbed in relevant:
+                            if id(absorbed) not in kept:
+                                self._mark_seen(absorbed)
+                        batch = self._unseen(batch)
+
+                    for start in range(0, len(batch), self.stream_batch_size):
+                        chunk = batch[start:start + self.stream_batch_size]
+                        # Scoring runs off the event loop so other sources keep arriving meanwhile
+                        await asyncio.to_thread(self._score_articles, chunk)
+                        if self.incremental:
+                            for article in chunk:
+                                self._mark_seen(article)
+                        alerts = {id(a) for a in self.send_alerts(chunk)}
+                        for article in chunk:
+                            new_articles.append(article)
+                            push_to_feed(article)
+                            yield {'type': 'article', 'source': name, 'article': article}
+                            if id(article) in alerts:
+                                yield {'type': 'alert', 'source': name, 'article': article}
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        for task in pending:
+            yield {'type': 'source_error', 'source': tasks[task], 'error': f"missed the {self.cycle_deadline_seconds}s cycle deadline"}
+
+        personalized_feed = [entry[2] for entry in sorted(feed_heap, key=lambda e: (e[0], e[1]), reverse=True)]
+        self.aggregated_news = personalized_feed
+        new_articles.sort(key=lambda x: x.get('impact_score', 0), reverse=True)
+
+        yield {
+            'type': 'report',
+            'personalized_feed': personalized_feed,
+            'new_articles': new_articles,
+            'analysis_report': await self._build_analysis_report(personalized_feed)
         }
 
+    async def _summarize_top_articles(self, top_articles: List[Dict[str, Any]]) -> str:
+        """In incremental mode, reuses the previous summary while the top-K set is unchanged."""
+        if not self.incremental:
+            return await self.summarize_articles(top_articles)
+
+        top_keys = frozenset(self._article_key(a) for a in top_articles)
+        if self._last_summary is None or top_keys != self._last_summary_keys:
+            self._last_summary = await self.summarize_articles(top_articles)
+            self._last_summary_keys = top_keys
+        return self._last_summary
+
     async def monitor_for_critical_news(self, duration_minutes: int = 5, interval_seconds: int = 60) -> List[Dict[str, Any]]:
-        """Monitors for critical news updates for a specified duration and interval."""
+        """
+        Monitors for critical news updates for a specified duration and interval.
+        With 'incremental_monitoring' enabled, each cycle only scores articles not seen before.
+        """
         print(f"Starting news monitoring for {duration_minutes} minutes, checking every {interval_seconds} seconds.")
         # Using a dictionary to store unique articles by URL to avoid duplicates.
         all_critical_news_session: Dict[str, Dict[str, Any]] = {}
@@ -502,24 +962,35 @@ class NewsBot(AgentBase):
         while loop.time() < end_time:
             print(f"Monitoring... running news check at {datetime.now(timezone.utc).isoformat()}")
 
-            results_dict = await self.execute() # This already calls send_alerts internally
+            if self.stream_execution:
+                # Alerts fire as each source is scored; the final 'report' event carries the cycle results
+                results_dict = {}
+                async for event in self.execute_stream():
+                    if event['type'] == 'report':
+                        results_dict = event
+                    elif event['type'] == 'source_error':
+                        print(f"Warning: source '{event['source']}' skipped: {event['error']}")
+            else:
+                results_dict = await self.execute() # This already calls send_alerts internally
 
             # Identify articles that meet alerting criteria from the current batch
             alerting_thresholds = self.config.get('alerting_thresholds', {})
             positive_threshold = alerting_thresholds.get('positive_impact', 0.5)
             negative_threshold = alerting_thresholds.get('negative_impact', -0.5)
 
-            if results_dict.get('personalized_feed'):
-                for article in results_dict['personalized_feed']:
+            # Articles scored this cycle: everything in full mode, only unseen articles in incremental mode
+            if results_dict.get('new_articles'):
+                for article in results_dict['new_articles']:
                     impact_score = article.get('impact_score', 0.0) # Default to 0.0 if not present
                     if impact_score > positive_threshold or impact_score < negative_threshold:
-                        article_url = article.get('link', article.get('url'))
-                        # Ensure URL is valid and prefer it as key for uniqueness
-                        unique_key = article_url if (article_url and isinstance(article_url, str) and article_url.strip()) else article.get('title', str(random.random())) # Fallback key
+                        unique_key = self._article_key(article) # Prefer URL, fall back to title
 
                         if unique_key not in all_critical_news_session:
                             all_critical_news_session[unique_key] = article
 
+            # Drop expired alert keys so the dedupe store stays bounded in long sessions
+            self.alert_dedupe.expire()
+
             remaining_time = end_time - loop.time()
             if remaining_time > interval_seconds:
                 print(f"Monitoring... next check in {interval_seconds}s.")
@@ -529,7 +1000,7 @@ class NewsBot(AgentBase):
             else: # No time left
                 break
 
-        print("Monitoring finished.")
+        print(f"Monitoring finished. Alert dedupe store: {self.alert_dedupe.get_stats()}")
         return list(all_critical_news_session.values())
 
 
@@ -573,11 +1044,12 @@ class NewsBot(AgentBase):
             if text:
                 try:
                     # Ensure 'punkt' is downloaded for nltk.sent_tokenize
-                    # This check is also in __init__, but good to have here if that failed silently.
                     nltk.data.find('tokenizers/punkt')
                 except nltk.downloader.DownloadError:
-                    print("NLTK 'punkt' not found. Cannot perform fallback summarization.")
-                    return "Summarization fallback failed: NLTK 'punkt' missing."
+                    print("NLTK 'punkt' not found. Downloading...")
+                    if not nltk.download('punkt', quiet=True):
+                        print("NLTK 'punkt' could not be downloaded. Cannot perform fallback summarization.")
+                        return "Summarization fallback failed: NLTK 'punkt' missing."
 
                 sentences = nltk.sent_tokenize(text)
                 if sentences:
@@ -595,21 +1067,15 @@ class NewsBot(AgentBase):
         # 1. Conflicting sentiment for portfolio items
         # Simplified: Check if any article about a portfolio item has strong pos/neg sentiment
         # A more advanced version would track sentiment per item across articles.
-        portfolio_symbols = [str(s).lower() for s in self.portfolio.get('stocks', []) + self.portfolio.get('crypto', [])]
-
         conflicting_sentiments = {} # stock_symbol: [sentiments]
 
         for article in articles:
-            title = article.get('title', '').lower()
-            description = article.get('description', '').lower()
-            content = title + " " + description
             sentiment = article.get('sentiment_score', 0.0)
 
-            for symbol in portfolio_symbols:
-                if symbol in content:
-                    if symbol not in conflicting_sentiments:
-                        conflicting_sentiments[symbol] = []
-                    conflicting_sentiments[symbol].append(sentiment)
+            for symbol in self.portfolio_matcher.match_article(article):
+                if symbol not in conflicting_sentiments:
+                    conflicting_sentiments[symbol] = []
+                conflicting_sentiments[symbol].append(sentiment)
 
         for symbol, sentiments in conflicting_sentiments.items():
             has_positive = any(s > 0.5 for s in sentiments)
@@ -790,12 +1256,16 @@ class NewsBot(AgentBase):
                 # Simplified: re-run aggregation focusing on this topic.
                 # A more advanced implementation would filter existing news or fetch specifically.
                 original_topics = self.user_preferences.get('topics', [])
+                original_incremental = self.incremental
                 self.user_preferences['topics'] = [topic] # Temporarily override
-
-                news_articles = self.aggregate_news()
-                personalized_feed = self.personalize_feed(news_articles)
-
-                self.user_preferences['topics'] = original_topics # Restore
+                # A full, one-off query: it must not move the monitoring cycle's watermarks or validators
+                self.incremental = False
+                try:
+                    news_articles = self.collapse_duplicates_in_feed(self.aggregate_news())
+                    personalized_feed = self.personalize_feed(news_articles)
+                finally:
+                    self.user_preferences['topics'] = original_topics # Restore
+                    self.incremental = original_incremental
                 return {"status": "success", "articles": personalized_feed[:10]} # Return top 10
             else:
                 return {"status": "error", "message": "Topic not provided"}
@@ -883,6 +1353,34 @@ if __name__ == "__main__":
         help="Interval in seconds between monitoring checks (default: 60)."
     )
 
+    parser.add_argument(
+        "--concurrent-fetch",
+        action="store_true",
+        help="If provided, fetches all news sources concurrently with per-source timeouts."
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="If provided, monitoring scores and alerts on each source as soon as it returns."
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="If provided, only articles not seen in earlier cycles are scored and alerted on (uses per-source watermarks)."
+    )
+    parser.add_argument(
+        "--inference-batch-size",
+        type=int,
+        default=32,
+        help="Max number of articles per FinBERT forward pass (default: 32)."
+    )
+    parser.add_argument(
+        "--inference-threads",
+        type=int,
+        required=False,
+        help="Number of torch CPU threads used for inference (default: torch's own choice)."
+    )
+
     args = parser.parse_args()
 
     # Ensure NLTK 'punkt' is available for summarization fallback
@@ -908,6 +1406,11 @@ if __name__ == "__main__":
         "search_api_key": args.search_api_key, # Added search_api_key to config
         "portfolio": portfolio_data,
         "user_api_sources": custom_api_sources_data,
+        "concurrent_fetch": args.concurrent_fetch,
+        "incremental_monitoring": args.incremental,
+        "stream_execution": args.stream,
+        "inference_max_batch_size": args.inference_batch_size,
+        "inference_num_threads": args.inference_threads,
         "alerting_thresholds": {
             "positive_impact": 0.6,
             "negative_impact": -0.6
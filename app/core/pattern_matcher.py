@@ -0,0 +1,208 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# Characters that make a pattern a regex rather than plain text
+_REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
+class PatternHit(NamedTuple):
+    label: str
+    pattern: str
+    start: int
+    end: int
+
+def _is_plain_text(pattern: str) -> bool:
+    return not any(ch in _REGEX_METACHARACTERS for ch in pattern)
+
+# Backreferences would point at the wrong group once patterns are joined into one alternation
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+def trie_regex(words: Iterable[str]) -> str:
+    """
+    A regex matching any of `words`, factored into a character trie, e.g. ["aapl", "amzn", "amd"]
+    becomes "a(?:apl|m(?:d|zn))". `re` then walks shared prefixes once and can reject a
+    position on its first character instead of trying every word there.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {} # End of a word
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # Greedy optional: the longest word at a position is tried first
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+class PatternMatcher:
+    """
+    Matches many labelled patterns against a text with patterns compiled once.
+
+    `groups` maps a label (category, event type, ...) to its patterns: regexes, or
+    plain keywords with `literal=True`. Plain-text patterns (all keywords, and regexes
+    without metacharacters such as r"earnings") are merged into one trie-shaped regex
+    and found in a single scan, including overlapping hits and several keywords at the
+    same position; real regexes are precompiled one by one. That is what `scan` and
+    `label_counts` need, since they report every pattern's own hits.
+
+    `labels` and `first_label` only need to know whether a label has any hit, so each
+    label's patterns are also joined into one alternation (keywords as a trie) and a
+    label costs a single search; `first_label` stops at the first label that matches.
+
+    Results match running every pattern with `re.search`/`re.finditer` on its own.
+    """
+
+    def __init__(self, groups: Dict[str, Sequence[str]], literal: bool = False,
+                 word_boundaries: bool = False, flags: int = 0):
+        self.labels_in_order = list(groups)
+        self._entries: List[Tuple[str, str]] = [] # (label, original pattern)
+        self._compiled: List["re.Pattern[str]"] = []
+        self._ignore_case = bool(flags & re.IGNORECASE)
+        plain = not (flags & re.VERBOSE)
+        literals: Dict[str, List[int]] = {} # Normalized text -> entry indexes
+        self._regexes: Dict[str, List[int]] = {} # Label -> entry indexes of real regexes
+        label_keywords: Dict[str, List[str]] = {}
+        label_sources: Dict[str, List[str]] = {}
+
+        for label, patterns in groups.items():
+            for pattern in patterns:
+                if not pattern:
+                    continue # An empty pattern would match at every position
+                is_literal = literal or (plain and _is_plain_text(pattern))
+                source = re.escape(pattern) if literal else pattern
+                if word_boundaries:
+                    source = rf"\b{source}\b"
+                index = len(self._entries)
+                self._entries.append((label, pattern))
+                self._compiled.append(re.compile(source, flags))
+                if is_literal:
+                    literals.setdefault(self._normalize(pattern), []).append(index)
+                    label_keywords.setdefault(label, []).append(pattern)
+                else:
+                    self._regexes.setdefault(label, []).append(index)
+                    label_sources.setdefault(label, []).append(source)
+
+        self._literals = literals
+        # For each literal, the shorter literals that are prefixes of it: the only other
+        # candidates at a position where it is the longest match
+        self._prefixes = {
+            key: sorted((other for other in literals if other != key and key.startswith(other)), key=len, reverse=True)
+            for key in literals
+        }
+        boundary = r"\b" if word_boundaries else ""
+        self._literal_scan = None
+        if literals:
+            self._literal_scan = re.compile(f"{boundary}(?:{trie_regex(literals)}){boundary}", flags)
+
+        # Label -> the compiled alternation(s) that tell whether the label has any hit
+        self._label_scans: Dict[str, List["re.Pattern[str]"]] = {}
+        for label in self.labels_in_order:
+            sources = list(label_sources.get(label, []))
+            if label in label_keywords:
+                sources.insert(0, f"{boundary}(?:{trie_regex(label_keywords[label])}){boundary}")
+            if not sources:
+                continue
+            if not any(_BACKREFERENCE.search(source) for source in sources):
+                try:
+                    self._label_scans[label] = [re.compile("|".join(f"(?:{source})" for source in sources), flags)]
+                    continue
+                except re.error:
+                    pass
+            # Patterns that can't share one regex (backreferences, inline flags) are searched one by one
+            self._label_scans[label] = [re.compile(source, flags) for source in sources]
+
+    def _normalize(self, text: str) -> str:
+        return text.lower() if self._ignore_case else text
+
+    def _literal_hits(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """(entry index, start, end) for every literal occurrence, in text order."""
+        search = self._literal_scan.search
+        pos = 0
+        while True:
+            match = search(text, pos)
+            if match is None:
+                return
+            start = match.start()
+            longest = self._normalize(match.group())
+            for index in self._literals[longest]:
+                yield index, start, match.end()
+            for key in self._prefixes[longest]:
+                for index in self._literals[key]:
+                    # Shorter keywords at this position still need their own boundary check
+                    if self._compiled[index].match(text, start):
+                        yield index, start, start + len(key)
+            pos = start + 1 # Resume inside the match so overlapping keywords are found
+
+    def scan(self, text: str) -> List[PatternHit]:
+        """Every (label, pattern, start, end) hit in the text, in text order."""
+        if not text:
+            return []
+        found: List[Tuple[int, int, int]] = []
+        if self._literal_scan is not None:
+            found.extend((start, index, end) for index, start, end in self._literal_hits(text))
+        for indexes in self._regexes.values():
+            for index in indexes:
+                found.extend((match.start(), index, match.end()) for match in self._compiled[index].finditer(text))
+        found.sort()
+        return [PatternHit(*self._entries[index], start, end) for start, index, end in found]
+
+    def label_counts(self, text: str) -> Dict[str, int]:
+        """Number of distinct patterns that matched, per label (labels without hits are omitted)."""
+        if not text:
+            return {}
+        matched = set()
+        if self._literal_scan is not None:
+            matched.update(index for index, _, _ in self._literal_hits(text))
+        for indexes in self._regexes.values():
+            matched.update(index for index in indexes if self._compiled[index].search(text))
+        counts: Dict[str, int] = {}
+        for index in matched:
+            label = self._entries[index][0]
+            counts[label] = counts.get(label, 0) + 1
+        return {label: counts[label] for label in self.labels_in_order if label in counts}
+
+    def labels(self, text: str) -> List[str]:
+        """Labels with at least one hit, in the order the groups were given."""
+        if not text:
+            return []
+        return [label for label, scans in self._label_scans.items() if any(scan.search(text) for scan in scans)]
+
+    def first_label(self, text: str) -> Optional[str]:
+        """The first label, in the order the groups were given, with a hit; later labels aren't searched."""
+        if not text:
+            return None
+        for label, scans in self._label_scans.items():
+            if any(scan.search(text) for scan in scans):
+                return label
+        return None
+
+_MAX_MATCHERS = 64
+_matchers: "OrderedDict[Hashable, PatternMatcher]" = OrderedDict()
+_matchers_lock = threading.Lock()
+
+def get_matcher(groups: Dict[str, Sequence[str]], literal: bool = False,
+                word_boundaries: bool = False, flags: int = 0) -> PatternMatcher:
+    """
+    Returns a compiled matcher for `groups`, building it only the first time this exact
+    configuration is seen. The cache is keyed on the patterns themselves, so editing a
+    config dict (or passing a different one) gets a freshly built matcher.
+    """
+    key = (tuple(groups), tuple(map(tuple, groups.values())), literal, word_boundaries, flags)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is not None:
+            _matchers.move_to_end(key)
+            return matcher
+    matcher = PatternMatcher(groups, literal=literal, word_boundaries=word_boundaries, flags=flags)
+    with _matchers_lock:
+        _matchers[key] = matcher
+        while len(_matchers) > _MAX_MATCHERS:
+            _matchers.popitem(last=False)
+    return matcher
@@ -0,0 +1,47 @@
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Union
+
+from app.core.pattern_matcher import trie_regex
+
+class PortfolioMatcher:
+    """
+    Finds portfolio symbols (and their aliases) in text with a single regex scan.
+
+    Matching is case-insensitive and only on whole words, so "AMD" matches
+    "AMD's guidance" but not "AMDOCS".
+    """
+
+    def __init__(self, symbols: Union[Mapping[str, Iterable[str]], Iterable[str]]):
+        if not isinstance(symbols, Mapping):
+            symbols = {symbol: [] for symbol in symbols}
+
+        # Lowercased surface form -> canonical symbols it stands for
+        self._lookup: Dict[str, List[str]] = {}
+        for symbol, aliases in symbols.items():
+            for form in [symbol, *aliases]:
+                form = str(form).strip().lower()
+                if form and symbol not in self._lookup.setdefault(form, []):
+                    self._lookup[form].append(symbol)
+
+        self.symbols = list(symbols.keys())
+        self._pattern = None
+        if self._lookup:
+            self._pattern = re.compile(
+                r"(?<!\w)" + trie_regex(self._lookup) + r"(?!\w)",
+                re.IGNORECASE
+            )
+
+    def match(self, text: str) -> Dict[str, int]:
+        """Returns every matched canonical symbol with its number of occurrences."""
+        counts: Counter = Counter()
+        if not self._pattern or not text:
+            return {}
+        for found in self._pattern.finditer(text):
+            for symbol in self._lookup[found.group().lower()]:
+                counts[symbol] += 1
+        return dict(counts)
+
+    def match_article(self, article: Dict[str, Any]) -> Dict[str, int]:
+        """Matches over an article's title and description."""
+        return self.match(f"{article.get('title') or ''}\n{article.get('description') or ''}")
@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Client-side limits per outbound data provider (free-tier quotas, with some headroom)
+DEFAULT_PROVIDER_LIMITS: Dict[str, Dict[str, float]] = {
+    "finnhub": {"rate_per_minute": 55, "burst": 10},
+    "alpha_vantage": {"rate_per_minute": 5, "burst": 1},
+    "newsapi": {"rate_per_minute": 30, "burst": 5},
+    "coingecko": {"rate_per_minute": 25, "burst": 5},
+}
+
+class ProviderUnavailableError(Exception):
+    """Raised instead of calling a provider whose circuit is open or whose rate limit would wait too long."""
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f"{provider} unavailable: {reason}")
+        self.provider = provider
+        self.reason = reason
+
+class ProviderRateLimitedError(ProviderUnavailableError):
+    """Raised (by callers or the guard) when a provider reports that our quota is exhausted."""
+
+    def __init__(self, provider: str, reason: str = "quota exhausted", retry_after: Optional[float] = None):
+        super().__init__(provider, reason)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate_per_second`, holding at most `burst` tokens."""
+
+    def __init__(self, rate_per_second: float, burst: float):
+        self.rate_per_second = rate_per_second
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes one token, borrowing against the future if the bucket is empty.
+        Returns how long the caller must wait before using it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_second)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+    def refund(self):
+        """Returns a reserved token that was not used."""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `cooldown_seconds`. After the cooldown one probe call is let through
+    (half-open); its success closes the circuit, its failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 60.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self.opened_until:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._open(self.cooldown_seconds)
+
+    def trip(self, cooldown_seconds: Optional[float] = None):
+        """Opens the circuit immediately, e.g. when the provider says the quota is used up."""
+        with self._lock:
+            self._open(max(self.cooldown_seconds, cooldown_seconds or 0.0))
+
+    def _open(self, cooldown_seconds: float):
+        self.state = self.OPEN
+        self.opened_until = time.monotonic() + cooldown_seconds
+        self._probe_in_flight = False
+
+    def release_probe(self):
+        """Lets another caller probe a half-open circuit when the admitted probe never ran."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_until - time.monotonic()) if self.state == self.OPEN else 0.0
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def _is_transport_error(exc: BaseException) -> bool:
+    """requests/httpx connection and timeout errors, without importing either here."""
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    return bool(names & {"ConnectionError", "Timeout", "TransportError", "TimeoutException"})
+
+class ProviderGuard:
+    """
+    Wraps outbound calls to one provider with a token-bucket rate limit, a circuit
+    breaker and retries with exponential backoff and full jitter.
+
+    The wrapped callable should raise on failure (e.g. call `raise_for_status()`).
+    Connection errors, timeouts, 429s and 5xx responses are retried; other 4xx
+    responses are returned to the caller as-is and do not count against the breaker.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float = 60, burst: float = 5,
+                 failure_threshold: int = 5, cooldown_seconds: float = 60.0,
+                 max_retries: int = 2, backoff_base_seconds: float = 0.5,
+                 backoff_max_seconds: float = 8.0, max_wait_seconds: float = 15.0):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_minute / 60.0, burst)
+        self.breaker = CircuitBreaker(failure_threshold, cooldown_seconds)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self._metrics_lock = threading.Lock()
+        self.metrics: Dict[str, float] = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "rejected_open": 0,
+            "rejected_throttled": 0,
+            "rate_limited": 0,
+            "throttle_wait_seconds": 0.0,
+        }
+
+    def _count(self, metric: str, amount: float = 1):
+        with self._metrics_lock:
+            self.metrics[metric] += amount
+
+    def _admit(self) -> float:
+        """Checks the breaker and takes a token. Returns the throttle delay to sleep before calling."""
+        if not self.breaker.allow():
+            self._count("rejected_open")
+            raise ProviderUnavailableError(self.name, f"circuit open, retry in {self.breaker.retry_in():.0f}s")
+        delay = self.bucket.reserve()
+        if delay > self.max_wait_seconds:
+            self.bucket.refund()
+            self.breaker.release_probe()
+            self._count("rejected_throttled")
+            raise ProviderUnavailableError(self.name, f"rate limit would delay the call by {delay:.1f}s")
+        if delay:
+            self._count("throttle_wait_seconds", delay)
+        return delay
+
+    def _is_retryable(self, exc: BaseException) -> bool:
+        if isinstance(exc, ProviderRateLimitedError):
+            return False # Retrying a spent quota only burns more of it
+        status = _status_code(exc)
+        if status is not None:
+            return status == 429 or status >= 500
+        return isinstance(exc, (OSError, TimeoutError, asyncio.TimeoutError)) or _is_transport_error(exc)
+
+    def _on_error(self, exc: BaseException, attempt: int) -> float:
+        """Records a failed attempt. Returns the backoff delay if the call should be retried, else -1."""
+        status = _status_code(exc)
+        if isinstance(exc, ProviderRateLimitedError) or status == 429:
+            self._count("rate_limited")
+            retry_after = getattr(exc, "retry_after", None) or _retry_after(exc)
+            if isinstance(exc, ProviderRateLimitedError) or retry_after:
+                self.breaker.trip(retry_after)
+                logger.warning(f"{self.name} reported rate limiting. Pausing calls for {self.breaker.retry_in():.0f}s.")
+                self._count("failures")
+                return -1
+
+        if not self._is_retryable(exc):
+            # Client errors (bad key, unknown symbol) say nothing about the provider's health
+            if status is not None:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+                self._count("failures")
+            return -1
+
+        self.breaker.record_failure()
+        self._count("failures")
+        if attempt >= self.max_retries or self.breaker.state == CircuitBreaker.OPEN:
+            return -1
+        self._count("retries")
+        # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt)))
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Calls `fn(*args, **kwargs)` under the guard, blocking for throttling and backoff."""
+        attempt = 0
+        while True:
+            delay = self._admit()
+            try:
+                time.sleep(delay)
+                self._count("calls")
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # Interrupted before the call finished: a half-open probe slot must not stay taken
+                    self.breaker.release_probe()
+                    raise
+                backoff = self._on_error(e, attempt)
+                if backoff < 0:
+                    raise
+                logger.info(f"Retrying {self.name} call in {backoff:.2f}s after error: {e}")
+                time.sleep(backoff)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            self._count("successes")
+            return result
+
+    async def call_async(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Async variant of `call`; `fn` must return an awaitable and is re-invoked on each retry."""
+        attempt = 0
+        while True:
+            delay = self._admit()
+            try:
+                await asyncio.sleep(delay)
+                self._count("calls")
+                result = await fn(*args, **kwargs)
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # Cancelled (source deadline, client disconnect) while throttled or mid-call:
+                    # a half-open probe slot must not stay taken, or the provider is rejected forever
+                    self.breaker.release_probe()
+                    raise
+                backoff = self._on_error(e, attempt)
+                if backoff < 0:
+                    raise
+                logger.info(f"Retrying {self.name} call in {backoff:.2f}s after error: {e}")
+                await asyncio.sleep(backoff)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            self._count("successes")
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        metrics["throttle_wait_seconds"] = round(metrics["throttle_wait_seconds"], 3)
+        return {
+            "provider": self.name,
+            "circuit": self.breaker.state,
+            "retry_in_seconds": round(self.breaker.retry_in(), 1),
+            "consecutive_failures": self.breaker.consecutive_failures,
+            **metrics
+        }
+
+class ProviderGuards:
+    """Process-wide registry of guards, created on first use from DEFAULT_PROVIDER_LIMITS and settings."""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None):
+        self.limits = limits if limits is not None else DEFAULT_PROVIDER_LIMITS
+        self._guards: Dict[str, ProviderGuard] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> ProviderGuard:
+        with self._lock:
+            if provider not in self._guards:
+                limits = dict(self.limits.get(provider, {}))
+                if provider in settings.PROVIDER_RATE_LIMITS:
+                    limits["rate_per_minute"] = settings.PROVIDER_RATE_LIMITS[provider]
+                self._guards[provider] = ProviderGuard(
+                    provider,
+                    failure_threshold=settings.PROVIDER_FAILURE_THRESHOLD,
+                    cooldown_seconds=settings.PROVIDER_COOLDOWN_SECONDS,
+                    max_retries=settings.PROVIDER_MAX_RETRIES,
+                    **limits
+                )
+            return self._guards[provider]
+
+    def get_stats(self):
+        with self._lock:
+            guards = list(self._guards.values())
+        return [guard.get_stats() for guard in guards]
+
+# Global instance
+provider_guards = ProviderGuards()
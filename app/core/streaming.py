@@ -0,0 +1,40 @@
+import json
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+STREAM_FORMATS = ("ndjson", "sse")
+
+# (event name, payload) pairs produced by streaming endpoints
+StreamEvent = Tuple[str, Any]
+
+def _to_jsonable(payload: Any) -> Any:
+    if isinstance(payload, BaseModel):
+        return payload.model_dump(mode="json")
+    return payload
+
+def ndjson_line(event: str, payload: Any) -> str:
+    """One NDJSON line: {"event": ..., "data": ...}."""
+    return json.dumps({"event": event, "data": _to_jsonable(payload)}, default=str) + "\n"
+
+def sse_message(event: str, payload: Any) -> str:
+    """One Server-Sent Events message with a named event and a JSON data field."""
+    return f"event: {event}\ndata: {json.dumps(_to_jsonable(payload), default=str)}\n\n"
+
+def stream_events(events: AsyncIterator[StreamEvent], format: str = "ndjson") -> StreamingResponse:
+    """
+    Wraps an async iterator of (event, payload) pairs in a StreamingResponse,
+    encoded as NDJSON or SSE. Each event is flushed as soon as it is produced.
+    """
+    if format not in STREAM_FORMATS:
+        raise ValueError(f"Unknown stream format '{format}'. Valid options: {STREAM_FORMATS}")
+    encode = sse_message if format == "sse" else ndjson_line
+
+    async def body() -> AsyncIterator[str]:
+        async for event, payload in events:
+            yield encode(event, payload)
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    headers: Dict[str, str] = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"} # Don't let proxies buffer the stream
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
@@ -0,0 +1,233 @@
+import asyncio
+import datetime
+import functools
+import inspect
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+TTL = Union[float, Callable[[], float]]
+
+_MARKET_TZ = ZoneInfo("America/New_York")
+
+def seconds_until_market_close(close_time: datetime.time = datetime.time(16, 15),
+                               now: Optional[datetime.datetime] = None) -> float:
+    """
+    Seconds until the next US market close (plus a margin for providers to publish
+    the daily bar). Daily prices cannot change before then. Weekends are skipped;
+    exchange holidays are not.
+    """
+    now = (now or datetime.datetime.now(_MARKET_TZ)).astimezone(_MARKET_TZ)
+    close = now.replace(hour=close_time.hour, minute=close_time.minute, second=0, microsecond=0)
+    if now >= close:
+        close += datetime.timedelta(days=1)
+    while close.weekday() >= 5: # Saturday, Sunday
+        close += datetime.timedelta(days=1)
+    return (close - now).total_seconds()
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a TTL, with optional
+    stale-while-revalidate: for `stale_ttl` seconds after expiry the old value is
+    still returned while a single background refresh loads a new one.
+
+    Concurrent misses for the same key share one load. Works for both
+    coroutine loaders (`get_or_load`) and plain ones (`get_or_load_sync`).
+    """
+
+    def __init__(self, name: str, max_items: int = 256):
+        self.name = name
+        self.max_items = max_items
+        # key -> (value, fresh_until, stale_until)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[Hashable, Any] = {} # key -> asyncio.Future or threading.Event
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "evictions": 0, "load_errors": 0}
+
+    @staticmethod
+    def _resolve(ttl: TTL) -> float:
+        return ttl() if callable(ttl) else ttl
+
+    def _lookup(self, key: Hashable) -> Tuple[str, Any]:
+        """Returns ('fresh' | 'stale' | 'miss', value)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return "miss", None
+            value, fresh_until, stale_until = entry
+            now = time.monotonic()
+            if now < fresh_until:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return "fresh", value
+            if now < stale_until:
+                self._entries.move_to_end(key)
+                self.stats["stale_hits"] += 1
+                return "stale", value
+            del self._entries[key]
+            self.stats["misses"] += 1
+            return "miss", None
+
+    def set(self, key: Hashable, value: Any, ttl: TTL, stale_ttl: float = 0.0):
+        fresh_for = self._resolve(ttl)
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (value, now + fresh_for, now + fresh_for + stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # --- async ---
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: TTL, stale_ttl: float,
+                    should_cache: Callable[[Any], bool]) -> Any:
+        future = self._loading.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        async def run() -> Any:
+            try:
+                value = await loader()
+            except Exception:
+                self.stats["load_errors"] += 1
+                raise
+            if should_cache(value):
+                self.set(key, value, ttl, stale_ttl)
+            return value
+
+        future = asyncio.ensure_future(run())
+        self._loading[key] = future
+        future.add_done_callback(lambda _: self._loading.pop(key, None))
+        return await asyncio.shield(future)
+
+    def _log_refresh_failure(self, refresh: "asyncio.Future[Any]"):
+        # The stale value stays in place until it expires; the next lookup retries
+        if not refresh.cancelled() and refresh.exception() is not None:
+            logger.warning(f"Background refresh of {self.name} cache failed: {refresh.exception()}")
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: TTL,
+                          stale_ttl: float = 0.0, should_cache: Callable[[Any], bool] = lambda v: v is not None) -> Any:
+        state, value = self._lookup(key)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            if key not in self._loading:
+                self.stats["refreshes"] += 1
+                refresh = asyncio.ensure_future(self._load(key, loader, ttl, stale_ttl, should_cache))
+                refresh.add_done_callback(self._log_refresh_failure)
+            return value
+        return await self._load(key, loader, ttl, stale_ttl, should_cache)
+
+    # --- sync ---
+
+    def _load_sync(self, key: Hashable, loader: Callable[[], Any], ttl: TTL, stale_ttl: float,
+                   should_cache: Callable[[Any], bool]) -> Any:
+        with self._lock:
+            event = self._loading.get(key)
+            owner = event is None
+            if owner:
+                event = self._loading[key] = threading.Event()
+        if not owner:
+            event.wait()
+            state, value = self._lookup(key)
+            if state != "miss":
+                return value
+            # The other load failed or returned an uncacheable value; load ourselves
+
+        try:
+            value = loader()
+            if should_cache(value):
+                self.set(key, value, ttl, stale_ttl) # Stored before waiters wake up
+            return value
+        except Exception:
+            self.stats["load_errors"] += 1
+            raise
+        finally:
+            if owner:
+                with self._lock:
+                    self._loading.pop(key, None)
+                event.set()
+
+    def get_or_load_sync(self, key: Hashable, loader: Callable[[], Any], ttl: TTL,
+                         stale_ttl: float = 0.0, should_cache: Callable[[Any], bool] = lambda v: v is not None) -> Any:
+        state, value = self._lookup(key)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            if key not in self._loading:
+                self.stats["refreshes"] += 1
+
+                def refresh():
+                    try:
+                        self._load_sync(key, loader, ttl, stale_ttl, should_cache)
+                    except Exception as e:
+                        logger.warning(f"Background refresh of {self.name} cache failed: {e}")
+
+                threading.Thread(target=refresh, daemon=True).start()
+            return value
+        return self._load_sync(key, loader, ttl, stale_ttl, should_cache)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        return {"name": self.name, "size": size, "max_items": self.max_items, **self.stats}
+
+# Every cache created by `ttl_cached`, for stats reporting
+_caches: List[TTLCache] = []
+
+def ttl_cached(ttl: TTL, stale_ttl: float = 0.0, max_items: int = 256, name: Optional[str] = None,
+               should_cache: Callable[[Any], bool] = lambda v: v is not None):
+    """
+    Caches a method's results in a TTLCache keyed on the instance and the arguments, so
+    instances (with different API keys, say) never see each other's results. The instance
+    is held by a weak reference, so it is never pinned. Works on both `async def` and plain methods.
+    `ttl` may be a number of seconds or a callable returning one (e.g. seconds_until_market_close).
+    """
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        cache = TTLCache(name or fn.__qualname__, max_items=max_items)
+        _caches.append(cache)
+        signature = inspect.signature(fn)
+
+        def make_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Hashable:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.items())
+            return (weakref.ref(arguments[0][1]), *arguments[1:])
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                return await cache.get_or_load(
+                    make_key(args, kwargs), lambda: fn(*args, **kwargs), ttl, stale_ttl, should_cache
+                )
+            async_wrapper.cache = cache
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+            return cache.get_or_load_sync(
+                make_key(args, kwargs), lambda: fn(*args, **kwargs), ttl, stale_ttl, should_cache
+            )
+        sync_wrapper.cache = cache
+        return sync_wrapper
+
+    return decorator
+
+def get_cache_stats() -> List[Dict[str, Any]]:
+    return [cache.get_stats() for cache in _caches]
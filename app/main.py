@@ -5,13 +5,22 @@ from app.api.endpoints import news_analysis, reports, analysis, reasoning, syste
 import os
 import asyncio
 from app.core.async_utils import task_manager
+from app.core.event_bus import event_bus
 from app.services.federated_learning_service import fl_service
 from app.core.plugin_manager import plugin_manager
+from app.core.model_registry import model_registry
+from app.core.inference_executor import inference_executor, register_exception_handlers
+from app.core.config import settings
+from app.services.data_aggregator_service import data_aggregator_service
 
 app = FastAPI(title="NewsBot AI API")
+register_exception_handlers(app)
 
 @app.on_event("startup")
 async def startup_event():
+    # Connect to the other workers' event buses (if a cross-process transport is configured)
+    await event_bus.start()
+
     # Load Plugins
     plugin_manager.load_plugins()
 
@@ -25,6 +34,16 @@ async def startup_event():
     # Auto-start FL service for demo purposes
     await fl_service.start_training()
 
+    # Optionally load models now so the first requests don't pay for it
+    if settings.MODEL_WARMUP:
+        await asyncio.to_thread(model_registry.warm_up)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await data_aggregator_service.aclose()
+    inference_executor.shutdown()
+    await event_bus.close()
+
 # Mount output directory to serve reports
 app.mount("/output", StaticFiles(directory="output"), name="output")
 
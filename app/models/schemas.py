@@ -64,6 +64,10 @@ class NewsItemWithInsight(NewsArticleFinnhub): # Inherits fields from NewsArticl
     # For now, assuming NewsArticleFinnhub.category is Finnhub's own, and we add ours:
     ai_category: Optional[CategoryOutput] = None # Our AI-generated category
 
+class BatchAnalysisRequest(BaseModel):
+    tickers: List[str] = Field(..., min_length=1, max_length=500)
+    max_news_per_ticker: int = Field(10, ge=0, le=50)
+
 class CompanyAnalysisResponse(BaseModel):
     ticker: str
     profile: Optional[CompanyProfileFinnhub] = None
@@ -1,7 +1,10 @@
 import logging
-from typing import Optional
+from typing import List, Optional
 from app.models.schemas import SentimentOutput, CategoryOutput # Ensure CategoryOutput is imported
-from transformers import pipeline, AutoModelForSequenceClassification, AutoTokenizer
+from app.core.inference_cache import inference_cache, model_revision
+from app.core.model_registry import model_registry
+from app.core.inference_backend import load_pipeline, resolve_backend
+from app.core.micro_batcher import MicroBatcher, get_micro_batcher
 import torch 
 
 # Configure logging
@@ -20,21 +23,28 @@ class AIProcessingService:
     }
     DEFAULT_CATEGORY = "General News"
 
-    def __init__(self):
-        try:
-            device = 0 if torch.cuda.is_available() else -1 
-            logger.info(f"Initializing sentiment analysis pipeline on device: {'cuda' if device == 0 else 'cpu'}")
-            
-            self.sentiment_pipeline = pipeline(
-                "sentiment-analysis",
-                model=self.SENTIMENT_MODEL_NAME,
-                device=device 
-            )
-            logger.info(f"Sentiment analysis pipeline loaded successfully with model: {self.SENTIMENT_MODEL_NAME}")
+    @classmethod
+    def _load_sentiment_pipeline(cls):
+        backend = resolve_backend()
+        logger.info(f"Initializing sentiment analysis pipeline on {'cuda' if torch.cuda.is_available() else 'cpu'} with '{backend}' backend")
+        sentiment_pipeline = load_pipeline("sentiment-analysis", cls.SENTIMENT_MODEL_NAME, backend=backend)
+        logger.info(f"Sentiment analysis pipeline loaded successfully with model: {cls.SENTIMENT_MODEL_NAME}")
+        return sentiment_pipeline
 
-        except Exception as e:
-            logger.error(f"Error initializing Hugging Face sentiment pipeline: {e}", exc_info=True)
-            self.sentiment_pipeline = None 
+    @property
+    def sentiment_pipeline(self):
+        # Shared across instances and loaded on first use, so the service itself is cheap to construct
+        return model_registry.get(self.SENTIMENT_MODEL_NAME)
+
+    @classmethod
+    def _run_sentiment_batch(cls, texts: List[str]) -> List[dict]:
+        sentiment_pipeline = model_registry.get(cls.SENTIMENT_MODEL_NAME)
+        return sentiment_pipeline(texts, truncation=True, max_length=510, batch_size=len(texts))
+
+    @property
+    def sentiment_batcher(self) -> MicroBatcher:
+        # Concurrent requests share forward passes through one batcher per model
+        return get_micro_batcher(self.SENTIMENT_MODEL_NAME, self._run_sentiment_batch)
     
     def get_sentiment(self, text: str) -> Optional[SentimentOutput]:
         if not self.sentiment_pipeline:
@@ -44,14 +54,20 @@ class AIProcessingService:
             logger.warning("Cannot get sentiment for empty or invalid text.")
             return None
 
+        revision = model_revision(self.sentiment_pipeline)
+        cached = inference_cache.get(self.SENTIMENT_MODEL_NAME, text, revision)
+        if cached is not None:
+            return SentimentOutput(**cached)
+
         try:
-            results = self.sentiment_pipeline(text, truncation=True, max_length=510) 
-            
-            if results and isinstance(results, list) and len(results) > 0:
-                result = results[0] 
+            result = self.sentiment_batcher.predict(text)
+
+            if result:
                 label = result.get("label")
                 score = result.get("score")
-                return SentimentOutput(label=label.upper(), score=score)
+                sentiment = SentimentOutput(label=label.upper(), score=score)
+                inference_cache.set(self.SENTIMENT_MODEL_NAME, text, sentiment.model_dump(), revision)
+                return sentiment
             else:
                 logger.warning(f"Sentiment analysis for text '{text[:50]}...' returned no valid results.")
                 return None
@@ -59,6 +75,43 @@ class AIProcessingService:
             logger.error(f"Error during sentiment analysis for text '{text[:50]}...': {e}", exc_info=True)
             return None
 
+    def get_sentiments(self, texts: List[str]) -> List[Optional[SentimentOutput]]:
+        """
+        Batched `get_sentiment`: cache misses are queued to the sentiment micro-batcher
+        together. Returns one result per text (None for empty texts or on failure).
+        """
+        results: List[Optional[SentimentOutput]] = [None] * len(texts)
+        if not texts or not self.sentiment_pipeline:
+            if texts:
+                logger.error("Sentiment pipeline not available. Cannot process sentiment.")
+            return results
+
+        indexed = [(i, text) for i, text in enumerate(texts) if isinstance(text, str) and text.strip()]
+        if not indexed:
+            return results
+
+        def compute(batch: List[str]) -> List[Optional[dict]]:
+            outputs = self.sentiment_batcher.predict_many(batch)
+            return [
+                SentimentOutput(label=out["label"].upper(), score=out["score"]).model_dump() if out else None
+                for out in outputs
+            ]
+
+        try:
+            cached = inference_cache.get_or_compute(
+                self.SENTIMENT_MODEL_NAME,
+                [text for _, text in indexed],
+                compute,
+                revision=model_revision(self.sentiment_pipeline)
+            )
+        except Exception as e:
+            logger.error(f"Error during batched sentiment analysis of {len(indexed)} texts: {e}", exc_info=True)
+            return results
+
+        for (i, _), value in zip(indexed, cached):
+            results[i] = SentimentOutput(**value) if value else None
+        return results
+
     def get_category(self, text: str) -> Optional[CategoryOutput]: # Added Optional for consistency, though current logic always returns
         if not text or not isinstance(text, str) or not text.strip():
             logger.warning("Cannot get category for empty or invalid text.")
@@ -67,6 +120,7 @@ class AIProcessingService:
 
         lower_text = text.lower()
         
+        # Plain substring checks stop at the first hit and beat a compiled regex scan for a few dozen keywords
         for category, keywords in self.KEYWORD_CATEGORIES.items():
             for keyword in keywords:
                 if keyword in lower_text:
@@ -74,6 +128,8 @@ class AIProcessingService:
         
         return CategoryOutput(label=self.DEFAULT_CATEGORY)
 
+model_registry.register(AIProcessingService.SENTIMENT_MODEL_NAME, AIProcessingService._load_sentiment_pipeline)
+
 # Example Usage (for local testing)
 # if __name__ == "__main__":
 #     logging.basicConfig(level=logging.INFO)
@@ -1,8 +1,9 @@
-import requests
-import functools
+import httpx
 import logging
 from typing import Optional, List, Dict, Any
 from app.core.config import settings
+from app.core.provider_guard import provider_guards, ProviderRateLimitedError, ProviderUnavailableError
+from app.core.ttl_cache import seconds_until_market_close, ttl_cached
 from app.models.schemas import CompanyProfileFinnhub, NewsArticleFinnhub, StockDataAlphaVantage, StockDataPointAlphaVantage
 import datetime
 
@@ -15,7 +16,8 @@ class DataAggregatorService:
 
     def __init__(self,
                  finnhub_api_key: str = settings.FINNHUB_API_KEY,
-                 alpha_vantage_api_key: str = settings.ALPHA_VANTAGE_API_KEY):
+                 alpha_vantage_api_key: str = settings.ALPHA_VANTAGE_API_KEY,
+                 max_connections: int = 20):
 
         self.finnhub_api_key = finnhub_api_key
         self.alpha_vantage_api_key = alpha_vantage_api_key
@@ -34,10 +36,67 @@ class DataAggregatorService:
             # Not raising an error here to allow partial service functionality if one key is set.
             # Methods should check their specific keys.
 
-        self.session = requests.Session()
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None # Pooled client, created lazily on the running loop
 
-    @functools.lru_cache(maxsize=32)
-    def get_company_profile(self, ticker: str) -> Optional[CompanyProfileFinnhub]:
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=15.0
+            )
+        return self._client
+
+    async def aclose(self):
+        """Closes the pooled HTTP client. Called on application shutdown."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def _get(self, provider: str, endpoint: str, params: Dict[str, Any], timeout: int) -> httpx.Response:
+        """GET through the provider's rate limit, circuit breaker and retries. Raises on HTTP errors."""
+        async def fetch() -> httpx.Response:
+            response = await self._get_client().get(endpoint, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response
+        return await provider_guards.get(provider).call_async(fetch)
+
+    async def _get_alpha_vantage(self, params: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+        """Like `_get`, but treats Alpha Vantage's rate-limit notes (sent with HTTP 200) as failures."""
+        async def fetch() -> Dict[str, Any]:
+            response = await self._get_client().get(self.ALPHA_VANTAGE_BASE_URL, params=params, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+            has_data = any(key.startswith("Time Series") for key in data)
+            if "Note" in data or ("Information" in data and not has_data):
+                raise ProviderRateLimitedError("alpha_vantage", data.get("Note") or data.get("Information"))
+            return data
+        return await provider_guards.get("alpha_vantage").call_async(fetch)
+
+    # Cached results are keyed on the instance and the arguments, so instances with other
+    # API keys never see each other's results; use the global instance below to share them.
+    # Failed calls (None / no articles) are not cached. Concurrent misses for the same
+    # key share one upstream call (the cache coalesces them).
+
+    @ttl_cached(ttl=settings.CACHE_PROFILE_TTL_SECONDS, stale_ttl=settings.CACHE_STALE_SECONDS,
+                max_items=settings.CACHE_MAX_ITEMS, name="company_profile")
+    async def get_company_profile(self, ticker: str) -> Optional[CompanyProfileFinnhub]:
+        return await self._fetch_company_profile(ticker)
+
+    @ttl_cached(ttl=settings.CACHE_NEWS_TTL_SECONDS, stale_ttl=settings.CACHE_STALE_SECONDS,
+                max_items=settings.CACHE_MAX_ITEMS, name="company_news", should_cache=bool)
+    async def get_company_news(self, ticker: str, start_date: str, end_date: str) -> List[NewsArticleFinnhub]:
+        return await self._fetch_company_news(ticker, start_date, end_date)
+
+    @ttl_cached(ttl=seconds_until_market_close, stale_ttl=settings.CACHE_STALE_SECONDS,
+                max_items=settings.CACHE_MAX_ITEMS, name="stock_prices")
+    async def get_stock_prices(self, ticker: str, days: int = 30) -> Optional[StockDataAlphaVantage]:
+        return await self._fetch_stock_prices(ticker, days)
+
+    async def _fetch_company_profile(self, ticker: str) -> Optional[CompanyProfileFinnhub]:
         if not self.finnhub_api_key or self.finnhub_api_key == "YOUR_FINNHUB_KEY_HERE":
             logger.warning(f"Finnhub API key not configured. Returning MOCK profile for {ticker}.")
             # Return Mock Data
@@ -58,23 +117,23 @@ class DataAggregatorService:
         endpoint = f"{self.FINNHUB_BASE_URL}/stock/profile2"
         params = {"symbol": ticker, "token": self.finnhub_api_key}
         try:
-            response = self.session.get(endpoint, params=params, timeout=10)
-            response.raise_for_status()
+            response = await self._get("finnhub", endpoint, params, timeout=10)
             data = response.json()
             if not data:
                 logger.info(f"No profile data found for ticker: {ticker} on Finnhub.")
                 return None
             return CompanyProfileFinnhub(**data)
-        except requests.exceptions.HTTPError as e:
+        except ProviderUnavailableError as e:
+            logger.warning(f"Skipping Finnhub profile for {ticker}: {e}")
+        except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error fetching Finnhub profile for {ticker}: {e.response.status_code} - {e.response.text}")
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             logger.error(f"Request error fetching Finnhub profile for {ticker}: {e}")
         except Exception as e:
             logger.error(f"Unexpected error parsing Finnhub profile for {ticker}: {e}")
         return None
 
-    @functools.lru_cache(maxsize=64)
-    def get_company_news(self, ticker: str, start_date: str, end_date: str) -> List[NewsArticleFinnhub]:
+    async def _fetch_company_news(self, ticker: str, start_date: str, end_date: str) -> List[NewsArticleFinnhub]:
         if not self.finnhub_api_key or self.finnhub_api_key == "YOUR_FINNHUB_KEY_HERE":
             logger.warning(f"Finnhub API key not configured. Returning MOCK news for {ticker}.")
             # Return Mock Data
@@ -116,24 +175,24 @@ class DataAggregatorService:
         endpoint = f"{self.FINNHUB_BASE_URL}/company-news"
         params = {"symbol": ticker, "from": start_date, "to": end_date, "token": self.finnhub_api_key}
         try:
-            response = self.session.get(endpoint, params=params, timeout=15)
-            response.raise_for_status()
+            response = await self._get("finnhub", endpoint, params, timeout=15)
             news_data = response.json()
             if not isinstance(news_data, list):
                 logger.warning(f"Finnhub news for {ticker} not in expected list format: {news_data}")
                 return []
             articles = [NewsArticleFinnhub(**article) for article in news_data if isinstance(article, dict)]
             return articles
-        except requests.exceptions.HTTPError as e:
+        except ProviderUnavailableError as e:
+            logger.warning(f"Skipping Finnhub news for {ticker}: {e}")
+        except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error fetching Finnhub news for {ticker}: {e.response.status_code} - {e.response.text}")
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             logger.error(f"Request error fetching Finnhub news for {ticker}: {e}")
         except Exception as e:
             logger.error(f"Unexpected error parsing Finnhub news for {ticker}: {e}")
         return []
 
-    @functools.lru_cache(maxsize=32)
-    def get_stock_prices(self, ticker: str, days: int = 30) -> Optional[StockDataAlphaVantage]:
+    async def _fetch_stock_prices(self, ticker: str, days: int = 30) -> Optional[StockDataAlphaVantage]:
         if not self.alpha_vantage_api_key or self.alpha_vantage_api_key == "YOUR_ALPHA_VANTAGE_KEY_HERE":
             logger.warning(f"Alpha Vantage API key not configured. Returning MOCK stock prices for {ticker}.")
             # Return Mock Data
@@ -153,7 +212,6 @@ class DataAggregatorService:
                 ))
             return StockDataAlphaVantage(ticker=ticker, prices=prices)
             
-        endpoint = f"{self.ALPHA_VANTAGE_BASE_URL}" # Using the constant defined in class
         params = {
             "function": "TIME_SERIES_DAILY",
             "symbol": ticker,
@@ -161,9 +219,7 @@ class DataAggregatorService:
             "outputsize": "compact" 
         }
         try:
-            response = self.session.get(endpoint, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            data = await self._get_alpha_vantage(params, timeout=15)
 
             if "Error Message" in data:
                 logger.error(f"Alpha Vantage API error for {ticker}: {data['Error Message']}")
@@ -172,11 +228,6 @@ class DataAggregatorService:
                  logger.warning(f"Alpha Vantage API Information for {ticker}: {data['Information']}. This might be a demo call.")
                  # If it's a demo call, data might be fixed. Proceed with caution or return None.
                  # For now, let's try to parse it.
-            if "Note" in data: 
-                logger.warning(f"Alpha Vantage API note for {ticker}: {data['Note']}. (Often about API call frequency limits)")
-                # This is a strong indicator that the call might not have real data or is rate-limited.
-                # Consider returning None or specific error if this note appears.
-                # For now, we will try to proceed but this is a risk.
 
             time_series = data.get("Time Series (Daily)")
             if not time_series:
@@ -214,14 +265,21 @@ class DataAggregatorService:
 
             return StockDataAlphaVantage(ticker=ticker, prices=prices)
 
-        except requests.exceptions.HTTPError as e:
+        except ProviderUnavailableError as e:
+            # Includes rate-limit notes, which pause Alpha Vantage calls for the breaker cooldown
+            logger.warning(f"Skipping Alpha Vantage stock prices for {ticker}: {e}")
+        except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error fetching Alpha Vantage stock prices for {ticker}: {e.response.status_code} - {e.response.text}")
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             logger.error(f"Request error fetching Alpha Vantage stock prices for {ticker}: {e}")
         except Exception as e: # Catch any other exceptions during parsing or processing
             logger.error(f"Unexpected error processing Alpha Vantage stock prices for {ticker}: {e}", exc_info=True)
         return None
 
+# Global instance: one connection pool for the whole process. Concurrent identical requests
+# share one upstream call through the ttl_cached methods' caches.
+data_aggregator_service = DataAggregatorService()
+
 # Example usage part (preserved from previous version, may need updates for Alpha Vantage)
 # if __name__ == "__main__":
 #     logging.basicConfig(level=logging.INFO)
@@ -1,6 +1,7 @@
 import time
 from typing import Dict, Any
 from app.core.async_utils import task_manager
+from app.core.event_bus import event_bus
 
 class SystemMonitor:
     def __init__(self):
@@ -15,13 +16,21 @@ class SystemMonitor:
         return {
             "uptime_seconds": uptime,
             "uptime_formatted": self._format_uptime(uptime),
-            "active_tasks_count": len(task_manager.get_active_tasks()),
+            "active_tasks_count": task_manager.active_count(),
+            "queued_tasks_count": task_manager.queued_count(),
             "active_tasks": task_manager.get_active_tasks(),
-            "event_stats": self.event_counts,
+            "event_stats": self._event_stats(),
             "status": "operational",
             "system_time": time.time()
         }
 
+    def _event_stats(self) -> Dict[str, int]:
+        # Events seen on the bus (all workers, with a cross-process transport) plus explicitly tracked ones
+        stats = dict(event_bus.event_counts)
+        for event_type, count in self.event_counts.items():
+            stats[event_type] = stats.get(event_type, 0) + count
+        return stats
+
     def _format_uptime(self, seconds: float) -> str:
         m, s = divmod(seconds, 60)
         h, m = divmod(m, 60)
@@ -6,16 +6,18 @@ from datetime import datetime, timedelta
 
 from newsbot_project_files.backend.app.schemas.company import CompanyProfile, HistoricalStockData
 from newsbot_project_files.backend.app.schemas.news import CompanyNews, NewsArticle
-from newsbot_project_files.backend.app.services.data_aggregator_service import DataAggregatorService
+from newsbot_project_files.backend.app.services.data_aggregator_service import DataAggregatorService, data_aggregator_service
 from newsbot_project_files.backend.app.services.ai_processing_service import AIProcessingService
 from newsbot_project_files.backend.app.core.logging import get_logger
+from app.core.inference_executor import InferenceError
 
 logger = get_logger(__name__)
 router = APIRouter()
 
 # --- Dependency Injection for Services ---
 def get_data_aggregator_service():
-    return DataAggregatorService()
+    # Shared, so its TTL caches (keyed per instance) carry over between requests
+    return data_aggregator_service
 
 def get_ai_processing_service():
     return AIProcessingService()
@@ -82,6 +84,8 @@ async def get_company_analysis(
     except requests.exceptions.RequestException as req_exc: # Catch HTTP errors from requests library
         logger.error(f"API request error during analysis for {ticker_symbol}: {req_exc}", exc_info=True)
         raise HTTPException(status_code=503, detail=f"External API service unavailable: {req_exc}")
+    except InferenceError:
+        raise # Mapped to 503/504 by the app's exception handlers
     except Exception as e:
         logger.error(f"An unexpected error occurred during analysis for {ticker_symbol}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"An internal server error occurred: {e}")
@@ -1,20 +1,23 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
 from newsbot_project_files.backend.app.schemas.news import NewsArticle # Reusing NewsArticle for processed market news
-from newsbot_project_files.backend.app.services.data_aggregator_service import DataAggregatorService
+from newsbot_project_files.backend.app.services.data_aggregator_service import DataAggregatorService, data_aggregator_service
 from newsbot_project_files.backend.app.services.ai_processing_service import AIProcessingService
 from newsbot_project_files.backend.app.core.logging import get_logger
 from collections import Counter
+from app.core.streaming import StreamEvent, stream_events
+from app.core.inference_executor import InferenceError, inference_executor
 
 logger = get_logger(__name__)
 router = APIRouter()
 
 # --- Dependency Injection for Services ---
 def get_data_aggregator_service():
-    return DataAggregatorService()
+    # Shared, so its TTL caches (keyed per instance) carry over between requests
+    return data_aggregator_service
 
 def get_ai_processing_service():
     return AIProcessingService()
@@ -35,6 +38,57 @@ class MarketOutlookResponse(BaseModel):
     highlighted_events: List[str] = []
     processed_articles: List[NewsArticle] = []
 
+def _synthesize_outlook(processed_articles: List[NewsArticle]) -> Tuple[MarketSentiment, List[str]]:
+    """Aggregates processed articles into the overall market sentiment and highlighted events."""
+    positive_count, negative_count, neutral_count = 0, 0, 0
+    total_sentiment_score = 0
+    valid_sentiment_articles = 0
+
+    for article in processed_articles:
+        if article.sentiment_label:
+            if article.sentiment_label.upper() == "POSITIVE":
+                positive_count += 1
+            elif article.sentiment_label.upper() == "NEGATIVE":
+                negative_count += 1
+            else:
+                neutral_count += 1
+        if article.sentiment_score is not None and article.sentiment_label and "ERROR" not in article.sentiment_label.upper() and "UNAVAILABLE" not in article.sentiment_label.upper():
+            total_sentiment_score += article.sentiment_score
+            valid_sentiment_articles += 1
+
+    avg_sentiment_score = None
+    overall_label = "Neutral"
+    if valid_sentiment_articles > 0:
+        avg_sentiment_score = round(total_sentiment_score / valid_sentiment_articles, 4)
+        if avg_sentiment_score > 0.15:
+            overall_label = "Positive"
+        elif avg_sentiment_score < -0.15:
+            overall_label = "Negative"
+    elif positive_count > negative_count:
+        overall_label = "Slightly Positive"
+    elif negative_count > positive_count:
+        overall_label = "Slightly Negative"
+
+    market_sentiment_obj = MarketSentiment(
+        overall_sentiment_label=overall_label,
+        average_sentiment_score=avg_sentiment_score,
+        positive_articles=positive_count,
+        negative_articles=negative_count,
+        neutral_articles=neutral_count
+    )
+
+    # Highlighted Events
+    highlighted_events_list = []
+    for article in processed_articles:
+        if article.detected_events:
+            for event in article.detected_events:
+                event_detail = f"{event}: {article.headline[:60]}..."
+                if event_detail not in highlighted_events_list:
+                     highlighted_events_list.append(event_detail)
+    highlighted_events_list = highlighted_events_list[:5]
+
+    return market_sentiment_obj, highlighted_events_list
+
 @router.get(
     "/outlook",
     response_model=MarketOutlookResponse,
@@ -70,52 +124,7 @@ async def get_market_outlook(
         main_topics = ai_results.get("topics")
 
         # 3. Synthesize Market Summary
-        positive_count, negative_count, neutral_count = 0, 0, 0
-        total_sentiment_score = 0
-        valid_sentiment_articles = 0
-
-        for article in processed_articles:
-            if article.sentiment_label:
-                if article.sentiment_label.upper() == "POSITIVE":
-                    positive_count += 1
-                elif article.sentiment_label.upper() == "NEGATIVE":
-                    negative_count += 1
-                else:
-                    neutral_count += 1
-            if article.sentiment_score is not None and article.sentiment_label and "ERROR" not in article.sentiment_label.upper() and "UNAVAILABLE" not in article.sentiment_label.upper():
-                total_sentiment_score += article.sentiment_score
-                valid_sentiment_articles += 1
-
-        avg_sentiment_score = None
-        overall_label = "Neutral"
-        if valid_sentiment_articles > 0:
-            avg_sentiment_score = round(total_sentiment_score / valid_sentiment_articles, 4)
-            if avg_sentiment_score > 0.15:
-                overall_label = "Positive"
-            elif avg_sentiment_score < -0.15:
-                overall_label = "Negative"
-        elif positive_count > negative_count:
-            overall_label = "Slightly Positive"
-        elif negative_count > positive_count:
-            overall_label = "Slightly Negative"
-
-        market_sentiment_obj = MarketSentiment(
-            overall_sentiment_label=overall_label,
-            average_sentiment_score=avg_sentiment_score,
-            positive_articles=positive_count,
-            negative_articles=negative_count,
-            neutral_articles=neutral_count
-        )
-
-        # Highlighted Events
-        highlighted_events_list = []
-        for article in processed_articles:
-            if article.detected_events:
-                for event in article.detected_events:
-                    event_detail = f"{event}: {article.headline[:60]}..."
-                    if event_detail not in highlighted_events_list:
-                         highlighted_events_list.append(event_detail)
-        highlighted_events_list = highlighted_events_list[:5]
+        market_sentiment_obj, highlighted_events_list = _synthesize_outlook(processed_articles)
 
         logger.info(f"Successfully generated market outlook for category: {news_category}")
         return MarketOutlookResponse(
@@ -127,10 +136,60 @@ async def get_market_outlook(
             processed_articles=processed_articles
         )
 
+    except InferenceError:
+        raise # Mapped to 503/504 by the app's exception handlers
     except Exception as e:
         logger.error(f"An unexpected error occurred during market outlook generation for {news_category}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
 
+@router.get(
+    "/outlook/stream",
+    summary="Stream a general market outlook",
+    description="Streaming variant of /outlook: each processed article is sent as an `article` event as soon as it is analyzed, "
+                "followed by a final `outlook` event with market sentiment, topics and highlighted events. "
+                "NDJSON by default, Server-Sent Events with format=sse."
+)
+async def stream_market_outlook(
+    news_category: str = Query("general", description="Category of general news to fetch (e.g., 'general', 'forex', 'crypto')."),
+    max_articles_to_process: int = Query(50, ge=10, le=100, description="Max number of raw news articles to fetch and process for the outlook."),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$", description="Stream encoding: 'ndjson' or 'sse'."),
+    data_aggregator: DataAggregatorService = Depends(get_data_aggregator_service),
+    ai_processor: AIProcessingService = Depends(get_ai_processing_service)
+):
+    logger.info(f"Starting streamed market outlook for category: {news_category}")
+
+    async def events() -> AsyncIterator[StreamEvent]:
+        try:
+            raw_market_news = await data_aggregator.get_general_market_news(category=news_category)
+            articles_to_process = (raw_market_news or [])[:max_articles_to_process]
+
+            processed_articles: List[NewsArticle] = []
+            async for article in ai_processor.stream_news_articles(articles_to_process):
+                processed_articles.append(article)
+                yield "article", article
+
+            if processed_articles:
+                market_sentiment_obj, highlighted_events_list = _synthesize_outlook(processed_articles)
+            else:
+                logger.warning(f"No general market news found for category: {news_category}")
+                market_sentiment_obj = MarketSentiment(overall_sentiment_label="Unavailable", positive_articles=0, negative_articles=0, neutral_articles=0)
+                highlighted_events_list = []
+
+            yield "outlook", MarketOutlookResponse(
+                timestamp=datetime.now(),
+                market_news_category=news_category,
+                market_sentiment=market_sentiment_obj,
+                topics=await inference_executor.run(ai_processor.get_topics, processed_articles),
+                highlighted_events=highlighted_events_list,
+                processed_articles=[] # Already streamed
+            )
+        except Exception as e:
+            # Headers are already sent, so errors are reported in-band
+            logger.error(f"An unexpected error occurred during streamed market outlook for {news_category}: {e}", exc_info=True)
+            yield "error", {"detail": f"An internal server error occurred: {str(e)}"}
+
+    return stream_events(events(), format)
+
 # Placeholder for a more advanced summary text generation if needed later
 # async def generate_market_summary_text(processed_articles: List[NewsArticle], market_sentiment: MarketSentiment) -> str:
 #     # This could involve sending key headlines or summaries to another LLM call for a narrative summary
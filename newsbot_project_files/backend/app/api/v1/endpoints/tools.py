@@ -7,6 +7,7 @@ from newsbot_project_files.backend.app.services.ai_processing_service import AIP
 # Re-use NewsArticle schema parts for AI analysis results, or define a new one
 from newsbot_project_files.backend.app.schemas.news import NewsArticle # For AI fields like sentiment, entities, etc.
 from newsbot_project_files.backend.app.core.logging import get_logger
+from app.core.inference_executor import InferenceError
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -110,6 +111,8 @@ async def scrape_and_analyze_url(
             ai_analysis=ai_features
         )
 
+    except InferenceError:
+        raise # Mapped to 503/504 by the app's exception handlers
     except Exception as e:
         logger.error(f"Unexpected error during scrape and analyze for {request.url}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
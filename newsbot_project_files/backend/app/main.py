@@ -8,6 +8,10 @@ from newsbot_project_files.backend.app.api.v1.endpoints import tools as tools_v1
 from newsbot_project_files.backend.app.api.v1.endpoints import portfolio as portfolio_v1
 from newsbot_project_files.backend.app.core.logging import get_logger
 from newsbot_project_files.backend.app.core.database import Base, engine
+from app.core.inference_executor import inference_executor, register_exception_handlers
+from app.core.async_utils import task_manager
+from newsbot_project_files.backend.app.processing.topic_modeling_service import topic_service
+from newsbot_project_files.backend.app.services.ai_processing_service import shutdown_stage_pool
 
 logger = get_logger(__name__)
 
@@ -16,6 +20,8 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+register_exception_handlers(app)
+
 # CORS Middleware
 # Adjust origins as necessary for your frontend URL in production
 origins = [
@@ -43,10 +49,19 @@ app.include_router(portfolio_v1.router, prefix=f"{settings.API_V1_STR}/portfolio
 async def startup_event():
     logger.info("NewsBot API starting up...")
     Base.metadata.create_all(bind=engine)
+    # Topic requests only run `transform`; the model is refreshed from recent articles in the background.
+    # The update loop never finishes, so it runs in the unlimited default pool rather than taking a
+    # "maintenance" slot for good
+    task_id = await task_manager.start_task("topic_model_update", topic_service.run_updates(), long_running=True)
+    if not task_id:
+        logger.error("Topic model updates could not be started; topics are served from the current model only.")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("NewsBot API shutting down...")
+    task_manager.cancel_by_name("topic_model_update")
+    inference_executor.shutdown()
+    shutdown_stage_pool()
     # Add shutdown logic here, like closing database connections
 
 @app.get("/", tags=["Root"])
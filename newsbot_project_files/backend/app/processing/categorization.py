@@ -4,6 +4,7 @@ import re
 import torch
 
 from newsbot_project_files.backend.app.core.logging import get_logger
+from app.core.pattern_matcher import PatternMatcher, get_matcher
 
 logger = get_logger(__name__)
 
@@ -19,6 +20,8 @@ DEFAULT_CATEGORIES_KEYWORDS = {
     'Executive Changes': ['ceo', 'cfo', 'cto', 'board member', 'appoint', 'resign', 'hire', 'fire', 'executive appointment', 'management change'],
     'General Company News': ['company update', 'outlook', 'strategy', 'expansion', 'restructuring'] # Fallback category
 }
+# Built once; the default keywords are lowercase, like the text they are matched against
+_default_keyword_matcher = PatternMatcher(DEFAULT_CATEGORIES_KEYWORDS, literal=True, word_boundaries=True)
 
 def _load_zero_shot_model(model_name: str = DEFAULT_ZERO_SHOT_MODEL):
     global zero_shot_classifier
@@ -43,15 +46,13 @@ def categorize_news_keyword(text: str, categories_keywords: Dict[str, List[str]]
         logger.warning("Cannot categorize empty text (keyword).")
         return "Uncategorized"
 
-    text_lower = text.lower()
-    category_scores = {category: 0 for category in categories_keywords}
-
-    for category, keywords in categories_keywords.items():
-        for keyword in keywords:
-            if re.search(r'\b' + re.escape(keyword.lower()) + r'\b', text_lower): # Use word boundaries
-                category_scores[category] += 1
-
-    non_zero_scores = {cat: score for cat, score in category_scores.items() if score > 0}
+    # One compiled scan over all keywords (with word boundaries); counts distinct keywords per category
+    if categories_keywords is DEFAULT_CATEGORIES_KEYWORDS:
+        matcher = _default_keyword_matcher
+    else:
+        # re.IGNORECASE instead of a lowercased copy of the keywords on every call
+        matcher = get_matcher(categories_keywords, literal=True, word_boundaries=True, flags=re.IGNORECASE)
+    non_zero_scores = matcher.label_counts(text.lower())
     if not non_zero_scores:
         logger.info(f"No keywords matched for text (keyword): '{text[:100]}...'. Defaulting to 'General Company News'.")
         return "General Company News"
@@ -136,6 +137,9 @@ DEFAULT_EVENT_PATTERNS = {
         r'leadership (change|transition|shakeup)'
     ]
 }
+# The default patterns are all lowercase, so they run on the lowercased text without
+# re.IGNORECASE, which makes every pattern several times slower in `re`
+_default_event_matcher = PatternMatcher(DEFAULT_EVENT_PATTERNS)
 
 def detect_events(text: str, event_patterns: Dict[str, List[str]] = None) -> List[str]:
     if event_patterns is None:
@@ -146,17 +150,12 @@ def detect_events(text: str, event_patterns: Dict[str, List[str]] = None) -> Lis
         logger.warning("Cannot detect events in empty text.")
         return detected_event_types
 
-    text_lower = text.lower() # Some regex patterns might be case-insensitive, but good to normalize
-
-    for event_type, patterns in event_patterns.items():
-        for pattern in patterns:
-            # Using re.IGNORECASE for flexibility with capitalization in news
-            if re.search(pattern, text, re.IGNORECASE):
-                if event_type not in detected_event_types: # Add only once
-                    detected_event_types.append(event_type)
-                # Found a match for this event type, can break from inner loop (patterns for this event)
-                # Or continue if multiple patterns for the same event type might indicate stronger signal (not implemented here)
-                break
+    # Each event type's patterns are one compiled alternation, searched once
+    if event_patterns is DEFAULT_EVENT_PATTERNS:
+        detected_event_types = _default_event_matcher.labels(text.lower())
+    else:
+        # re.IGNORECASE for flexibility with capitalization in news
+        detected_event_types = get_matcher(event_patterns, flags=re.IGNORECASE).labels(text)
 
     if detected_event_types:
         logger.info(f"Detected events for '{text[:50]}...': {detected_event_types}")
@@ -1,8 +1,8 @@
-from transformers import pipeline, AutoTokenizer, AutoModelForTokenClassification
 from typing import List, Dict, Optional
-import torch
 
 from newsbot_project_files.backend.app.core.logging import get_logger
+from app.core.inference_backend import load_pipeline, resolve_backend
+from app.core.micro_batcher import get_micro_batcher
 
 logger = get_logger(__name__)
 
@@ -31,16 +31,10 @@ def _load_ner_model(model_name: str = DEFAULT_NER_MODEL):
     global ner_pipeline
     if ner_pipeline is None:
         try:
-            logger.info(f"Loading NER model: {model_name}")
-            # It's good practice to load tokenizer and model separately for some configurations,
-            # but pipeline usually handles it. Using explicit model and tokenizer for clarity.
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            model = AutoModelForTokenClassification.from_pretrained(model_name)
-            ner_pipeline = pipeline(
+            logger.info(f"Loading NER model: {model_name} ('{resolve_backend()}' backend)")
+            ner_pipeline = load_pipeline(
                 "ner",
-                model=model,
-                tokenizer=tokenizer,
-                device=0 if torch.cuda.is_available() else -1,
+                model_name,
                 # Group entities for models that support it (like dslim/bert-base-NER)
                 # This combines B-ORG and I-ORG into a single "Apple Inc." entity
                 aggregation_strategy="simple"
@@ -50,6 +44,26 @@ def _load_ner_model(model_name: str = DEFAULT_NER_MODEL):
             logger.error(f"Error loading NER model {model_name}: {e}", exc_info=True)
             ner_pipeline = None
 
+def _run_ner_batch(texts: List[str]) -> List[List[Dict[str, any]]]:
+    return ner_pipeline(texts, truncation=True, batch_size=len(texts))
+
+def _ner_batcher():
+    # Concurrent callers share forward passes
+    return get_micro_batcher(f"ner:{DEFAULT_NER_MODEL}", _run_ner_batch)
+
+def _filter_entities(raw_entities: List[Dict[str, any]], confidence_threshold: float) -> List[Dict[str, any]]:
+    return [
+        {
+            "text": entity.get("word"),
+            "label": entity.get("entity_group"), # Using entity_group from aggregation
+            "score": round(float(entity.get("score")), 4),
+            "start_offset": entity.get("start"),
+            "end_offset": entity.get("end")
+        }
+        for entity in raw_entities or []
+        if entity.get('score', 0) >= confidence_threshold
+    ]
+
 def extract_entities(text: str, model_name: str = DEFAULT_NER_MODEL, confidence_threshold: float = 0.85) -> Optional[List[Dict[str, any]]]:
     global ner_pipeline
     if ner_pipeline is None:
@@ -66,21 +80,10 @@ def extract_entities(text: str, model_name: str = DEFAULT_NER_MODEL, confidence_
         logger.debug(f"Performing NER on: '{text[:100]}...'")
         # The pipeline with aggregation_strategy="simple" returns a list of dicts:
         # [{'entity_group': 'ORG', 'score': 0.99, 'word': 'Apple', 'start': 0, 'end': 5}, ...]
-        raw_entities = ner_pipeline(text, truncation=True)
+        raw_entities = _ner_batcher().predict(text)
 
-        processed_entities = []
         if raw_entities:
-            for entity in raw_entities:
-                if entity.get('score', 0) >= confidence_threshold:
-                    processed_entity = {
-                        "text": entity.get("word"),
-                        "label": entity.get("entity_group"), # Using entity_group from aggregation
-                        "score": round(float(entity.get("score")), 4),
-                        "start_offset": entity.get("start"),
-                        "end_offset": entity.get("end")
-                    }
-                    processed_entities.append(processed_entity)
-
+            processed_entities = _filter_entities(raw_entities, confidence_threshold)
             logger.info(f"Extracted {len(processed_entities)} entities from '{text[:50]}...' (threshold {confidence_threshold})")
             return processed_entities
         else:
@@ -91,6 +94,28 @@ def extract_entities(text: str, model_name: str = DEFAULT_NER_MODEL, confidence_
         logger.error(f"Error during NER for text '{text[:50]}...': {e}", exc_info=True)
         return None # Indicate error, distinct from empty list
 
+def extract_entities_batch(texts: List[str], model_name: str = DEFAULT_NER_MODEL,
+                           confidence_threshold: float = 0.85) -> List[Optional[List[Dict[str, any]]]]:
+    """Batched `extract_entities`: one entry per text, [] for empty texts and None for texts that failed."""
+    global ner_pipeline
+    if ner_pipeline is None:
+        _load_ner_model(model_name)
+        if ner_pipeline is None:
+            logger.error("NER model could not be loaded. Cannot perform entity extraction.")
+            return [None] * len(texts)
+
+    results: List[Optional[List[Dict[str, any]]]] = [[] for _ in texts]
+    valid = [i for i, text in enumerate(texts) if text and isinstance(text, str) and text.strip()]
+    outputs = _ner_batcher().predict_many([texts[i] for i in valid], return_exceptions=True)
+    for i, raw_entities in zip(valid, outputs):
+        if isinstance(raw_entities, Exception):
+            logger.error(f"Error during NER for text '{texts[i][:50]}...': {raw_entities}")
+            results[i] = None # Indicate error, distinct from empty list
+        else:
+            results[i] = _filter_entities(raw_entities, confidence_threshold)
+    logger.info(f"Extracted entities from {len(valid)} texts (threshold {confidence_threshold})")
+    return results
+
 # Example usage (for testing)
 if __name__ == "__main__":
     sample_text = "Apple Inc. is planning to build a new factory in Austin, Texas. Tim Cook announced this yesterday."
@@ -1,8 +1,9 @@
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-from typing import Dict, Optional
-import torch # PyTorch is a dependency for Hugging Face transformers
+from typing import Dict, List, Optional
 
 from newsbot_project_files.backend.app.core.logging import get_logger
+from app.core.inference_backend import load_pipeline, resolve_backend
+from app.core.inference_cache import inference_cache, model_revision
+from app.core.micro_batcher import get_micro_batcher
 
 logger = get_logger(__name__)
 
@@ -16,17 +17,21 @@ def _load_sentiment_model(model_name: str = DEFAULT_SENTIMENT_MODEL):
     global sentiment_analyzer #, sentiment_tokenizer, sentiment_model
     if sentiment_analyzer is None:
         try:
-            logger.info(f"Loading sentiment analysis model: {model_name}")
-            sentiment_analyzer = pipeline(
-                "sentiment-analysis",
-                model=model_name,
-                device=0 if torch.cuda.is_available() else -1 # Use GPU if available, else CPU
-            )
+            logger.info(f"Loading sentiment analysis model: {model_name} ('{resolve_backend()}' backend)")
+            # GPU if available, else CPU with the configured INFERENCE_BACKEND (fp32, int8 or ONNX)
+            sentiment_analyzer = load_pipeline("sentiment-analysis", model_name)
             logger.info(f"Sentiment analysis model {model_name} loaded successfully.")
         except Exception as e:
             logger.error(f"Error loading sentiment model {model_name}: {e}", exc_info=True)
             sentiment_analyzer = None
 
+def _run_sentiment_batch(texts: List[str]) -> List[Dict[str, any]]:
+    return sentiment_analyzer(texts, truncation=True, batch_size=len(texts))
+
+def _sentiment_batcher():
+    # Concurrent callers share forward passes
+    return get_micro_batcher(f"sentiment:{DEFAULT_SENTIMENT_MODEL}", _run_sentiment_batch)
+
 def get_sentiment(text: str, model_name: str = DEFAULT_SENTIMENT_MODEL) -> Optional[Dict[str, any]]:
     global sentiment_analyzer
     if sentiment_analyzer is None:
@@ -39,18 +44,74 @@ def get_sentiment(text: str, model_name: str = DEFAULT_SENTIMENT_MODEL) -> Optio
         logger.warning("Cannot perform sentiment analysis on empty text.")
         return {"label": "NEUTRAL", "score": 0.0, "error": "Empty input"}
 
+    # Results are keyed on the model that is actually loaded, not the requested name
+    loaded_model_name = getattr(sentiment_analyzer.model, "name_or_path", model_name)
+    revision = model_revision(sentiment_analyzer)
+    cached = inference_cache.get(loaded_model_name, text, revision)
+    if cached is not None:
+        logger.debug(f"Sentiment cache hit for: '{text[:50]}...'")
+        return cached
+
     try:
         # Pipeline handles truncation if text is too long for the model
         logger.debug(f"Performing sentiment analysis on: '{text[:100]}...'")
-        result = sentiment_analyzer(text, truncation=True)
+        analysis = _sentiment_batcher().predict(text)
 
-        if result and isinstance(result, list):
-            analysis = result[0]
+        if analysis:
             logger.info(f"Sentiment for '{text[:50]}...': {analysis['label']}, Score: {analysis['score']:.4f}")
-            return {"label": analysis["label"].upper(), "score": round(analysis["score"], 4)}
+            sentiment = {"label": analysis["label"].upper(), "score": round(analysis["score"], 4)}
+            inference_cache.set(loaded_model_name, text, sentiment, revision)
+            return sentiment
         else:
             logger.warning(f"Sentiment analysis did not return expected result for: {text[:50]}...")
             return None
     except Exception as e:
         logger.error(f"Error during sentiment analysis for text '{text[:50]}...': {e}", exc_info=True)
         return {"label": "ERROR", "score": 0.0, "error": str(e)}
+
+def get_sentiments(texts: List[str], model_name: str = DEFAULT_SENTIMENT_MODEL) -> List[Optional[Dict[str, any]]]:
+    """
+    Batched `get_sentiment` with the same per-text results: cache misses go to the model
+    together, and a text that fails only gets an ERROR result for itself.
+    """
+    global sentiment_analyzer
+    if sentiment_analyzer is None:
+        _load_sentiment_model(model_name)
+        if sentiment_analyzer is None:
+            logger.error("Sentiment model could not be loaded. Cannot perform sentiment analysis.")
+            return [None] * len(texts)
+
+    results: List[Optional[Dict[str, any]]] = [None] * len(texts)
+    valid = []
+    for i, text in enumerate(texts):
+        if not text or not isinstance(text, str) or len(text.strip()) == 0:
+            results[i] = {"label": "NEUTRAL", "score": 0.0, "error": "Empty input"}
+        else:
+            valid.append(i)
+    if not valid:
+        return results
+
+    errors: Dict[str, str] = {}
+
+    def compute(batch: List[str]) -> List[Optional[Dict[str, any]]]:
+        outputs = []
+        for text, output in zip(batch, _sentiment_batcher().predict_many(batch, return_exceptions=True)):
+            if isinstance(output, Exception):
+                errors[text] = str(output)
+                outputs.append(None) # Not cached
+            else:
+                outputs.append({"label": output["label"].upper(), "score": round(output["score"], 4)})
+        return outputs
+
+    loaded_model_name = getattr(sentiment_analyzer.model, "name_or_path", model_name)
+    sentiments = inference_cache.get_or_compute(
+        loaded_model_name, [texts[i] for i in valid], compute, revision=model_revision(sentiment_analyzer)
+    )
+    for i, sentiment in zip(valid, sentiments):
+        if sentiment is None:
+            error = errors.get(texts[i], "No result")
+            logger.error(f"Error during sentiment analysis for text '{texts[i][:50]}...': {error}")
+            sentiment = {"label": "ERROR", "score": 0.0, "error": error}
+        results[i] = sentiment
+    logger.info(f"Sentiment analysis done for {len(valid)} texts.")
+    return results
@@ -1,29 +1,53 @@
-from transformers import pipeline
-from typing import Optional
-import torch
+from typing import Dict, List, Optional, Tuple
 
 from newsbot_project_files.backend.app.core.logging import get_logger
+from app.core.inference_backend import load_pipeline, resolve_backend
+from app.core.micro_batcher import get_micro_batcher
 
 logger = get_logger(__name__)
 
 DEFAULT_SUMMARIZATION_MODEL = "t5-small" # Small and fast, decent quality for MVP
+# Summary max_length is rounded up to one of these, so batched texts share a few forward passes
+SUMMARY_MAX_LENGTH_BUCKETS = (50, 100, 150)
 summarizer = None
 
 def _load_summarization_model(model_name: str = DEFAULT_SUMMARIZATION_MODEL):
     global summarizer
     if summarizer is None:
         try:
-            logger.info(f"Loading summarization model: {model_name}")
-            summarizer = pipeline(
-                "summarization",
-                model=model_name,
-                device=0 if torch.cuda.is_available() else -1
-            )
+            logger.info(f"Loading summarization model: {model_name} ('{resolve_backend()}' backend)")
+            summarizer = load_pipeline("summarization", model_name)
             logger.info(f"Summarization model {model_name} loaded successfully.")
         except Exception as e:
             logger.error(f"Error loading summarization model {model_name}: {e}", exc_info=True)
             summarizer = None
 
+def _summary_limits(text: str, min_length: int, max_length_ratio: float) -> int:
+    # Calculate max_length based on ratio of original text, rounded up to a bucket and capped at the largest one.
+    estimated_max_length = int(len(text.split()) * max_length_ratio) # Based on word count
+    actual_max_length = next((bucket for bucket in SUMMARY_MAX_LENGTH_BUCKETS if bucket >= estimated_max_length),
+                             SUMMARY_MAX_LENGTH_BUCKETS[-1])
+    if actual_max_length <= min_length:
+        actual_max_length = min_length + 10 # ensure max is greater than min
+    return actual_max_length
+
+def _run_summarization_batch(requests: List[Tuple[str, int, int]]) -> List[Dict[str, str]]:
+    """Summarizes (text, min_length, max_length) requests; texts with the same length limits share a forward pass."""
+    results: List[Optional[Dict[str, str]]] = [None] * len(requests)
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    for i, (_, min_length, max_length) in enumerate(requests):
+        groups.setdefault((min_length, max_length), []).append(i)
+    for (min_length, max_length), indices in groups.items():
+        outputs = summarizer([requests[i][0] for i in indices], min_length=min_length, max_length=max_length,
+                             truncation=True, do_sample=False, batch_size=len(indices))
+        for i, output in zip(indices, outputs):
+            results[i] = output
+    return results
+
+def _summarization_batcher():
+    # Concurrent callers share forward passes
+    return get_micro_batcher(f"summarization:{DEFAULT_SUMMARIZATION_MODEL}", _run_summarization_batch)
+
 def summarize_text(text: str, model_name: str = DEFAULT_SUMMARIZATION_MODEL, min_length: int = 20, max_length_ratio: float = 0.5) -> Optional[str]:
     global summarizer
     if summarizer is None:
@@ -37,23 +61,19 @@ def summarize_text(text: str, model_name: str = DEFAULT_SUMMARIZATION_MODEL, min
         return text
 
     try:
-        # Calculate max_length based on ratio of original text, but cap it to avoid being too long.
         # The model itself has a max input token limit (e.g. 512 or 1024 for t5-small's encoder)
         # The pipeline should handle truncation of input.
         # We set max_length for the *output* summary.
         # Ensure max_length is not less than min_length.
-        estimated_max_length = int(len(text.split()) * max_length_ratio) # Based on word count
-        actual_max_length = max(min_length + 5, min(estimated_max_length, 150)) # Cap at 150 words, ensure min_length < max_length
-        if actual_max_length <= min_length :
-             actual_max_length = min_length + 10 # ensure max is greater than min
+        actual_max_length = _summary_limits(text, min_length, max_length_ratio)
 
         logger.debug(f"Performing summarization on text (length {len(text)} chars)... Target min/max: {min_length}/{actual_max_length} words.")
 
         # `truncation=True` is important for the pipeline to handle inputs longer than model's capacity
-        result = summarizer(text, min_length=min_length, max_length=actual_max_length, truncation=True, do_sample=False)
+        result = _summarization_batcher().predict((text, min_length, actual_max_length))
 
-        if result and isinstance(result, list) and 'summary_text' in result[0]:
-            summary = result[0]['summary_text']
+        if result and 'summary_text' in result:
+            summary = result['summary_text']
             logger.info(f"Summarized text (original {len(text)} chars) to (summary {len(summary)} chars): '{summary[:100]}...'")
             return summary.strip()
         else:
@@ -62,3 +82,31 @@ def summarize_text(text: str, model_name: str = DEFAULT_SUMMARIZATION_MODEL, min
     except Exception as e:
         logger.error(f"Error during summarization for text '{text[:50]}...': {e}", exc_info=True)
         return f"Error in summarization: {str(e)}" # Return error message in summary
+
+def summarize_texts(texts: List[str], model_name: str = DEFAULT_SUMMARIZATION_MODEL, min_length: int = 20,
+                    max_length_ratio: float = 0.5) -> List[Optional[str]]:
+    """
+    Batched `summarize_text` with the same per-text results: short texts come back
+    unchanged and a text that fails gets an "Error in summarization: ..." string.
+    """
+    global summarizer
+    if summarizer is None:
+        _load_summarization_model(model_name)
+        if summarizer is None:
+            logger.error("Summarization model not loaded. Cannot perform summarization.")
+            return [None] * len(texts)
+
+    results: List[Optional[str]] = list(texts)
+    valid = [i for i, text in enumerate(texts) if text and isinstance(text, str) and len(text.strip()) >= 30]
+    requests = [(texts[i], min_length, _summary_limits(texts[i], min_length, max_length_ratio)) for i in valid]
+    for i, output in zip(valid, _summarization_batcher().predict_many(requests, return_exceptions=True)):
+        if isinstance(output, Exception):
+            logger.error(f"Error during summarization for text '{texts[i][:50]}...': {output}")
+            results[i] = f"Error in summarization: {str(output)}"
+        elif output and 'summary_text' in output:
+            results[i] = output['summary_text'].strip()
+        else:
+            logger.warning(f"Summarization did not return expected result for text: {texts[i][:50]}...")
+            results[i] = None
+    logger.info(f"Summarized {len(valid)} texts.")
+    return results
@@ -1,83 +1,202 @@
 from bertopic import BERTopic
-from typing import List, Optional, Union
-import torch
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+import asyncio
+import threading
+import time
 from newsbot_project_files.backend.app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 DEFAULT_TOPIC_MODEL = "MaartenGr/BERTopic_Wikipedia"
-topic_model = None
 
-def _load_topic_model(model_name: str = DEFAULT_TOPIC_MODEL):
-    global topic_model
-    if topic_model is None:
-        try:
-            logger.info(f"Loading topic modeling model: {model_name}")
-            # BERTopic handles device placement automatically with 'auto'
-            topic_model = BERTopic.load(model_name)
-            logger.info(f"Topic modeling model {model_name} loaded successfully.")
-        except Exception as e:
-            logger.error(f"Error loading topic model {model_name}: {e}", exc_info=True)
-            topic_model = None
+# Online updates: a model fitted on the most recent articles is merged into the base model
+TOPIC_UPDATE_WINDOW = 2000 # Recent documents kept for the next update
+TOPIC_UPDATE_MIN_DOCS = 200 # Skip updates until this many new documents have been seen
+TOPIC_UPDATE_INTERVAL_SECONDS = 15 * 60
+TOPIC_MERGE_MIN_SIMILARITY = 0.7 # New topics closer than this to an existing one are folded into it
 
-def get_topics(docs: Union[str, List[str]], model_name: str = DEFAULT_TOPIC_MODEL) -> Optional[dict]:
-    global topic_model
-    if topic_model is None:
-        _load_topic_model(model_name)
-        if topic_model is None:
+class TopicService:
+    """
+    Topic modeling over a fitted model that is only read on the request path.
+
+    Requests run `transform` on the current model and look topic names up in a
+    topic-info table cached alongside it. Documents seen by requests go into a
+    sliding window; `update` fits a small BERTopic on that window and merges it
+    into the base model (`BERTopic.merge_models`), then swaps the merged model and
+    its topic info in as one tuple, so a request never sees a half-updated model.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_TOPIC_MODEL, window_size: int = TOPIC_UPDATE_WINDOW,
+                 min_new_docs: int = TOPIC_UPDATE_MIN_DOCS):
+        self.model_name = model_name
+        self.min_new_docs = min_new_docs
+        self._base_model: Optional[BERTopic] = None
+        # (model, topic id -> topic info row, version); replaced as a whole, never mutated
+        self._state: Optional[Tuple[BERTopic, Dict[int, Dict[str, Any]], int]] = None
+        self._load_failed = False
+        self._load_lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._window: Deque[str] = deque(maxlen=window_size)
+        self._window_lock = threading.Lock()
+        self._new_docs = 0
+        self.last_update: Optional[float] = None
+        self.last_update_seconds: Optional[float] = None
+
+    @staticmethod
+    def _topic_info(model: BERTopic) -> Dict[int, Dict[str, Any]]:
+        return {int(row["Topic"]): row for row in model.get_topic_info().to_dict(orient="records")}
+
+    def _get_state(self) -> Optional[Tuple[BERTopic, Dict[int, Dict[str, Any]], int]]:
+        if self._state is not None or self._load_failed:
+            return self._state
+        with self._load_lock:
+            if self._state is None and not self._load_failed:
+                try:
+                    logger.info(f"Loading topic modeling model: {self.model_name}")
+                    # BERTopic handles device placement automatically with 'auto'
+                    self._base_model = BERTopic.load(self.model_name)
+                    self._state = (self._base_model, self._topic_info(self._base_model), 0)
+                    logger.info(f"Topic modeling model {self.model_name} loaded successfully.")
+                except Exception as e:
+                    logger.error(f"Error loading topic model {self.model_name}: {e}", exc_info=True)
+                    self._load_failed = True
+        return self._state
+
+    @property
+    def model(self) -> Optional[BERTopic]:
+        state = self._get_state()
+        return state[0] if state else None
+
+    def _remember(self, docs: List[str]):
+        with self._window_lock:
+            self._window.extend(docs)
+            self._new_docs += len(docs)
+
+    def get_topics(self, docs: Union[str, List[str]]) -> Optional[dict]:
+        state = self._get_state()
+        if state is None:
             logger.error("Topic model could not be loaded. Cannot perform topic modeling.")
             return None
 
-    if not docs or (isinstance(docs, list) and not docs):
-        logger.warning("Cannot perform topic modeling on empty input.")
-        return {"topics": [], "probabilities": [], "error": "Empty input"}
+        if not docs or (isinstance(docs, list) and not docs):
+            logger.warning("Cannot perform topic modeling on empty input.")
+            return {"topics": [], "probabilities": [], "error": "Empty input"}
 
-    try:
-        logger.debug(f"Performing topic modeling on {len(docs)} documents.")
-        # The `transform` method can take a single doc or a list of docs
-        topics, probs = topic_model.transform(docs)
+        model, topic_info, _ = state
+        try:
+            logger.debug(f"Performing topic modeling on {len(docs)} documents.")
+            # The `transform` method can take a single doc or a list of docs
+            topics, probs = model.transform(docs)
 
-        # Get topic representations
-        topic_labels = [topic_model.topic_labels_.get(t, f"Topic {t}") for t in topics]
+            # Get topic representations
+            topic_labels = [model.topic_labels_.get(t, f"Topic {t}") for t in topics]
 
-        logger.info(f"Identified topics for {len(docs)} documents.")
-        return {"topics": topics, "probabilities": probs, "topic_labels": topic_labels}
-    except Exception as e:
-        logger.error(f"Error during topic modeling: {e}", exc_info=True)
-        return {"topics": [], "probabilities": [], "error": str(e)}
+            logger.info(f"Identified topics for {len(docs)} documents.")
+            return {"topics": topics, "probabilities": probs, "topic_labels": topic_labels}
+        except Exception as e:
+            logger.error(f"Error during topic modeling: {e}", exc_info=True)
+            return {"topics": [], "probabilities": [], "error": str(e)}
 
-def get_main_topics(docs: List[str], top_n: int = 5, model_name: str = DEFAULT_TOPIC_MODEL) -> Optional[dict]:
-    """
-    A convenience function to get the most frequent topics from a list of documents.
-    """
-    global topic_model
-    if topic_model is None:
-        _load_topic_model(model_name)
-        if topic_model is None:
+    def get_main_topics(self, docs: List[str], top_n: int = 5) -> Optional[dict]:
+        """
+        The most frequent topics among `docs`: one `transform` over the current model,
+        with names and representations from the cached topic info. `Count` is the
+        number of the given documents assigned to the topic.
+        """
+        state = self._get_state()
+        if state is None:
             return None
 
-    if not docs or not isinstance(docs, list) or len(docs) == 0:
-        logger.warning("Cannot perform topic modeling on empty list of documents.")
-        return {"top_topics": [], "error": "Empty input"}
+        if not docs or not isinstance(docs, list) or len(docs) == 0:
+            logger.warning("Cannot perform topic modeling on empty list of documents.")
+            return {"top_topics": [], "error": "Empty input"}
+
+        model, topic_info, version = state
+        try:
+            topics, _ = model.transform(docs)
+            self._remember(docs)
+
+            # Most frequent topics, without the outlier topic (-1)
+            counts = Counter(int(t) for t in topics if int(t) != -1)
+            top_topics_dict = [
+                {**topic_info.get(topic, {"Topic": topic, "Name": f"Topic {topic}"}), "Count": count}
+                for topic, count in counts.most_common(top_n)
+            ]
+
+            logger.info(f"Identified top {top_n} topics from {len(docs)} documents (model version {version}).")
+            return {"top_topics": top_topics_dict}
+        except Exception as e:
+            logger.error(f"Error during main topic identification: {e}", exc_info=True)
+            return {"top_topics": [], "error": str(e)}
+
+    def update(self) -> bool:
+        """
+        Fits a model on the recent-document window, merges it into the base model and
+        swaps the result in. Runs off the request path; returns True if the model changed.
+        """
+        if self._get_state() is None:
+            return False
+        if not self._update_lock.acquire(blocking=False):
+            return False # An update is already running
+        try:
+            with self._window_lock:
+                if self._new_docs < self.min_new_docs:
+                    return False
+                docs = list(dict.fromkeys(self._window)) # Repeated headlines would skew the fit
+                self._new_docs = 0
+
+            start = time.perf_counter()
+            base = self._base_model
+            window_model = BERTopic(embedding_model=base.embedding_model, min_topic_size=10)
+            window_model.fit(docs)
+            # Always merge into the base model, so topics don't accumulate across updates
+            merged = BERTopic.merge_models([base, window_model], min_similarity=TOPIC_MERGE_MIN_SIMILARITY)
+            topic_info = self._topic_info(merged)
+
+            version = self._state[2] + 1
+            self._state = (merged, topic_info, version) # Atomic swap; in-flight requests keep their snapshot
+            self.last_update = time.time()
+            self.last_update_seconds = round(time.perf_counter() - start, 2)
+            new_topics = len(topic_info) - len(self._topic_info(base))
+            logger.info(f"Topic model updated to version {version} from {len(docs)} recent documents "
+                        f"({new_topics} topics beyond the base model) in {self.last_update_seconds}s.")
+            return True
+        except Exception as e:
+            logger.error(f"Topic model update failed; keeping the current model: {e}", exc_info=True)
+            return False
+        finally:
+            self._update_lock.release()
 
-    try:
-        # The fit_transform method is used to both fit the model and transform the docs.
-        # This is more suitable for finding topics in a batch of documents.
-        topics, _ = topic_model.fit_transform(docs)
+    async def run_updates(self, interval_seconds: float = TOPIC_UPDATE_INTERVAL_SECONDS):
+        """Background job: periodically runs `update` in a worker thread."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await asyncio.to_thread(self.update)
 
-        # Get the most frequent topics
-        frequent_topics = topic_model.get_topic_info().head(top_n + 1) # +1 to account for the outlier topic (-1)
+    def get_stats(self) -> Dict[str, Any]:
+        state = self._state
+        with self._window_lock:
+            window, new_docs = len(self._window), self._new_docs
+        return {
+            "model": self.model_name,
+            "loaded": state is not None,
+            "version": state[2] if state else None,
+            "topics": len(state[1]) if state else 0,
+            "window_docs": window,
+            "new_docs_since_update": new_docs,
+            "last_update": self.last_update,
+            "last_update_seconds": self.last_update_seconds
+        }
 
-        # Filter out the outlier topic if it's present
-        if frequent_topics.iloc[0]["Topic"] == -1:
-            frequent_topics = frequent_topics.iloc[1:]
-        else:
-            frequent_topics = frequent_topics.head(top_n)
+# Global instance
+topic_service = TopicService()
 
-        top_topics_dict = frequent_topics.to_dict(orient='records')
+def get_topics(docs: Union[str, List[str]], model_name: str = DEFAULT_TOPIC_MODEL) -> Optional[dict]:
+    return topic_service.get_topics(docs)
 
-        logger.info(f"Identified top {top_n} topics from {len(docs)} documents.")
-        return {"top_topics": top_topics_dict}
-    except Exception as e:
-        logger.error(f"Error during main topic identification: {e}", exc_info=True)
-        return {"top_topics": [], "error": str(e)}
+def get_main_topics(docs: List[str], top_n: int = 5, model_name: str = DEFAULT_TOPIC_MODEL) -> Optional[dict]:
+    """
+    A convenience function to get the most frequent topics from a list of documents.
+    """
+    return topic_service.get_main_topics(docs, top_n=top_n)
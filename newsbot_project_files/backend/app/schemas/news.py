@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime # Finnhub uses unixtimestamp
 
 class NewsArticle(BaseModel):
@@ -18,7 +18,7 @@ class NewsArticle(BaseModel):
     sentiment_score: Optional[float] = None
     analyzed_category: Optional[str] = None # e.g., 'Financial Performance', 'Product Launch'
     ai_summary: Optional[str] = None # Summary generated by AI
-    entities: Optional[List[Dict[str, any]]] = None # List of extracted entities e.g. [{'entity': 'Apple', 'label': 'ORG'}]
+    entities: Optional[List[Dict[str, Any]]] = None # List of extracted entities e.g. [{'entity': 'Apple', 'label': 'ORG'}]
     detected_events: Optional[List[str]] = None # E.g. ["Earnings", "M&A"]
 
 class CompanyNews(BaseModel):
@@ -1,96 +1,202 @@
-from typing import List, Dict, Optional
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, List, Dict, Optional
 from newsbot_project_files.backend.app.schemas.news import NewsArticle
 from newsbot_project_files.backend.app.core.logging import get_logger
-from newsbot_project_files.backend.app.processing.sentiment import get_sentiment
+from newsbot_project_files.backend.app.processing.sentiment import get_sentiments
 from newsbot_project_files.backend.app.processing.categorization import categorize_news, DEFAULT_CATEGORIES_KEYWORDS, detect_events
-from newsbot_project_files.backend.app.processing.summarization import summarize_text
-from newsbot_project_files.backend.app.processing.ner import extract_entities
+from newsbot_project_files.backend.app.processing.summarization import summarize_texts
+from newsbot_project_files.backend.app.processing.ner import extract_entities_batch
 from newsbot_project_files.backend.app.processing.topic_modeling_service import get_main_topics
+from app.core.config import settings as app_settings
+from app.core.inference_executor import inference_executor
 
 logger = get_logger(__name__)
 
+# Model stages each inference job runs concurrently (sentiment, NER, summarization)
+_STAGES_PER_JOB = 3
+
+# Threads for the concurrent model stages of a batch; they only wait on the models' micro-batchers.
+# Created on first use and shut down with the app.
+_stage_pool: Optional[ThreadPoolExecutor] = None
+_stage_pool_lock = threading.Lock()
+
+def _get_stage_pool() -> ThreadPoolExecutor:
+    global _stage_pool
+    with _stage_pool_lock:
+        if _stage_pool is None:
+            workers = app_settings.INFERENCE_STAGE_WORKERS or _STAGES_PER_JOB * inference_executor.max_workers
+            _stage_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-stage")
+        return _stage_pool
+
+def shutdown_stage_pool(wait: bool = False):
+    global _stage_pool
+    with _stage_pool_lock:
+        pool, _stage_pool = _stage_pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+# Marks articles whose summary was too short to send to the summarizer
+_NOT_SUMMARIZED = object()
+
 class AIProcessingService:
 
     def __init__(self):
         # Models are loaded lazily by the processing functions on first use.
         logger.info("AIProcessingService initialized. Models will be loaded on first use.")
 
-    async def process_news_articles(self, articles: List[NewsArticle]) -> Dict[str, any]:
-        processed_articles: List[NewsArticle] = []
+    # For MVP, let's set zero-shot to False. Can be a config option later.
+    USE_ZERO_SHOT_CATEGORIZATION = False
 
-        # For MVP, let's set zero-shot to False. Can be a config option later.
-        use_zero_shot_categorization = False
-        candidate_category_labels = list(DEFAULT_CATEGORIES_KEYWORDS.keys())
+    def _run_model_stages(self, articles: List[NewsArticle]) -> Dict[str, List[any]]:
+        """
+        Runs each model stage (sentiment, NER, summarization) once over the whole batch.
+        The stages are independent, so they run concurrently; each one queues its texts
+        to its model's micro-batcher. A failing stage yields None for every article.
+        """
+        texts = [f"{a.headline}. {a.summary}" for a in articles]
+        # Short summaries are kept as they are, so only long ones go to the summarizer
+        to_summarize = [i for i, a in enumerate(articles) if a.summary and len(a.summary.strip().split()) >= 20]
+
+        stages = {
+            "sentiment": (get_sentiments, texts),
+            "entities": (extract_entities_batch, texts),
+            "summary": (summarize_texts, [articles[i].summary for i in to_summarize]),
+        }
+        stage_pool = _get_stage_pool()
+        futures = {name: stage_pool.submit(fn, inputs) for name, (fn, inputs) in stages.items()}
 
-        for article in articles:
+        results: Dict[str, List[any]] = {}
+        for name, future in futures.items():
             try:
-                logger.info(f"Processing article ID: {article.id} - {article.headline[:100]}...")
-                # Use headline and summary for more comprehensive analysis
-                text_for_analysis = f"{article.headline}. {article.summary}"
-
-                # 1. Sentiment Analysis
-                sentiment_result = get_sentiment(text_for_analysis)
-                if sentiment_result:
-                    article.sentiment_label = sentiment_result.get('label')
-                    article.sentiment_score = sentiment_result.get('score')
-                    if sentiment_result.get('error'): # Check if an error message was returned
-                         logger.warning(f"Sentiment analysis for article {article.id} had an issue: {sentiment_result.get('error')}")
-                else:
-                    logger.warning(f"Sentiment analysis failed or returned None for article {article.id}")
-                    article.sentiment_label = "Unavailable"
-                logger.debug(f"Article {article.id} sentiment: {article.sentiment_label} (Score: {article.sentiment_score})")
-
-                # 2. News Categorization
-                article.analyzed_category = categorize_news(
-                    text_for_analysis,
-                    use_zero_shot=use_zero_shot_categorization,
-                    candidate_labels=candidate_category_labels
-                )
-                logger.debug(f"Article {article.id} AI category: {article.analyzed_category}")
-
-                # 3. Summarization
-                text_to_summarize = article.summary
-                if not text_to_summarize or len(text_to_summarize.strip().split()) < 20:
-                    logger.info(f"Original summary for article {article.id} is short. AI summary might not be generated or may use headline.")
-                    article.ai_summary = article.summary
-                else:
-                    ai_generated_summary = summarize_text(text_to_summarize)
-                    if ai_generated_summary and "Error in summarization" not in ai_generated_summary:
-                        article.ai_summary = ai_generated_summary
-                        logger.debug(f"Article {article.id} AI summary generated (first 50 chars): {article.ai_summary[:50]}...")
-                    elif ai_generated_summary and "Error in summarization" in ai_generated_summary:
-                        logger.warning(f"AI summarization for article {article.id} encountered an error: {ai_generated_summary}")
-                        article.ai_summary = article.summary
-                    else:
-                        logger.warning(f"AI summarization did not produce a new summary for article {article.id}. Original summary: '{article.summary[:50]}...'")
-                        article.ai_summary = article.summary
-
-                # 4. Named Entity Recognition (NER)
-                article.entities = extract_entities(text_for_analysis)
-                if article.entities is None:
-                    logger.error(f"NER processing failed for article {article.id}. Entities will be empty.")
-                    article.entities = []
-                logger.debug(f"Article {article.id} extracted {len(article.entities)} entities.")
-
-                # 5. Event Detection
-                article.detected_events = detect_events(text_for_analysis)
-                logger.debug(f"Article {article.id} detected events: {article.detected_events}")
-
-                processed_articles.append(article)
+                results[name] = future.result()
             except Exception as e:
-                logger.error(f"Major error processing article {article.id} ('{article.headline[:50]}...'): {e}", exc_info=True)
-                article.sentiment_label = article.sentiment_label or "Processing Error"
-                article.analyzed_category = article.analyzed_category or "Processing Error"
-                article.ai_summary = article.ai_summary or "Processing Error"
-                article.entities = article.entities if hasattr(article, 'entities') and article.entities is not None else []
-                article.detected_events = article.detected_events if hasattr(article, 'detected_events') and article.detected_events is not None else []
-                processed_articles.append(article)
+                logger.error(f"AI Service: {name} stage failed for a batch of {len(articles)} articles: {e}", exc_info=True)
+                results[name] = [None] * len(stages[name][1])
+
+        summaries: List[any] = [_NOT_SUMMARIZED] * len(articles)
+        for i, summary in zip(to_summarize, results["summary"]):
+            summaries[i] = summary
+        results["summary"] = summaries
+        return results
+
+    def _process_article(self, article: NewsArticle, sentiment_result: Optional[Dict[str, any]],
+                         ai_generated_summary: any, entities: Optional[List[Dict[str, any]]]) -> NewsArticle:
+        """Applies the model stage results to one article and runs categorization and event detection, in place."""
+        candidate_category_labels = list(DEFAULT_CATEGORIES_KEYWORDS.keys())
+        try:
+            # Use headline and summary for more comprehensive analysis
+            text_for_analysis = f"{article.headline}. {article.summary}"
+
+            # 1. Sentiment Analysis
+            if sentiment_result:
+                article.sentiment_label = sentiment_result.get('label')
+                article.sentiment_score = sentiment_result.get('score')
+                if sentiment_result.get('error'): # Check if an error message was returned
+                     logger.warning(f"Sentiment analysis for article {article.id} had an issue: {sentiment_result.get('error')}")
+            else:
+                logger.warning(f"Sentiment analysis failed or returned None for article {article.id}")
+                article.sentiment_label = "Unavailable"
+            logger.debug(f"Article {article.id} sentiment: {article.sentiment_label} (Score: {article.sentiment_score})")
+
+            # 2. News Categorization
+            article.analyzed_category = categorize_news(
+                text_for_analysis,
+                use_zero_shot=self.USE_ZERO_SHOT_CATEGORIZATION,
+                candidate_labels=candidate_category_labels
+            )
+            logger.debug(f"Article {article.id} AI category: {article.analyzed_category}")
+
+            # 3. Summarization
+            if ai_generated_summary is _NOT_SUMMARIZED:
+                logger.info(f"Original summary for article {article.id} is short. AI summary might not be generated or may use headline.")
+                article.ai_summary = article.summary
+            elif ai_generated_summary and "Error in summarization" not in ai_generated_summary:
+                article.ai_summary = ai_generated_summary
+                logger.debug(f"Article {article.id} AI summary generated (first 50 chars): {article.ai_summary[:50]}...")
+            elif ai_generated_summary and "Error in summarization" in ai_generated_summary:
+                logger.warning(f"AI summarization for article {article.id} encountered an error: {ai_generated_summary}")
+                article.ai_summary = article.summary
+            else:
+                logger.warning(f"AI summarization did not produce a new summary for article {article.id}. Original summary: '{article.summary[:50]}...'")
+                article.ai_summary = article.summary
+
+            # 4. Named Entity Recognition (NER)
+            article.entities = entities
+            if article.entities is None:
+                logger.error(f"NER processing failed for article {article.id}. Entities will be empty.")
+                article.entities = []
+            logger.debug(f"Article {article.id} extracted {len(article.entities)} entities.")
+
+            # 5. Event Detection
+            article.detected_events = detect_events(text_for_analysis)
+            logger.debug(f"Article {article.id} detected events: {article.detected_events}")
+        except Exception as e:
+            logger.error(f"Major error processing article {article.id} ('{article.headline[:50]}...'): {e}", exc_info=True)
+            article.sentiment_label = article.sentiment_label or "Processing Error"
+            article.analyzed_category = article.analyzed_category or "Processing Error"
+            article.ai_summary = article.ai_summary or "Processing Error"
+            article.entities = article.entities if hasattr(article, 'entities') and article.entities is not None else []
+            article.detected_events = article.detected_events if hasattr(article, 'detected_events') and article.detected_events is not None else []
+        return article
+
+    def _process_articles(self, articles: List[NewsArticle]) -> List[NewsArticle]:
+        if not articles:
+            return []
+        logger.info(f"AI Service: Processing {len(articles)} articles in batched stages...")
+        stage_results = self._run_model_stages(articles)
+        return [
+            self._process_article(article, sentiment, summary, entities)
+            for article, sentiment, summary, entities in zip(
+                articles, stage_results["sentiment"], stage_results["summary"], stage_results["entities"]
+            )
+        ]
+
+    def get_topics(self, articles: List[NewsArticle], top_n: int = 5) -> Optional[dict]:
+        """Topic modeling over the whole batch of articles."""
+        if not articles:
+            return None
+        docs_for_topics = [f"{a.headline}. {a.summary}" for a in articles]
+        return get_main_topics(docs_for_topics, top_n=top_n)
+
+    def _process_batch(self, articles: List[NewsArticle]) -> Dict[str, any]:
+        processed_articles: List[NewsArticle] = self._process_articles(articles)
 
         # 6. Topic Modeling (on the whole batch of articles)
-        main_topics = None
-        if processed_articles:
-            docs_for_topics = [f"{a.headline}. {a.summary}" for a in processed_articles]
-            main_topics = get_main_topics(docs_for_topics, top_n=5)
+        main_topics = self.get_topics(processed_articles)
 
         logger.info(f"AI Service: Processed {len(processed_articles)} articles.")
         return {"articles": processed_articles, "topics": main_topics}
+
+    async def process_news_articles(self, articles: List[NewsArticle]) -> Dict[str, any]:
+        """
+        Processes the batch as one job on the shared inference executor, so the event
+        loop stays free. Raises InferenceOverloadedError / InferenceTimeoutError.
+        """
+        return await inference_executor.run(self._process_batch, articles)
+
+    async def stream_news_articles(self, articles: List[NewsArticle]) -> AsyncIterator[NewsArticle]:
+        """
+        Yields each article as soon as it has been processed, in the order they finish.
+        Articles are single-article jobs on the inference executor, kept at most
+        `max_workers` in flight: they run concurrently (and meet in the models'
+        micro-batchers) without overflowing the executor's queue. The event loop keeps
+        flushing earlier articles to the client meanwhile.
+        Topic modeling needs the whole batch; call `get_topics` afterwards.
+        """
+        remaining = iter(articles)
+        in_flight = set()
+        try:
+            while True:
+                for article in islice(remaining, inference_executor.max_workers - len(in_flight)):
+                    in_flight.add(asyncio.ensure_future(inference_executor.run(self._process_articles, [article])))
+                if not in_flight:
+                    return
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for job in done:
+                    yield job.result()[0]
+        finally:
+            for job in in_flight:
+                job.cancel()
@@ -1,6 +1,5 @@
+import asyncio
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential, RetryError # Ensure RetryError is imported
-from functools import lru_cache
 from typing import Optional, List, Dict, Any
 
 
@@ -8,6 +7,8 @@ from newsbot_project_files.backend.app.core.config import settings
 from newsbot_project_files.backend.app.schemas.company import CompanyProfile, HistoricalStockData, StockDataPoint
 from newsbot_project_files.backend.app.schemas.news import NewsArticle
 from newsbot_project_files.backend.app.core.logging import get_logger
+from app.core.provider_guard import provider_guards, ProviderRateLimitedError, ProviderUnavailableError
+from app.core.ttl_cache import seconds_until_market_close, ttl_cached
 
 logger = get_logger(__name__)
 
@@ -24,8 +25,33 @@ class DataAggregatorService:
         if not self.alpha_vantage_api_key or self.alpha_vantage_api_key == "your_alpha_vantage_api_key_here":
             logger.warning("Alpha Vantage API key is not configured or is using a placeholder.")
 
-    @retry(wait=wait_exponential(multiplier=1, min=2, max=10), stop=stop_after_attempt(3), reraise=True)
-    @lru_cache(maxsize=128)
+    async def _get(self, provider: str, url: str, params: Dict[str, Any], timeout: int) -> requests.Response:
+        """
+        GET through the provider's rate limit, circuit breaker and jittered retries
+        (app.core.provider_guard), off the event loop. Raises on HTTP errors.
+        """
+        def fetch() -> requests.Response:
+            response = requests.get(url, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response
+        return await provider_guards.get(provider).call_async(asyncio.to_thread, fetch)
+
+    async def _get_alpha_vantage(self, params: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+        """Like `_get`, but treats Alpha Vantage's rate-limit messages (sent with HTTP 200) as failures."""
+        def fetch() -> Dict[str, Any]:
+            response = requests.get(self.alpha_vantage_base_url, params=params, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+            has_data = any(key.startswith("Time Series") for key in data)
+            if "Note" in data or ("Information" in data and not has_data):
+                raise ProviderRateLimitedError("alpha_vantage", data.get("Note") or data.get("Information"))
+            return data
+        return await provider_guards.get("alpha_vantage").call_async(asyncio.to_thread, fetch)
+
+    # TTL caches keyed on the instance and the arguments. Profiles change rarely, news within minutes,
+    # and daily prices only at the market close. Expired entries are served for a few more minutes
+    # while a background refresh runs. Failed calls (None / no articles) are not cached.
+    @ttl_cached(ttl=6 * 3600, stale_ttl=300, max_items=128, name="backend_company_profile")
     async def get_company_profile(self, ticker: str) -> Optional[CompanyProfile]:
         logger.debug(f"Attempting to fetch company profile for {ticker} from Finnhub.")
         if not self.finnhub_api_key or self.finnhub_api_key == "your_finnhub_api_key_here":
@@ -34,8 +60,7 @@ class DataAggregatorService:
 
         params = {"symbol": ticker, "token": self.finnhub_api_key}
         try:
-            response = requests.get(f"{self.finnhub_base_url}/stock/profile2", params=params, timeout=10)
-            response.raise_for_status()
+            response = await self._get("finnhub", f"{self.finnhub_base_url}/stock/profile2", params, timeout=10)
             data = response.json()
 
             if not data or not isinstance(data, dict) or not data.get('name'):
@@ -49,26 +74,26 @@ class DataAggregatorService:
             profile = CompanyProfile(**data)
             logger.info(f"Successfully fetched profile for {ticker}: {profile.name}")
             return profile
+        except ProviderUnavailableError as e:
+            logger.warning(f"Skipping Finnhub profile for {ticker}: {e}")
+            return None
         except requests.exceptions.HTTPError as http_err:
-            # Log HTTP errors, but don't reraise them directly for tenacity if they are client errors (4xx)
-            # that won't benefit from retries (like 401, 403, 404).
-            # Server errors (5xx) might benefit. raise_for_status() handles this.
-            # For tenacity, we want to retry on transient errors, usually RequestException.
+            # The provider guard already retried 429/5xx responses; client errors (401, 403, 404)
+            # are not retried since they won't succeed on a second attempt.
             logger.error(f"HTTP error fetching profile for {ticker}: {http_err}. Status: {http_err.response.status_code}. Response: {http_err.response.text[:200]}")
             if http_err.response.status_code in [401, 403]:
                 logger.error(f"Finnhub API key may be invalid or lacking permissions for {ticker}.")
             # For 404 or other 4xx, it's likely not a temporary issue, so returning None is appropriate.
             return None # Do not retry on client HTTP errors generally
-        except requests.exceptions.RequestException as req_err: # Includes Timeout, ConnectionError etc. These should be retried.
-            logger.warning(f"Request error fetching profile for {ticker} (attempt {req_err.retry.attempt_number if hasattr(req_err, 'retry') else 'N/A'}): {req_err}. Will retry if applicable.")
-            raise # Reraise to allow tenacity to handle retries
+        except requests.exceptions.RequestException as req_err: # Timeout, ConnectionError etc., already retried by the provider guard
+            logger.warning(f"Request error fetching profile for {ticker} after retries: {req_err}.")
+            raise
         except Exception as e:
 
             logger.error(f"Unexpected error (e.g., JSON parsing, Pydantic validation) for profile {ticker}: {e}", exc_info=True)
             return None
 
-    @retry(wait=wait_exponential(multiplier=1, min=2, max=10), stop=stop_after_attempt(3), reraise=True)
-    @lru_cache(maxsize=128)
+    @ttl_cached(ttl=300, stale_ttl=300, max_items=128, name="backend_company_news", should_cache=bool)
     async def get_company_news(self, ticker: str, start_date: str, end_date: str) -> List[NewsArticle]:
         logger.debug(f"Attempting to fetch company news for {ticker} from {start_date} to {end_date} from Finnhub.")
         if not self.finnhub_api_key or self.finnhub_api_key == "your_finnhub_api_key_here":
@@ -77,8 +102,7 @@ class DataAggregatorService:
 
         params = {"symbol": ticker, "from": start_date, "to": end_date, "token": self.finnhub_api_key}
         try:
-            response = requests.get(f"{self.finnhub_base_url}/company-news", params=params, timeout=15)
-            response.raise_for_status()
+            response = await self._get("finnhub", f"{self.finnhub_base_url}/company-news", params, timeout=15)
             news_data_list = response.json()
 
             if not isinstance(news_data_list, list):
@@ -115,21 +139,23 @@ class DataAggregatorService:
 
             logger.info(f"Successfully fetched and parsed {len(articles)} news articles for {ticker} from Finnhub.")
             return articles
+        except ProviderUnavailableError as e:
+            logger.warning(f"Skipping Finnhub news for {ticker}: {e}")
+            return []
         except requests.exceptions.HTTPError as http_err:
             logger.error(f"HTTP error fetching news for {ticker}: {http_err}. Status: {http_err.response.status_code}. Response: {http_err.response.text[:200]}")
             if http_err.response.status_code in [401, 403]:
                 logger.error(f"Finnhub API key may be invalid or lacking permissions for {ticker}.")
             return []
         except requests.exceptions.RequestException as req_err:
-            logger.warning(f"Request error fetching news for {ticker} (attempt N/A): {req_err}. Will retry if applicable.") # Tenacity handles attempt numbers internally if reraised
+            logger.warning(f"Request error fetching news for {ticker} after retries: {req_err}.")
             raise
 
         except Exception as e:
             logger.error(f"Unexpected error (e.g., JSON parsing, Pydantic validation) for news {ticker}: {e}", exc_info=True)
             return []
 
-    @retry(wait=wait_exponential(multiplier=1, min=3, max=15), stop=stop_after_attempt(3), reraise=True)
-    @lru_cache(maxsize=128)
+    @ttl_cached(ttl=seconds_until_market_close, stale_ttl=300, max_items=128, name="backend_stock_prices")
     async def get_historical_stock_prices(self, ticker: str, outputsize: str = "compact") -> Optional[HistoricalStockData]:
         logger.debug(f"Attempting to fetch stock prices for {ticker} (output: {outputsize}) from Alpha Vantage.")
         if not self.alpha_vantage_api_key or self.alpha_vantage_api_key == "your_alpha_vantage_api_key_here":
@@ -138,9 +164,7 @@ class DataAggregatorService:
 
         params = {"function": "TIME_SERIES_DAILY_ADJUSTED", "symbol": ticker, "apikey": self.alpha_vantage_api_key, "outputsize": outputsize}
         try:
-            response = requests.get(self.alpha_vantage_base_url, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            data = await self._get_alpha_vantage(params, timeout=15)
 
             if "Error Message" in data:
                 logger.error(f"Alpha Vantage API error for {ticker}: {data['Error Message']}")
@@ -148,8 +172,8 @@ class DataAggregatorService:
             if "Information" in data and "Time Series (Daily)" not in data :
 
                 logger.warning(f"Alpha Vantage API info for {ticker} (and no data returned): {data['Information']}")
-                # This could be a rate limit message, which tenacity might help with if it leads to a RequestException on retry.
-                # If it's a permanent issue for this ticker, returning None is correct.
+                # Rate-limit messages are raised as ProviderRateLimitedError by _get_alpha_vantage;
+                # anything else here is likely a permanent issue for this ticker.
                 return None
 
 
@@ -184,24 +208,24 @@ class DataAggregatorService:
             logger.info(f"Successfully fetched and parsed {len(prices)} stock data points for {ticker} from Alpha Vantage.")
             return HistoricalStockData(ticker=ticker, prices=prices)
 
+        except ProviderUnavailableError as e:
+            # Includes rate-limit messages, which pause Alpha Vantage calls for the breaker cooldown
+            logger.warning(f"Skipping Alpha Vantage stock prices for {ticker}: {e}")
+            return None
         except requests.exceptions.HTTPError as http_err:
             logger.error(f"HTTP error fetching stock prices for {ticker} from Alpha Vantage: {http_err}. Status: {http_err.response.status_code}. Response: {http_err.response.text[:200]}")
             if http_err.response.status_code in [401, 403]:
                 logger.error(f"Alpha Vantage API key may be invalid for {ticker}.")
-            # Specific Alpha Vantage rate limit response might be a JSON with "Information" field,
-            # which is handled above. If it's a plain HTTP error like 429, this will catch it.
-            # 5xx errors should be retried by tenacity if this exception is reraised.
-            # For now, return None on HTTP errors that are not RequestException.
+            # 429 and 5xx responses reach here only after the provider guard's retries.
             return None
         except requests.exceptions.RequestException as req_err:
-            logger.warning(f"Request error fetching stock prices for {ticker} (attempt N/A): {req_err}. Will retry if applicable.")
-            raise # Reraise for tenacity
+            logger.warning(f"Request error fetching stock prices for {ticker} after retries: {req_err}.")
+            raise
         except Exception as e:
             logger.error(f"Unexpected error (e.g., JSON parsing, Pydantic validation) for stock prices {ticker}: {e}", exc_info=True)
             return None
 
-    @retry(wait=wait_exponential(multiplier=1, min=2, max=10), stop=stop_after_attempt(3), reraise=True)
-    @lru_cache(maxsize=32) # Cache general news for a while; smaller cache size than per-ticker
+    @ttl_cached(ttl=300, stale_ttl=300, max_items=32, name="backend_market_news", should_cache=bool) # Smaller cache than per-ticker
     async def get_general_market_news(self, category: str = "general", min_id: Optional[int] = None) -> List[NewsArticle]:
         """
         Fetches general market news from Finnhub.
@@ -218,8 +242,7 @@ class DataAggregatorService:
             params["minId"] = min_id
 
         try:
-            response = requests.get(f"{self.finnhub_base_url}/news", params=params, timeout=15)
-            response.raise_for_status()
+            response = await self._get("finnhub", f"{self.finnhub_base_url}/news", params, timeout=15)
             news_data_list = response.json()
 
             if not isinstance(news_data_list, list):
@@ -257,14 +280,20 @@ class DataAggregatorService:
 
             logger.info(f"Successfully fetched and parsed {len(articles)} general news articles for category '{category}' from Finnhub.")
             return articles
+        except ProviderUnavailableError as e:
+            logger.warning(f"Skipping Finnhub general news for category '{category}': {e}")
+            return []
         except requests.exceptions.HTTPError as http_err:
             logger.error(f"HTTP error fetching general news for category '{category}': {http_err}. Status: {http_err.response.status_code}. Response: {http_err.response.text[:200]}")
             if http_err.response.status_code in [401, 403]:
                 logger.error(f"Finnhub API key may be invalid or lacking permissions for general news category '{category}'.")
             return [] # Do not retry on client HTTP errors generally
         except requests.exceptions.RequestException as req_err:
-            logger.warning(f"Request error fetching general news for category '{category}': {req_err}. Will retry if applicable.")
-            raise # Reraise to allow tenacity to handle retries
+            logger.warning(f"Request error fetching general news for category '{category}' after retries: {req_err}.")
+            raise
         except Exception as e:
             logger.error(f"Unexpected error (e.g., JSON parsing, Pydantic validation) for general news category '{category}': {e}", exc_info=True)
             return []
+
+# Global instance, so every request shares the cached results
+data_aggregator_service = DataAggregatorService()
@@ -0,0 +1,98 @@
+import pytest
+
+from newsbot_project_files.backend.app.processing import topic_modeling_service
+from newsbot_project_files.backend.app.processing.topic_modeling_service import TopicService
+
+class FakeTopicInfo:
+    def __init__(self, topics):
+        self.topics = topics
+
+    def to_dict(self, orient):
+        return [{"Topic": topic, "Name": name} for topic, name in self.topics.items()]
+
+class FakeBERTopic:
+    """Stands in for BERTopic: documents mentioning "market" are topic 0, everything else topic 1."""
+
+    fail_fit = False
+
+    def __init__(self, embedding_model=None, min_topic_size=10, topics=None):
+        self.embedding_model = embedding_model or "embedder"
+        self.topics = topics if topics is not None else {-1: "-1_outliers", 0: "0_markets", 1: "1_rates"}
+        self.topic_labels_ = dict(self.topics)
+        self.transform_calls = 0
+        self.fitted_on = None
+
+    @classmethod
+    def load(cls, name):
+        return cls()
+
+    @classmethod
+    def merge_models(cls, models, min_similarity=0.7):
+        topics = {}
+        for model in models:
+            topics.update(model.topics)
+        return cls(embedding_model=models[0].embedding_model, topics=topics)
+
+    def transform(self, docs):
+        self.transform_calls += 1
+        topics = [0 if "market" in doc else 1 for doc in docs]
+        return topics, [0.9] * len(topics)
+
+    def fit(self, docs):
+        if self.fail_fit:
+            raise RuntimeError("fit failed")
+        self.fitted_on = docs
+        self.topics = {2: "2_earnings"}
+        return self
+
+    def get_topic_info(self):
+        return FakeTopicInfo(self.topics)
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(topic_modeling_service, "BERTopic", FakeBERTopic)
+    monkeypatch.setattr(FakeBERTopic, "fail_fit", False)
+    return TopicService(model_name="fake", window_size=4, min_new_docs=3)
+
+def test_main_topics_only_transform_the_current_model(service):
+    result = service.get_main_topics(["market rally", "market dip", "rate hike"], top_n=2)
+
+    assert result["top_topics"] == [
+        {"Topic": 0, "Name": "0_markets", "Count": 2},
+        {"Topic": 1, "Name": "1_rates", "Count": 1}
+    ]
+    assert service.model.transform_calls == 1
+    assert service.model.fitted_on is None # Nothing is fitted on the request path
+    assert service.get_stats()["version"] == 0
+
+def test_update_waits_for_enough_new_documents_and_uses_the_window(service):
+    service.get_main_topics(["market a", "market b"])
+    assert service.update() is False # 2 of 3 new documents
+
+    service.get_main_topics(["rate c", "rate d", "rate d"])
+    assert service.update() is True
+    assert service.get_stats()["new_docs_since_update"] == 0
+    assert service.update() is False # Nothing new since
+
+    # The window keeps only the 4 most recent documents
+    assert service.get_stats()["window_docs"] == 4
+
+def test_update_swaps_model_and_topic_info_together(service):
+    service.get_main_topics(["market a", "rate b", "rate c"])
+    before = service._state
+    base = service.model
+
+    assert service.update() is True
+    model, topic_info, version = service._state
+    assert version == 1
+    assert model is not base and set(topic_info) == {-1, 0, 1, 2}
+    assert before[0] is base and set(before[1]) == {-1, 0, 1} # A request's snapshot is left untouched
+    assert service.get_stats()["topics"] == 4
+
+def test_failed_update_keeps_the_current_model(service, monkeypatch):
+    service.get_main_topics(["market a", "rate b", "rate c"])
+    before = service._state
+    monkeypatch.setattr(FakeBERTopic, "fail_fit", True)
+
+    assert service.update() is False
+    assert service._state is before
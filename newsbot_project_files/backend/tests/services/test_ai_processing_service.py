@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+
+from app.core.inference_executor import InferenceExecutor
+from newsbot_project_files.backend.app.services import ai_processing_service
+from newsbot_project_files.backend.app.services.ai_processing_service import AIProcessingService
+
+def test_stream_processes_articles_concurrently_and_yields_them_as_they_finish(monkeypatch):
+    monkeypatch.setattr(ai_processing_service, "inference_executor", InferenceExecutor(max_workers=3, max_queue=0))
+    # Processing time per article, in seconds
+    delays = {"slow": 0.2, "a": 0.01, "b": 0.01, "c": 0.01, "d": 0.01}
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def process_articles(articles):
+        with lock:
+            running.append(articles[0])
+            peak.append(len(running))
+        time.sleep(delays[articles[0]])
+        with lock:
+            running.remove(articles[0])
+        return [articles[0].upper()]
+
+    service = AIProcessingService()
+    service._process_articles = process_articles
+
+    async def scenario():
+        return [article async for article in service.stream_news_articles(list(delays))]
+
+    started = time.monotonic()
+    streamed = asyncio.run(scenario())
+
+    # The slow article doesn't hold back the others, and no more than max_workers run at once
+    assert sorted(streamed[:-1]) == ["A", "B", "C", "D"] and streamed[-1] == "SLOW"
+    assert max(peak) == 3
+    assert time.monotonic() - started < 0.2 + 4 * 0.01 + 0.1
+
+def test_stage_pool_is_sized_from_the_inference_settings_and_shut_down(monkeypatch):
+    ai_processing_service.shutdown_stage_pool()
+    monkeypatch.setattr(ai_processing_service, "inference_executor", InferenceExecutor(max_workers=2))
+    monkeypatch.setattr(ai_processing_service.app_settings, "INFERENCE_STAGE_WORKERS", None)
+
+    pool = ai_processing_service._get_stage_pool()
+    assert pool._max_workers == 6 # One thread per model stage of every job the executor runs at once
+    assert ai_processing_service._get_stage_pool() is pool
+
+    ai_processing_service.shutdown_stage_pool()
+    monkeypatch.setattr(ai_processing_service.app_settings, "INFERENCE_STAGE_WORKERS", 4)
+    assert ai_processing_service._get_stage_pool()._max_workers == 4
+    ai_processing_service.shutdown_stage_pool()
@@ -0,0 +1,131 @@
+"""
+Benchmarks the call sites of the compiled pattern matcher (app/core/pattern_matcher.py)
+against the per-pattern linear scans they replaced, and checks both return the same results.
+
+Usage (from the repository root): python scripts/benchmark_pattern_matcher.py [--texts 2000] [--repeat 3]
+
+The categorization cases need the backend package to import (its core/config.py and
+the transformers/torch dependencies); without it they are skipped with a note.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_narrative_library.processing.impact_analysis_engine import SignalDetector
+
+try:
+    from newsbot_project_files.backend.app.processing.categorization import (
+        DEFAULT_CATEGORIES_KEYWORDS, DEFAULT_EVENT_PATTERNS, categorize_news_keyword, detect_events
+    )
+except ImportError as e:
+    DEFAULT_CATEGORIES_KEYWORDS = DEFAULT_EVENT_PATTERNS = None
+    BACKEND_IMPORT_ERROR = e
+
+SAMPLE_HEADLINES = [
+    "Apple reports quarterly earnings that beat expectations as iPhone revenue grows",
+    "Microsoft agrees to acquisition of Activision in $69bn merger deal",
+    "Tesla CEO steps down amid SEC investigation into trading",
+    "Why penny stocks could rally: top 10 picks to watch",
+    "Pfizer receives FDA approval for new drug, shares jump",
+    "Nvidia unveils new product line and announces dividend increase",
+    "Fed signals another rate hike as inflation stays high",
+    "Amazon to be acquired by nobody, analyst rating unchanged",
+    "Company update: restructuring and expansion strategy outlined",
+    "Google and Samsung partner on joint venture for software update",
+    "EPS of $1.20 misses as loss widens; stock price falls",
+    "Opinion: maybe the market crash is speculation after all",
+]
+
+# --- Previous implementations, kept verbatim for parity and timing ---
+
+def legacy_categorize_news_keyword(text, categories_keywords):
+    text_lower = text.lower()
+    category_scores = {category: 0 for category in categories_keywords}
+    for category, keywords in categories_keywords.items():
+        for keyword in keywords:
+            if re.search(r'\b' + re.escape(keyword.lower()) + r'\b', text_lower):
+                category_scores[category] += 1
+    non_zero_scores = {cat: score for cat, score in category_scores.items() if score > 0}
+    if not non_zero_scores:
+        return "General Company News"
+    return max(non_zero_scores, key=non_zero_scores.get)
+
+def legacy_detect_events(text, event_patterns):
+    detected_event_types = []
+    for event_type, patterns in event_patterns.items():
+        for pattern in patterns:
+            if re.search(pattern, text, re.IGNORECASE):
+                if event_type not in detected_event_types:
+                    detected_event_types.append(event_type)
+                break
+    return detected_event_types
+
+def legacy_classify(text, noise_patterns, high_signal_patterns):
+    text_lower = text.lower()
+    for pattern in noise_patterns:
+        if re.search(pattern, text_lower):
+            return "Noise"
+    for pattern in high_signal_patterns:
+        if re.search(pattern, text_lower):
+            return "High Signal"
+    return "Context"
+
+def build_texts(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        # Article-sized texts: a few headlines joined together
+        texts.append(". ".join(rng.sample(SAMPLE_HEADLINES, k=rng.randint(1, 4))))
+    return texts
+
+def timed(fn, texts, repeat):
+    best = float("inf")
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(text) for text in texts]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compiled pattern matcher against linear scans.")
+    parser.add_argument("--texts", type=int, default=2000, help="Number of synthetic texts")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the best time is reported")
+    args = parser.parse_args()
+
+    texts = build_texts(args.texts)
+    detector = SignalDetector()
+    cases = []
+    if DEFAULT_CATEGORIES_KEYWORDS is not None:
+        cases += [
+            ("categorize_news_keyword",
+             lambda t: legacy_categorize_news_keyword(t, DEFAULT_CATEGORIES_KEYWORDS),
+             categorize_news_keyword),
+            ("detect_events",
+             lambda t: legacy_detect_events(t, DEFAULT_EVENT_PATTERNS),
+             detect_events),
+        ]
+    else:
+        print(f"Skipping the categorization cases: the backend package failed to import ({BACKEND_IMPORT_ERROR}).")
+    cases += [
+        ("SignalDetector.classify",
+         lambda t: legacy_classify(t, detector.noise_patterns, detector.high_signal_patterns),
+         detector.classify),
+    ]
+
+    print(f"{len(texts)} texts, best of {args.repeat} runs")
+    print(f"{'case':<26}{'legacy ms':>12}{'compiled ms':>14}{'speedup':>10}  parity")
+    for name, legacy, compiled in cases:
+        legacy_seconds, legacy_results = timed(legacy, texts, args.repeat)
+        compiled_seconds, compiled_results = timed(compiled, texts, args.repeat)
+        parity = "ok" if legacy_results == compiled_results else "MISMATCH"
+        speedup = legacy_seconds / compiled_seconds if compiled_seconds else float("inf")
+        print(f"{name:<26}{legacy_seconds * 1000:>12.1f}{compiled_seconds * 1000:>14.1f}{speedup:>9.1f}x  {parity}")
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,11 @@ class AsyncAgent(abc.ABC):
 
     async def start(self):
         self.is_running = True
-        self.task_id = await task_manager.start_task(f"agent_{self.name}", self._run_loop())
+        self.task_id = await task_manager.start_task(f"agent_{self.name}", self._run_loop(), pool="agents",
+                                                     long_running=True)
+        if not self.task_id:
+            self.is_running = False
+            raise RuntimeError(f"Agent {self.name} could not be started: the agents task pool is full.")
         await event_bus.publish("agent_started", {"name": self.name, "role": self.role})
         logger.info(f"Agent {self.name} started.")
 
@@ -1,8 +1,9 @@
 from typing import List, Dict, Any, Optional
-import re
 from datetime import datetime
 from pydantic import BaseModel, Field
 
+from app.core.pattern_matcher import PatternMatcher
+
 # Importing models to ensure type safety
 from synthetic.pydantic_models import NewsArticleMetadata
 
@@ -44,21 +45,12 @@ class SignalDetector:
             r"top 10", r"why", r"opinion", r"watch", r"could",
             r"maybe", r"rumor", r"speculation", r"penny stocks"
         ]
+        # Compiled once; Noise is listed first so it takes precedence
+        self._matcher = PatternMatcher({"Noise": self.noise_patterns, "High Signal": self.high_signal_patterns})
 
     def classify(self, text: str) -> str:
-        text_lower = text.lower()
-
-        # Check for noise first
-        for pattern in self.noise_patterns:
-            if re.search(pattern, text_lower):
-                return "Noise"
-
-        # Check for high signal
-        for pattern in self.high_signal_patterns:
-            if re.search(pattern, text_lower):
-                return "High Signal"
-
-        return "Context" # Middle ground
+        # Signal patterns are only searched when no noise pattern matches
+        return self._matcher.first_label(text.lower()) or "Context" # Context is the middle ground
 
 class ImpactAnalyzer:
     """
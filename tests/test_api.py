@@ -1,3 +1,4 @@
+import json
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -14,3 +15,31 @@ def test_analyze_endpoint():
     assert "stock_data" in data
     assert len(data["news"]) > 0
     assert data["profile"]["ticker"] == "AAPL"
+
+def test_batch_analyze_endpoint_streams_ndjson():
+    response = client.post("/analyze", json={"tickers": ["AAPL", "msft", "AAPL"]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [e["event"] for e in events] == ["analysis", "analysis"]
+    results = [e["data"] for e in events]
+    assert sorted(r["ticker"] for r in results) == ["AAPL", "MSFT"] # Deduplicated, normalized
+    for result in results:
+        assert len(result["news"]) > 0
+        assert result["profile"]["ticker"] == result["ticker"]
+
+def test_analyze_stream_sends_articles_before_aggregate():
+    response = client.post("/analyze/AAPL/stream")
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [e["event"] for e in events[:-1]] == ["news_item"] * (len(events) - 1)
+    assert len(events) > 1
+    assert events[-1]["event"] == "analysis"
+    assert events[-1]["data"]["profile"]["ticker"] == "AAPL"
+
+def test_analyze_stream_sse_format():
+    response = client.post("/analyze/AAPL/stream?format=sse")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    messages = [m for m in response.text.split("\n\n") if m]
+    assert messages[0].startswith("event: news_item\ndata: ")
+    assert messages[-1].startswith("event: analysis\ndata: ")
@@ -0,0 +1,45 @@
+import torch
+from types import SimpleNamespace
+from app.core.batch_inference import BatchedSequenceClassifier
+
+class FakeTokenizer:
+    """Whitespace tokenizer: one token id per word, padded with 0."""
+    def __call__(self, texts, truncation=True, max_length=512):
+        input_ids = [[len(word) for word in text.split()][:max_length] for text in texts]
+        return {"input_ids": input_ids, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+
+    def pad(self, features, padding="longest", return_tensors="pt"):
+        width = max(len(ids) for ids in features["input_ids"])
+        return {
+            key: torch.tensor([row + [0] * (width - len(row)) for row in values])
+            for key, values in features.items()
+        }
+
+class FakeModel:
+    """Scores class 0 by the number of real tokens so outputs can be traced back to inputs."""
+    def __init__(self):
+        self.batch_shapes = []
+
+    def __call__(self, input_ids, attention_mask):
+        self.batch_shapes.append(tuple(input_ids.shape))
+        n_tokens = attention_mask.sum(dim=-1).float()
+        logits = torch.stack([n_tokens, torch.zeros_like(n_tokens), torch.zeros_like(n_tokens)], dim=-1)
+        return SimpleNamespace(logits=logits)
+
+def test_predict_proba_preserves_input_order_and_buckets_by_length():
+    model = FakeModel()
+    engine = BatchedSequenceClassifier(FakeTokenizer(), model, max_batch_size=2)
+    texts = ["a b c d e f", "a", "a b c d e", "a b"]
+
+    probs = engine.predict_proba(texts)
+
+    assert len(probs) == 4
+    # More tokens -> higher class 0 probability, so the ranking must follow the inputs
+    positives = [p[0] for p in probs]
+    assert positives[1] < positives[3] < positives[2] < positives[0]
+    # Short texts are batched together and only padded to their own bucket width
+    assert model.batch_shapes == [(2, 2), (2, 6)]
+
+def test_predict_proba_empty_input():
+    engine = BatchedSequenceClassifier(FakeTokenizer(), FakeModel())
+    assert engine.predict_proba([]) == []
@@ -0,0 +1,38 @@
+import time
+from app.core.dedupe_store import BloomFilter, RotatingDedupeStore
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, false_positive_rate=0.01)
+    keys = [f"https://news.example/{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"https://other.example/{i}" in bloom for i in range(10000))
+    assert false_positives < 300 # ~1% expected
+
+def test_store_survives_restart_and_expires_after_ttl(tmp_path):
+    path = str(tmp_path / "alerts.log")
+    now = time.time()
+    store = RotatingDedupeStore(path=path, ttl_seconds=100, num_slots=4)
+
+    assert store.add("https://a", now=now) is True
+    assert store.add("https://a", now=now + 10) is False
+
+    restarted = RotatingDedupeStore(path=path, ttl_seconds=100, num_slots=4)
+    assert restarted.add("https://a", now=now + 20) is False
+
+    # Once the TTL has passed the key's slot is dropped and it alerts again
+    restarted.expire(now=now + 200)
+    assert restarted.add("https://a", now=now + 200) is True
+    assert restarted.memory_footprint() > 0
+    with open(path) as f:
+        assert len(f.readlines()) == 1 # Compaction removed the expired entry
+
+def test_key_added_late_in_its_slot_is_kept_for_the_full_ttl():
+    store = RotatingDedupeStore(ttl_seconds=100, num_slots=4) # 25-second slots
+    added_at = 1000 * 25 + 24.9 # The last moment of a slot
+    assert store.add("https://a", now=added_at) is True
+
+    assert store.add("https://a", now=added_at + 99.9) is False # Just before the TTL
+    store.expire(now=added_at + 100 + 25)
+    assert store.add("https://a", now=added_at + 100 + 25) is True
@@ -0,0 +1,177 @@
+import asyncio
+
+import pytest
+
+from app.core.event_bus import EventBus
+
+def _settled(sub) -> bool:
+    m = sub.metrics
+    return m["published"] == m["delivered"] + m["failed"] + m["dropped"] + m["coalesced"]
+
+async def _drain(bus: EventBus, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not all(_settled(sub) for subs in bus.subscribers.values() for sub in subs):
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+def test_slow_subscriber_drops_without_holding_up_fast_one():
+    async def scenario():
+        bus = EventBus(max_queue=5)
+        fast, slow = [], []
+        release = asyncio.Event()
+
+        async def fast_handler(data):
+            fast.append(data["n"])
+
+        async def slow_handler(data):
+            await release.wait()
+            slow.append(data["n"])
+
+        bus.subscribe("market_insight", fast_handler)
+        slow_sub = bus.subscribe("market_insight", slow_handler)
+        for n in range(100):
+            await bus.publish("market_insight", {"n": n})
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.05)
+
+        assert fast == list(range(100))
+        assert slow_sub.get_stats()["queue_depth"] <= 5
+        assert slow_sub.metrics["dropped"] >= 90
+
+        release.set()
+        await _drain(bus)
+        assert slow[-5:] == list(range(95, 100)) # drop_oldest keeps the newest events
+        await bus.close()
+
+    asyncio.run(scenario())
+
+def test_drop_newest_keeps_the_first_events():
+    async def scenario():
+        bus = EventBus()
+        received = []
+        sub = bus.subscribe("risk_alert", lambda data: received.append(data["n"]), max_queue=3, overflow="drop_newest")
+        for n in range(10):
+            await bus.publish("risk_alert", {"n": n}) # No awaits in between: the worker hasn't run yet
+        await _drain(bus)
+
+        assert received == [0, 1, 2]
+        assert sub.metrics["dropped"] == 7
+        await bus.close()
+
+    asyncio.run(scenario())
+
+def test_coalesce_keeps_latest_value_per_key():
+    async def scenario():
+        bus = EventBus()
+        received = []
+        sub = bus.subscribe("fl_model_updated", lambda data: received.append((data["id"], data["v"])), coalesce_key="id")
+        for v in range(5):
+            for key in ("a", "b"):
+                await bus.publish("fl_model_updated", {"id": key, "v": v})
+        await _drain(bus)
+
+        assert received == [("a", 4), ("b", 4)]
+        assert sub.metrics["coalesced"] == 8
+        await bus.close()
+
+    asyncio.run(scenario())
+
+def test_block_policy_applies_backpressure_and_handler_errors_are_counted():
+    async def scenario():
+        bus = EventBus()
+        received = []
+
+        async def handler(data):
+            await asyncio.sleep(0.01)
+            if data["n"] == 3:
+                raise RuntimeError("boom")
+            received.append(data["n"])
+
+        sub = bus.subscribe("evolution_update", handler, max_queue=2, overflow="block")
+        for n in range(8):
+            await bus.publish("evolution_update", {"n": n})
+            assert sub.get_stats()["queue_depth"] <= 2
+        await _drain(bus)
+
+        assert received == [0, 1, 2, 4, 5, 6, 7]
+        assert sub.metrics["dropped"] == 0
+        assert sub.metrics["failed"] == 1
+        await bus.close()
+
+    asyncio.run(scenario())
+
+def test_failing_coalesce_key_is_counted_without_reaching_the_publisher():
+    async def scenario():
+        bus = EventBus()
+        keyed, everything = [], []
+        sub = bus.subscribe("fl_model_updated", lambda data: keyed.append(data["id"]), coalesce_key=lambda data: data["id"])
+        bus.subscribe("fl_model_updated", lambda data: everything.append(data))
+        await bus.publish("fl_model_updated", {"id": "a"})
+        await bus.publish("fl_model_updated", {"round": 1}) # No "id": the key function raises
+        await _drain(bus)
+
+        assert keyed == ["a"]
+        assert len(everything) == 2
+        assert sub.metrics["failed"] == 1
+        await bus.close()
+
+    asyncio.run(scenario())
+
+def test_invalid_policy_is_rejected():
+    with pytest.raises(ValueError):
+        EventBus().subscribe("x", lambda data: None, overflow="spill")
+
+def test_batching_window_delivers_lists():
+    async def scenario():
+        bus = EventBus()
+        batches = []
+        sub = bus.subscribe("market_insight", lambda events: batches.append([e["n"] for e in events]),
+                            batch_window_ms=50, max_batch=40)
+        for n in range(100):
+            await bus.publish("market_insight", {"n": n})
+        await _drain(bus)
+
+        assert [n for batch in batches for n in batch] == list(range(100))
+        assert [len(batch) for batch in batches] == [40, 40, 20]
+        assert sub.metrics["handler_calls"] == 3
+        await bus.close()
+
+    asyncio.run(scenario())
+
+def test_topic_options_apply_to_subscribers_and_can_be_overridden():
+    async def scenario():
+        bus = EventBus(topic_options={"fl_model_updated": {"latest_only": True}})
+        seen, everything = [], []
+        release = asyncio.Event()
+
+        async def slow(data):
+            await release.wait()
+            seen.append(data["round"])
+
+        bus.subscribe("fl_model_updated", slow)
+        bus.subscribe("fl_model_updated", lambda data: everything.append(data["round"]), latest_only=False)
+        await bus.publish("fl_model_updated", {"round": 0})
+        await asyncio.sleep(0.01) # The slow handler is now busy with round 0
+        for round_id in range(1, 10):
+            await bus.publish("fl_model_updated", {"round": round_id})
+        release.set()
+        await _drain(bus)
+
+        assert seen == [0, 9]
+        assert everything == list(range(10))
+        await bus.close()
+
+    asyncio.run(scenario())
+
+def test_batching_is_not_a_topic_default():
+    async def scenario():
+        bus = EventBus(topic_options={"market_insight": {"batch_window_ms": 250}})
+        received = []
+        bus.subscribe("market_insight", received.append)
+        await bus.publish("market_insight", {"n": 1})
+        await _drain(bus)
+
+        assert received == [{"n": 1}] # One event, not a list of them
+        await bus.close()
+
+    asyncio.run(scenario())
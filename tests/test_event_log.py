@@ -0,0 +1,98 @@
+import asyncio
+import os
+
+import pytest
+
+from app.core.event_bus import EventBus
+from app.core.event_log import EventLog
+from app.core.event_transport import LocalPubSub, RedisTransport
+
+def test_append_read_and_resume_from_offset_or_timestamp(tmp_path):
+    log = EventLog(str(tmp_path), segment_bytes=200)
+    for n in range(20):
+        assert log.append("market_insight" if n % 2 else "risk_alert", {"n": n}, timestamp=1000.0 + n) == n
+
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".log")]) > 1
+    assert [r.data["n"] for r in log.read()] == list(range(20))
+    assert [r.offset for r in log.read(from_offset=13)] == list(range(13, 20))
+    assert [r.data["n"] for r in log.read(since=1015.0)] == [15, 16, 17, 18, 19]
+    assert [r.data["n"] for r in log.read(event_types=["risk_alert"], until_offset=8)] == [0, 2, 4, 6]
+    log.close()
+
+def test_torn_tail_is_cut_off_on_reopen(tmp_path):
+    log = EventLog(str(tmp_path))
+    for n in range(3):
+        log.append("risk_alert", {"n": n})
+    log.close()
+    segment = os.path.join(tmp_path, sorted(name for name in os.listdir(tmp_path) if name.endswith(".log"))[-1])
+    with open(segment, "ab") as f:
+        f.write(b"\x40\x00\x00\x00partial") # A record header cut short by a crash
+
+    log = EventLog(str(tmp_path))
+    assert log.append("risk_alert", {"n": 3}) == 3
+    assert [r.data["n"] for r in log.read()] == [0, 1, 2, 3]
+    assert [r.data["n"] for r in EventLog(str(tmp_path), read_only=True).read()] == [0, 1, 2, 3]
+    log.close()
+
+def test_single_writer_and_size_retention(tmp_path):
+    log = EventLog(str(tmp_path), segment_bytes=200, retention_bytes=600)
+    with pytest.raises(RuntimeError):
+        EventLog(str(tmp_path))
+    for n in range(100):
+        log.append("risk_alert", {"n": n})
+
+    offsets = [r.offset for r in log.read()]
+    assert offsets[-1] == 99 and offsets[0] > 0 # Oldest segments were removed
+    assert offsets == list(range(offsets[0], 100))
+    assert log.get_stats()["bytes"] <= 600 + 200
+    log.close()
+
+def test_bus_resume_replays_then_goes_live(tmp_path):
+    async def scenario():
+        bus = EventBus(event_log=EventLog(str(tmp_path)))
+        for n in range(5):
+            await bus.publish("evolution_update", {"n": n})
+            await bus.publish("risk_alert", {"n": -n})
+
+        received = []
+        sub = await bus.resume("evolution_update", lambda data: received.append(data["n"]), from_offset=4)
+        await bus.publish("evolution_update", {"n": 5}) # Arrives while the replay may still be running
+        deadline = asyncio.get_running_loop().time() + 2
+        while len(received) < 4:
+            assert asyncio.get_running_loop().time() < deadline
+            await asyncio.sleep(0.01)
+
+        assert received == [2, 3, 4, 5]
+        assert sub.metrics["dropped"] == 0
+        await bus.close()
+
+    asyncio.run(scenario())
+
+def test_resume_on_a_worker_that_only_reads_the_log(tmp_path):
+    async def scenario():
+        server = LocalPubSub()
+        writer = EventBus(transport=RedisTransport(client=server), event_log=EventLog(str(tmp_path)))
+        reader = EventBus(transport=RedisTransport(client=server), event_log=EventLog(str(tmp_path), read_only=True))
+        await writer.start()
+        await reader.start()
+        for n in range(3):
+            await reader.publish("evolution_update", {"n": n}) # Logged by the writer
+        deadline = asyncio.get_running_loop().time() + 2
+        while writer.event_log.next_offset < 3:
+            assert asyncio.get_running_loop().time() < deadline
+            await asyncio.sleep(0.01)
+
+        received = []
+        sub = await reader.resume("evolution_update", lambda data: received.append(data["n"]), from_offset=0, max_queue=1)
+        for n in range(3, 6): # More live events than max_queue while the replay may still be running
+            await reader.publish("evolution_update", {"n": n})
+        while len(received) < 6:
+            assert asyncio.get_running_loop().time() < deadline
+            await asyncio.sleep(0.01)
+
+        assert received == list(range(6))
+        assert sub.metrics["dropped"] == 0
+        await reader.close()
+        await writer.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,89 @@
+import asyncio
+
+from app.core.event_bus import EventBus
+from app.core.event_transport import LocalPubSub, RedisTransport, UnixSocketTransport
+
+async def _wait_for(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+async def _exchange(bus_a: EventBus, bus_b: EventBus):
+    seen_a, seen_b = [], []
+    bus_a.subscribe("risk_alert", lambda data: seen_a.append(data["n"]))
+    bus_b.subscribe("risk_alert", lambda data: seen_b.append(data["n"]))
+    await bus_a.start()
+    await bus_b.start()
+
+    for n in range(5):
+        await bus_a.publish("risk_alert", {"n": n})
+    await bus_b.publish("risk_alert", {"n": 99})
+    await _wait_for(lambda: len(seen_a) == 6 and len(seen_b) == 6)
+    await asyncio.sleep(0.05) # Nothing should be delivered twice
+
+    assert sorted(seen_a) == sorted(seen_b) == [0, 1, 2, 3, 4, 99]
+    assert bus_a.event_counts == bus_b.event_counts == {"risk_alert": 6}
+    await bus_a.close()
+    await bus_b.close()
+
+def test_redis_transport_shares_events_between_buses():
+    async def scenario():
+        server = LocalPubSub()
+        await _exchange(EventBus(transport=RedisTransport(client=server)), EventBus(transport=RedisTransport(client=server)))
+
+    asyncio.run(scenario())
+
+def test_unix_socket_transport_shares_events_between_buses(tmp_path):
+    async def scenario():
+        directory = str(tmp_path / "events")
+        transport_a = UnixSocketTransport(directory, peer_refresh_seconds=0)
+        transport_b = UnixSocketTransport(directory, peer_refresh_seconds=0)
+        await _exchange(EventBus(transport=transport_a), EventBus(transport=transport_b))
+        assert transport_a.metrics["send_errors"] == 0
+
+    asyncio.run(scenario())
+
+def test_reader_survives_a_failing_delivery():
+    async def scenario():
+        server = LocalPubSub()
+        sender, receiver = RedisTransport(client=server), RedisTransport(client=server)
+        received = []
+
+        async def deliver(event_type, data):
+            if data["n"] == 1:
+                raise RuntimeError("boom")
+            received.append(data["n"])
+
+        await sender.start(deliver)
+        await receiver.start(deliver)
+        for n in range(3):
+            await sender.send("risk_alert", {"n": n})
+        await _wait_for(lambda: len(received) == 2)
+
+        assert received == [0, 2]
+        assert receiver.metrics["receive_errors"] == 1
+        await sender.close()
+        await receiver.close()
+
+    asyncio.run(scenario())
+
+def test_unix_send_drops_instead_of_waiting_for_a_stuck_peer(tmp_path):
+    async def scenario():
+        directory = str(tmp_path / "events")
+        sender = UnixSocketTransport(directory, peer_refresh_seconds=0)
+        stuck = UnixSocketTransport(directory, peer_refresh_seconds=0)
+        await sender.start(lambda event_type, data: None)
+        await stuck.start(lambda event_type, data: None)
+        stuck._reader.cancel() # Never reads, so its receive buffer fills up
+
+        started = asyncio.get_running_loop().time()
+        for n in range(2000):
+            await sender.send("risk_alert", {"n": n, "padding": "x" * 1000})
+        assert asyncio.get_running_loop().time() - started < 1.0
+        assert sender.metrics["dropped"] > 0
+        assert sender.metrics["sent"] == 2000
+        await sender.close()
+        await stuck.close()
+
+    asyncio.run(scenario())
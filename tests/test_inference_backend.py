@@ -0,0 +1,41 @@
+import torch
+from transformers import BertConfig, BertForSequenceClassification
+
+from app.core.inference_backend import compare_predictions, quantize_model, resolve_backend, serialized_size
+from app.core.inference_cache import model_revision
+
+def _tiny_bert():
+    torch.manual_seed(0)
+    config = BertConfig(vocab_size=100, hidden_size=64, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=128, num_labels=3)
+    return BertForSequenceClassification(config).eval()
+
+def test_quantized_model_is_smaller_and_close_to_fp32():
+    model = _tiny_bert()
+    input_ids = torch.randint(0, 100, (4, 16))
+    with torch.inference_mode():
+        reference = model(input_ids=input_ids).logits.softmax(-1)
+
+    quantized = quantize_model(_tiny_bert())
+    with torch.inference_mode():
+        candidate = quantized(input_ids=input_ids).logits.softmax(-1)
+
+    assert torch.allclose(reference, candidate, atol=0.05)
+    assert serialized_size(quantized) < serialized_size(model)
+
+def test_compare_predictions_reports_agreement_and_score_drift():
+    reference = [{"label": "POSITIVE", "score": 0.99}, {"label": "NEGATIVE", "score": 0.80}]
+    candidate = [{"label": "POSITIVE", "score": 0.97}, {"label": "POSITIVE", "score": 0.55}]
+    report = compare_predictions(reference, candidate)
+    assert report["agreement"] == 0.5
+    assert report["max_score_delta"] == 0.02
+
+    entities = [[{"entity_group": "ORG", "start": 0, "end": 5, "score": 0.9}]]
+    assert compare_predictions(entities, entities)["agreement"] == 1.0
+
+def test_backend_variants_get_their_own_cache_revision():
+    model = _tiny_bert()
+    assert model_revision(model) == "unknown"
+    model.inference_backend = "quantized"
+    assert model_revision(model) == "unknown+quantized"
+    assert resolve_backend("bogus") == "pytorch"
@@ -0,0 +1,43 @@
+from app.core.inference_cache import InferenceCache
+
+def test_cache_hits_memory_then_disk_across_instances(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite")
+    cache = InferenceCache(db_path=db_path, max_memory_items=10)
+
+    assert cache.get("finbert", "Apple beats  estimates") is None
+    cache.set("finbert", "Apple beats estimates", [0.9, 0.05, 0.05])
+    # Whitespace differences normalize to the same key
+    assert cache.get("finbert", " Apple beats\nestimates ") == [0.9, 0.05, 0.05]
+    # Same text under another model or revision is a different entry
+    assert cache.get("distilbert", "Apple beats estimates") is None
+    assert cache.get("finbert", "Apple beats estimates", revision="abc123") is None
+
+    restarted = InferenceCache(db_path=db_path, max_memory_items=10)
+    assert restarted.get("finbert", "Apple beats estimates") == [0.9, 0.05, 0.05]
+    stats = restarted.get_stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 0
+
+def test_get_or_compute_only_computes_misses():
+    cache = InferenceCache(max_memory_items=2)
+    calls = []
+
+    def compute(texts):
+        calls.append(list(texts))
+        return [len(t) for t in texts]
+
+    assert cache.get_or_compute("m", ["a", "bb"], compute) == [1, 2]
+    assert cache.get_or_compute("m", ["a", "bb", "ccc"], compute) == [1, 2, 3]
+    assert calls == [["a", "bb"], ["ccc"]]
+    # LRU tier is bounded
+    assert cache.get_stats()["memory_items"] == 2
+
+def test_get_or_compute_computes_repeated_misses_once():
+    cache = InferenceCache(max_memory_items=10)
+    calls = []
+
+    def compute(texts):
+        calls.append(list(texts))
+        return [len(t) for t in texts]
+
+    assert cache.get_or_compute("m", ["a", "bb", "a", " bb\n", "a"], compute) == [1, 2, 1, 2, 1]
+    assert calls == [["a", "bb"]]
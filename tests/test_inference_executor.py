@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.inference_executor import InferenceExecutor, InferenceOverloadedError, InferenceTimeoutError
+
+def test_blocking_jobs_do_not_block_the_event_loop():
+    executor = InferenceExecutor(max_workers=1, max_queue=4, default_timeout=5)
+    ticks = []
+
+    async def heartbeat():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        return await asyncio.gather(executor.run(time.sleep, 0.1), heartbeat())
+
+    asyncio.run(main())
+    assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.1 # Heartbeat kept running during the job
+    stats = executor.get_stats()
+    assert stats["completed"] == 1 and stats["queue_depth"] == 0 and stats["running"] == 0
+    executor.shutdown()
+
+def test_sheds_load_when_queue_is_full():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, default_timeout=5)
+    release = threading.Event()
+
+    async def main():
+        first = asyncio.ensure_future(executor.run(release.wait))
+        second = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        assert executor.get_stats()["queue_depth"] == 1
+        with pytest.raises(InferenceOverloadedError):
+            await executor.run(release.wait)
+        release.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(main()) == [True, True]
+    stats = executor.get_stats()
+    assert stats["rejected"] == 1 and stats["completed"] == 2
+    executor.shutdown()
+
+def test_timeout_drops_queued_job_and_frees_its_slot():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, default_timeout=5)
+    release = threading.Event()
+    ran = []
+
+    async def main():
+        blocker = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.02)
+        with pytest.raises(InferenceTimeoutError):
+            await executor.run(ran.append, "queued", timeout=0.05)
+        assert executor.get_stats()["queue_depth"] == 0
+        release.set()
+        await blocker
+
+    asyncio.run(main())
+    assert ran == [] # The timed-out job never started
+    assert executor.get_stats()["timeouts"] == 1
+    executor.shutdown()
+
+def test_job_exceptions_propagate_and_are_counted():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+
+    def fail():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run(fail))
+    assert executor.get_stats()["failed"] == 1
+    executor.shutdown()
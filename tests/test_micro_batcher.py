@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.micro_batcher import Histogram, MicroBatcher
+
+def test_concurrent_callers_share_batches_and_get_their_own_results():
+    batches = []
+
+    def upper(texts):
+        batches.append(list(texts))
+        return [text.upper() for text in texts]
+
+    batcher = MicroBatcher("test", upper, max_batch_size=4, max_wait_ms=50)
+    texts = [f"text {i}" * (i + 1) for i in range(10)]
+    results = {}
+
+    def call(text):
+        results[text] = batcher.predict(text, timeout=5)
+
+    threads = [threading.Thread(target=call, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {text: text.upper() for text in texts}
+    assert len(batches) < len(texts) # Coalesced
+    assert max(len(batch) for batch in batches) <= 4
+    for batch in batches:
+        assert batch == sorted(batch, key=len) # Sorted by length to limit padding
+    stats = batcher.get_stats()
+    assert stats["batch_size"]["count"] == len(batches)
+    assert stats["queue_wait_ms"]["count"] == len(texts)
+
+def test_predict_many_and_async_callers_share_one_batch():
+    batches = []
+
+    def double(values):
+        batches.append(len(values))
+        return [v * 2 for v in values]
+
+    batcher = MicroBatcher("test", double, max_batch_size=32, max_wait_ms=50)
+
+    async def main():
+        many = asyncio.to_thread(batcher.predict_many, [1, 2, 3])
+        return await asyncio.gather(many, batcher.predict_async(10), batcher.predict_async(20))
+
+    assert asyncio.run(main()) == [[2, 4, 6], 20, 40]
+    assert batches == [5]
+
+def test_batch_errors_reach_only_the_failing_caller():
+    def parse(values):
+        return [int(value) for value in values]
+
+    batcher = MicroBatcher("test", parse, max_wait_ms=50)
+    results = batcher.predict_many(["1", "oops", "3"], timeout=5, return_exceptions=True)
+    assert results[0] == 1 and results[2] == 3
+    assert isinstance(results[1], ValueError) # Batch failed, items were retried one by one
+    with pytest.raises(ValueError):
+        batcher.predict("bad", timeout=5)
+    assert batcher.predict_many([], timeout=5) == []
+
+def test_histogram_percentiles_use_bucket_bounds():
+    histogram = Histogram([1, 5, 10])
+    for value in [0.5] * 90 + [7] * 9 + [50]:
+        histogram.observe(value)
+    stats = histogram.get_stats()
+    assert (stats["p50"], stats["p95"], stats["p99"]) == (1, 10, 10)
+    assert stats["buckets"] == {"le_1": 90, "le_5": 0, "le_10": 9, "le_inf": 1}
@@ -0,0 +1,38 @@
+import threading
+import torch
+from app.core.model_registry import ModelRegistry
+
+def test_model_loads_once_on_first_use_and_reports_stats():
+    registry = ModelRegistry()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return torch.nn.Linear(4, 2)
+
+    registry.register("tiny", loader)
+    registry.register("tiny", lambda: None) # Re-registering keeps the first loader
+    assert not registry.is_loaded("tiny")
+
+    threads = [threading.Thread(target=registry.get, args=("tiny",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert registry.get("tiny") is registry.get("tiny")
+    stats = registry.get_stats()[0]
+    assert stats["loaded"] and stats["weights_bytes"] == (4 * 2 + 2) * 4
+
+def test_failed_load_is_reported_and_warm_up_skips_it():
+    registry = ModelRegistry()
+
+    def broken():
+        raise OSError("weights missing")
+
+    registry.register("broken", broken)
+    registry.register("ok", lambda: "model")
+    assert registry.warm_up() == ["ok"]
+    assert registry.get("broken") is None
+    assert registry.get_stats()[0]["error"] == "weights missing"
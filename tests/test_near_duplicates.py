@@ -0,0 +1,37 @@
+from app.core.near_duplicates import NearDuplicateDetector, collapse_near_duplicates
+
+def test_syndicated_copies_collapse_into_one_article():
+    story = "Apple shares rise after the company reported record quarterly revenue driven by strong iPhone demand in China"
+    articles = [
+        {'title': "Apple posts record revenue", 'description': story, 'url': 'https://newsapi/a', 'source': {'name': 'NewsAPI'}},
+        {'title': "Oil slides as OPEC weighs output hike", 'description': "Crude prices fell on Monday amid supply worries", 'url': 'https://rss/oil', 'source': {'name': 'Reuters Business News'}},
+        {'title': "Apple posts record revenue", 'description': story + " (Reuters)", 'link': 'https://rss/a', 'source': {'name': 'Reuters Business News'}},
+        {'title': "Apple posts record revenue", 'description': story, 'url': 'https://custom/a', 'source': {'name': 'MyNews'}},
+    ]
+
+    collapsed = collapse_near_duplicates(articles, NearDuplicateDetector(threshold=0.7))
+
+    assert [a.get('url', a.get('link')) for a in collapsed] == ['https://newsapi/a', 'https://rss/oil']
+    assert collapsed[0]['sources'] == ['NewsAPI', 'Reuters Business News', 'MyNews']
+    assert collapsed[0]['duplicate_links'] == ['https://rss/a', 'https://custom/a']
+    assert 'sources' not in collapsed[1]
+
+def test_threshold_controls_merging():
+    texts = ["fed holds rates steady as inflation cools", "fed holds rates steady as inflation cools again this month"]
+    assert NearDuplicateDetector(threshold=0.3).find_clusters(texts) == [[0, 1]]
+    assert NearDuplicateDetector(threshold=0.95).find_clusters(texts) == [[0], [1]]
+
+def test_collapsing_a_later_batch_adds_to_earlier_sources_and_links():
+    story = "Apple shares rise after the company reported record quarterly revenue driven by strong iPhone demand in China"
+    detector = NearDuplicateDetector(threshold=0.7)
+    first = collapse_near_duplicates([
+        {'title': "Apple posts record revenue", 'description': story, 'url': 'https://newsapi/a', 'source': {'name': 'NewsAPI'}},
+        {'title': "Apple posts record revenue", 'description': story, 'link': 'https://rss/a', 'source': {'name': 'Reuters Business News'}},
+    ], detector)
+    later = {'title': "Apple posts record revenue", 'description': story, 'url': 'https://custom/a', 'source': {'name': 'MyNews'}}
+
+    collapsed = collapse_near_duplicates(first + [later], detector)
+
+    assert len(collapsed) == 1
+    assert collapsed[0]['sources'] == ['NewsAPI', 'Reuters Business News', 'MyNews']
+    assert collapsed[0]['duplicate_links'] == ['https://rss/a', 'https://custom/a']
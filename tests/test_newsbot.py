@@ -0,0 +1,204 @@
+import asyncio
+import importlib
+import sys
+import types
+
+import pytest
+
+story = "Apple shares rise after the company reported record quarterly revenue driven by strong iPhone demand in China"
+
+def _stub_if_missing(monkeypatch, name: str, **attributes):
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        module = types.ModuleType(name)
+        module.__dict__.update(attributes)
+        monkeypatch.setitem(sys.modules, name, module)
+
+class _AgentBase:
+    def __init__(self, config, kernel=None):
+        self.config = config
+        self.kernel = kernel
+
+    async def receive_message(self, sender_agent, message):
+        return None
+
+@pytest.fixture
+def newsbot_module(monkeypatch):
+    # Resolved before sklearn may be stubbed below: transformers checks for sklearn while importing
+    importlib.import_module("transformers").AutoTokenizer
+    # NewsBot's agent framework and NLP extras aren't needed by the code under test
+    _stub_if_missing(monkeypatch, "nltk")
+    _stub_if_missing(monkeypatch, "nltk.sentiment", SentimentIntensityAnalyzer=object)
+    _stub_if_missing(monkeypatch, "semantic_kernel", Kernel=object)
+    _stub_if_missing(monkeypatch, "core")
+    _stub_if_missing(monkeypatch, "core.agents")
+    _stub_if_missing(monkeypatch, "core.agents.agent_base", AgentBase=_AgentBase)
+    _stub_if_missing(monkeypatch, "pycoingecko", CoinGeckoAPI=object)
+    _stub_if_missing(monkeypatch, "sklearn")
+    _stub_if_missing(monkeypatch, "sklearn.cluster", KMeans=object)
+    _stub_if_missing(monkeypatch, "sklearn.metrics", pairwise_distances_argmin_min=None)
+    return importlib.import_module("app.core.newsbot")
+
+def _make_bot(newsbot_module, **config):
+    bot = newsbot_module.NewsBot({
+        'portfolio': {'stocks': ['AAPL', 'MSFT']},
+        'alert_dedupe_path': None,
+        'enable_analysis_reporting': False,
+        **config
+    })
+    # Sentiment comes from the article itself instead of FinBERT
+    bot.score_sentiments = lambda articles: [a.get('tone', 0.0) for a in articles]
+    return bot
+
+def _use_sources(bot, sources):
+    """sources: name -> (delay in seconds, function returning that source's articles, or an exception)."""
+    async def fetch(delay, result):
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result()
+    bot._build_source_jobs = lambda: {name: fetch(delay, result) for name, (delay, result) in sources.items()}
+
+def _article(url, title, tone=0.0, source='NewsAPI', description=None):
+    return {'title': title, 'description': description or title, 'url': url, 'tone': tone, 'source': {'name': source}}
+
+async def _run_stream(bot):
+    events = [event async for event in bot.execute_stream()]
+    return events[:-1], events[-1]
+
+def test_stream_keeps_the_top_k_articles_by_impact(newsbot_module):
+    bot = _make_bot(newsbot_module, incremental_feed_limit=3, collapse_near_duplicates=False)
+    _use_sources(bot, {
+        'fast': (0.0, lambda: [_article(f"https://fast/{i}", f"AAPL update {i}", tone) for i, tone in enumerate([0.1, 0.9, -0.5])]),
+        'slow': (0.02, lambda: [_article(f"https://slow/{i}", f"MSFT note {i}", tone) for i, tone in enumerate([0.7, 0.2])]),
+    })
+
+    events, report = asyncio.run(_run_stream(bot))
+
+    assert [e['type'] for e in events].count('article') == 5
+    assert [a['url'] for a in report['personalized_feed']] == ["https://fast/1", "https://slow/0", "https://slow/1"]
+    assert len(report['new_articles']) == 5
+    assert bot.aggregated_news == report['personalized_feed']
+
+def test_stream_folds_later_copies_into_the_earlier_article(newsbot_module):
+    bot = _make_bot(newsbot_module, incremental_monitoring=True)
+    _use_sources(bot, {
+        'NewsAPI': (0.0, lambda: [_article("https://newsapi/a", "AAPL posts record revenue", description=story)]),
+        'Reuters': (0.02, lambda: [_article("https://rss/a", "AAPL posts record revenue", description=story, source='Reuters')]),
+        'Custom': (0.04, lambda: [_article("https://custom/a", "AAPL posts record revenue", description=story, source='MyNews'),
+                                  _article("https://custom/b", "MSFT cuts jobs")]),
+    })
+
+    _, report = asyncio.run(_run_stream(bot))
+
+    assert [a['url'] for a in report['new_articles']] == ["https://newsapi/a", "https://custom/b"]
+    canonical = report['new_articles'][0]
+    assert canonical['sources'] == ['NewsAPI', 'Reuters', 'MyNews']
+    assert canonical['duplicate_links'] == ["https://rss/a", "https://custom/a"]
+
+    # Next cycle only a copy comes back: it was seen through the article it was folded into
+    _use_sources(bot, {'Reuters': (0.0, lambda: [_article("https://rss/a", "AAPL posts record revenue", description=story)])})
+    _, report = asyncio.run(_run_stream(bot))
+    assert report['new_articles'] == []
+
+def test_incremental_cycles_only_score_new_articles(newsbot_module):
+    bot = _make_bot(newsbot_module, incremental_monitoring=True, collapse_near_duplicates=False)
+    feed = [_article("https://a", "AAPL beats", 0.9), _article("https://b", "MSFT misses", -0.9)]
+    bot.aggregate_news = lambda: [dict(a) for a in feed]
+
+    first = asyncio.run(bot.execute())
+    feed.append(_article("https://c", "AAPL guides higher", 0.3))
+    second = asyncio.run(bot.execute())
+
+    assert [a['url'] for a in first['new_articles']] == ["https://a", "https://b"]
+    assert [a['url'] for a in second['new_articles']] == ["https://c"]
+    assert [a['url'] for a in second['personalized_feed']] == ["https://a", "https://c", "https://b"]
+
+def test_articles_are_marked_seen_only_once_scored(newsbot_module):
+    bot = _make_bot(newsbot_module, incremental_monitoring=True)
+    bot.aggregate_news = lambda: [_article("https://a", "AAPL beats", 0.9)]
+    score = bot.score_sentiments
+
+    def failing_scorer(articles):
+        raise RuntimeError("model crashed")
+
+    bot.score_sentiments = failing_scorer
+    with pytest.raises(RuntimeError):
+        asyncio.run(bot.execute())
+    bot.score_sentiments = score
+
+    assert [a['url'] for a in asyncio.run(bot.execute())['new_articles']] == ["https://a"]
+
+def test_topic_query_leaves_incremental_state_alone(newsbot_module, monkeypatch):
+    bot = _make_bot(newsbot_module, incremental_monitoring=True, news_api_key="key",
+                    user_preferences={'topics': ['stocks']})
+    bot.source_watermarks["newsapi:forex"] = {'published_at': "2024-06-01T00:00:00Z"}
+    bot.get_reuters_business_news_rss = lambda: []
+    requested = []
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'articles': [{'title': "AAPL hedges its euro exposure", 'url': "https://fx/1",
+                                  'publishedAt': "2024-06-02T00:00:00Z"}]}
+
+    def fake_get(url, params=None, timeout=None, **kwargs):
+        requested.append(params)
+        return Response()
+
+    monkeypatch.setattr(newsbot_module.requests, "get", fake_get)
+    reply = asyncio.run(bot.receive_message("analyst", {"action": "get_news_for_topic", "topic": "forex"}))
+
+    assert [a['url'] for a in reply['articles']] == ["https://fx/1"]
+    assert 'from' not in requested[0] # A full query, not only what is new since the last cycle
+    assert bot.source_watermarks == {"newsapi:forex": {'published_at': "2024-06-01T00:00:00Z"}}
+    assert not bot._seen_article_keys
+    assert bot.incremental and bot.user_preferences['topics'] == ['stocks']
+
+def test_concurrent_aggregation_skips_failed_and_timed_out_sources(newsbot_module):
+    bot = _make_bot(newsbot_module, source_timeout_seconds=0.05, cycle_deadline_seconds=2.0)
+    _use_sources(bot, {
+        'late': (0.03, lambda: [_article("https://late/1", "MSFT raises dividend")]),
+        'early': (0.0, lambda: [_article("https://early/1", "AAPL beats"), _article("https://early/2", "Oil slides")]),
+        'broken': (0.0, ConnectionError("connection reset")),
+        'stuck': (1.0, lambda: [_article("https://stuck/1", "AAPL stuck")]),
+    })
+
+    articles = asyncio.run(bot.aggregate_news_async())
+
+    # In source order whatever finished first; off-portfolio articles are filtered out
+    assert [a['url'] for a in articles] == ["https://late/1", "https://early/1"]
+
+def test_concurrent_aggregation_stops_at_the_cycle_deadline(newsbot_module):
+    bot = _make_bot(newsbot_module, source_timeout_seconds=5.0, cycle_deadline_seconds=0.1)
+    cancelled = []
+
+    async def slow_source():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    _use_sources(bot, {'fast': (0.0, lambda: [_article("https://fast/1", "AAPL beats")])})
+    jobs = bot._build_source_jobs
+    bot._build_source_jobs = lambda: {**jobs(), 'slow': slow_source()}
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        articles = await bot.aggregate_news_async()
+        return articles, asyncio.get_running_loop().time() - started
+
+    articles, elapsed = asyncio.run(scenario())
+
+    assert [a['url'] for a in articles] == ["https://fast/1"]
+    assert elapsed < 1.0
+    assert cancelled == [True]
+
+def test_concurrent_aggregation_without_sources(newsbot_module):
+    bot = _make_bot(newsbot_module)
+    bot._build_source_jobs = lambda: {}
+    assert asyncio.run(bot.aggregate_news_async()) == []
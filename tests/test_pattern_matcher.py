@@ -0,0 +1,83 @@
+import re
+
+from app.core.pattern_matcher import PatternMatcher, get_matcher, trie_regex
+
+def test_scan_finds_overlapping_and_same_position_keywords():
+    matcher = PatternMatcher(
+        {"Market": ["stock market", "market cap"], "Price": ["stock", "stock price"]},
+        literal=True, word_boundaries=True
+    )
+
+    hits = matcher.scan("stock market cap rises")
+
+    assert [(hit.label, hit.pattern, hit.start, hit.end) for hit in hits] == [
+        ("Market", "stock market", 0, 12),
+        ("Price", "stock", 0, 5),
+        ("Market", "market cap", 6, 16),
+    ]
+
+def test_word_boundaries_and_substrings():
+    groups = {"Legal": ["sec"], "Exec": ["ceo"]}
+
+    assert PatternMatcher(groups, literal=True, word_boundaries=True).labels("second quarter") == []
+    assert PatternMatcher(groups, literal=True).labels("second quarter") == ["Legal"]
+
+def test_labels_follow_group_order_and_counts_are_distinct_patterns():
+    matcher = PatternMatcher({"A": ["alpha", "beta"], "B": ["gamma"], "C": ["delta"]}, literal=True)
+    text = "gamma beta alpha beta"
+
+    assert matcher.labels(text) == ["A", "B"]
+    assert matcher.label_counts(text) == {"A": 2, "B": 1}
+
+def test_regex_patterns_match_re_search():
+    groups = {
+        "Earnings": [r"(reports|posts) (quarterly|q\d) (earnings|results)", r"eps (of|beats)"],
+        "M&A": [r"[A-Za-z0-9_.-]+ to be acquired by", r"buyout of"],
+        "Noise": [r"rumor"],
+    }
+    matcher = PatternMatcher(groups, flags=re.IGNORECASE)
+    texts = [
+        "Acme Reports Q3 Results; EPS of $1.10",
+        "Widgets Inc to be acquired by Acme in buyout of rival",
+        "Nothing to see here",
+    ]
+
+    for text in texts:
+        expected = [label for label, patterns in groups.items()
+                    if any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)]
+        assert matcher.labels(text) == expected
+
+def test_first_label_follows_group_order_not_text_order():
+    matcher = PatternMatcher({"Noise": ["rumor", r"top \d+"], "High Signal": ["earnings", r"steps? down"]})
+
+    assert matcher.first_label("earnings beat, top 10 picks") == "Noise"
+    assert matcher.first_label("ceo steps down") == "High Signal"
+    assert matcher.first_label("quiet day") is None
+    assert matcher.first_label("") is None
+
+def test_labels_with_backreferences_are_searched_pattern_by_pattern():
+    groups = {"Repeat": [r"\b(\w+) \1\b", "again"], "Other": [r"(a)(b)"]}
+    matcher = PatternMatcher(groups)
+
+    assert matcher.labels("the the end") == ["Repeat"]
+    assert matcher.labels("ab then again") == ["Repeat", "Other"]
+    assert matcher.labels("ab only") == ["Other"]
+
+def test_trie_regex_matches_exactly_the_words():
+    words = ["aapl", "amzn", "amd", "am"]
+    pattern = re.compile(f"(?:{trie_regex(words)})$")
+
+    assert all(pattern.match(word) for word in words)
+    assert not any(pattern.match(word) for word in ["a", "amz", "aap", "amdx"])
+
+def test_get_matcher_reuses_and_rebuilds_on_config_change():
+    config = {"Noise": ["rumor"], "High Signal": ["earnings"]}
+
+    first = get_matcher(config)
+    assert get_matcher(config) is first
+    assert get_matcher(dict(config)) is first
+
+    config["Noise"] = ["rumor", "opinion"]
+    rebuilt = get_matcher(config)
+    assert rebuilt is not first
+    assert rebuilt.labels("opinion: earnings look fine") == ["Noise", "High Signal"]
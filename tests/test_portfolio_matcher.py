@@ -0,0 +1,18 @@
+from app.core.portfolio_matcher import PortfolioMatcher
+
+def test_match_counts_symbols_and_aliases_on_word_boundaries():
+    matcher = PortfolioMatcher({"AAPL": ["Apple"], "AMD": [], "BRK.B": ["Berkshire Hathaway"]})
+
+    text = "Apple and AAPL suppliers rally; AMD's outlook lifts AMDOCS? No. berkshire hathaway buys BRK.B"
+    assert matcher.match(text) == {"AAPL": 2, "AMD": 1, "BRK.B": 2}
+
+def test_match_article_and_empty_portfolio():
+    matcher = PortfolioMatcher(["BTC", "ETH"])
+    article = {"title": "BTC rallies", "description": "ETH and BTC both up"}
+    assert matcher.match_article(article) == {"BTC": 2, "ETH": 1}
+    assert matcher.match_article({"title": "Oil slips"}) == {}
+    assert PortfolioMatcher([]).match("BTC") == {}
+
+def test_overlapping_prefixes_prefer_longest_whole_word():
+    matcher = PortfolioMatcher(["AA", "AAL", "AAPL"])
+    assert matcher.match("AAL and AAPL, not AAX; AA too") == {"AAL": 1, "AAPL": 1, "AA": 1}
@@ -0,0 +1,110 @@
+import asyncio
+import types
+
+import pytest
+
+from app.core.provider_guard import (
+    CircuitBreaker,
+    ProviderGuard,
+    ProviderRateLimitedError,
+    ProviderUnavailableError,
+    TokenBucket,
+)
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = types.SimpleNamespace(status_code=status_code, headers=headers or {})
+
+def _guard(**overrides):
+    options = dict(rate_per_minute=6000, burst=100, failure_threshold=3, cooldown_seconds=60,
+                   max_retries=2, backoff_base_seconds=0.001, backoff_max_seconds=0.002)
+    options.update(overrides)
+    return ProviderGuard("test", **options)
+
+def test_token_bucket_delays_calls_beyond_burst():
+    bucket = TokenBucket(rate_per_second=10, burst=2)
+    assert bucket.reserve() == 0 and bucket.reserve() == 0
+    assert 0.05 < bucket.reserve() <= 0.1
+
+def test_server_errors_are_retried_then_open_the_circuit():
+    guard = _guard()
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        raise FakeHTTPError(503)
+
+    with pytest.raises(FakeHTTPError):
+        guard.call(flaky)
+    assert len(calls) == 3 # One call plus two retries
+    assert guard.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(ProviderUnavailableError):
+        guard.call(flaky)
+    assert len(calls) == 3 # Rejected without calling the provider
+    assert guard.get_stats()["rejected_open"] == 1
+
+def test_client_errors_are_not_retried_and_keep_the_circuit_closed():
+    guard = _guard()
+    calls = []
+
+    def not_found():
+        calls.append(1)
+        raise FakeHTTPError(404)
+
+    for _ in range(5):
+        with pytest.raises(FakeHTTPError):
+            guard.call(not_found)
+    assert len(calls) == 5
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+def test_quota_message_pauses_provider_and_half_open_probe_recovers():
+    guard = _guard(cooldown_seconds=0.05)
+
+    def quota_spent():
+        raise ProviderRateLimitedError("test", "Thank you for using Alpha Vantage!")
+
+    with pytest.raises(ProviderRateLimitedError):
+        guard.call(quota_spent)
+    assert guard.breaker.state == CircuitBreaker.OPEN
+    assert guard.get_stats()["rate_limited"] == 1
+
+    async def ok():
+        return "data"
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert asyncio.run(guard.call_async(ok)) == "data"
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+def test_cancelled_half_open_probe_lets_the_next_call_through():
+    guard = _guard(failure_threshold=1, cooldown_seconds=0.05, max_retries=0)
+
+    def down():
+        raise FakeHTTPError(503)
+
+    with pytest.raises(FakeHTTPError):
+        guard.call(down)
+    assert guard.breaker.state == CircuitBreaker.OPEN
+
+    async def scenario():
+        await asyncio.sleep(0.06)
+        # The probe is admitted, then cancelled by the caller's deadline before it finishes
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(guard.call_async(asyncio.sleep, 10), timeout=0.01)
+        assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+
+        async def ok():
+            return "data"
+
+        assert await guard.call_async(ok) == "data"
+
+    asyncio.run(scenario())
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+def test_calls_that_would_wait_too_long_are_rejected():
+    guard = _guard(rate_per_minute=1, burst=1, max_wait_seconds=1)
+    assert guard.call(lambda: "first") == "first"
+    with pytest.raises(ProviderUnavailableError):
+        guard.call(lambda: "second")
+    assert guard.get_stats()["rejected_throttled"] == 1
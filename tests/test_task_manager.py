@@ -0,0 +1,79 @@
+import asyncio
+
+from app.core.async_utils import AsyncTaskManager
+
+def test_pool_limit_queues_tasks_and_starts_them_by_priority():
+    async def scenario():
+        manager = AsyncTaskManager(pools={"limited": 1})
+        order = []
+        gate = asyncio.Event()
+
+        async def job(label):
+            order.append(label)
+            await gate.wait()
+
+        await manager.start_task("first", job("first"), pool="limited")
+        await manager.start_task("low", job("low"), pool="limited", priority=5)
+        await manager.start_task("high", job("high"), pool="limited", priority=1)
+        await asyncio.sleep(0)
+        assert manager.active_count() == 1 and manager.queued_count() == 2
+        assert manager.get_pool_stats()[0] == {"name": "limited", "max_concurrency": 1, "running": 1, "queued": 2}
+
+        gate.set()
+        for _ in range(20):
+            await asyncio.sleep(0)
+        assert order == ["first", "high", "low"]
+        assert manager.active_count() == 0
+        assert [t["status"] for t in manager.get_all_tasks()] == ["completed"] * 3
+
+    asyncio.run(scenario())
+
+def test_cancel_by_id_and_name():
+    async def scenario():
+        manager = AsyncTaskManager(pools={"limited": 1})
+        running = await manager.start_task("agent_a", asyncio.sleep(60), pool="limited")
+        queued = await manager.start_task("agent_b", asyncio.sleep(60), pool="limited")
+        other = await manager.start_task("agent_b", asyncio.sleep(60))
+
+        assert manager.cancel(queued) # Queued: never starts
+        assert manager.get_task(queued)["status"] == "cancelled"
+        assert manager.cancel_by_name("agent_b") == 1
+        assert manager.cancel(running)
+        await asyncio.sleep(0.01)
+
+        assert manager.active_count() == manager.queued_count() == 0
+        assert manager.get_task(running)["status"] == "cancelled"
+        assert manager.get_task(other)["status"] == "cancelled"
+        assert not manager.cancel(running)
+
+    asyncio.run(scenario())
+
+def test_history_is_bounded_and_failures_are_recorded():
+    async def scenario():
+        manager = AsyncTaskManager(history_size=5)
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        for i in range(20):
+            await manager.start_task(f"job_{i}", asyncio.sleep(0))
+        await asyncio.sleep(0.01)
+        failed = await manager.start_task("broken", fail())
+        await asyncio.sleep(0.01)
+
+        assert len(manager.get_all_tasks()) == 5
+        record = manager.get_task(failed)
+        assert record["status"] == "failed" and record["error"] == "boom"
+
+    asyncio.run(scenario())
+
+def test_long_running_task_is_refused_instead_of_queued_forever():
+    async def scenario():
+        manager = AsyncTaskManager(pools={"limited": 1})
+        assert await manager.start_task("agent_a", asyncio.sleep(60), pool="limited", long_running=True)
+        assert await manager.start_task("agent_b", asyncio.sleep(60), pool="limited", long_running=True) == ""
+        assert manager.queued_count() == 0
+        assert manager.cancel_by_name("agent_a") == 1
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
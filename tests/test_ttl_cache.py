@@ -0,0 +1,103 @@
+import asyncio
+import datetime
+import gc
+import weakref
+
+import pytest
+
+from app.core.ttl_cache import TTLCache, seconds_until_market_close, ttl_cached
+
+class PriceService:
+    def __init__(self):
+        self.calls = 0
+
+    @ttl_cached(ttl=0.05, stale_ttl=0.5, name="test_async_prices")
+    async def get_price(self, ticker: str, days: int = 30):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return f"{ticker}:{days}:{self.calls}"
+
+    @ttl_cached(ttl=60, name="test_sync_profile")
+    def get_profile(self, ticker: str):
+        self.calls += 1
+        return None if ticker == "MISSING" else {"ticker": ticker}
+
+def test_async_cache_coalesces_misses_and_serves_stale_while_revalidating():
+    service = PriceService()
+
+    async def main():
+        first = await asyncio.gather(*(service.get_price("AAPL") for _ in range(5)))
+        assert first == ["AAPL:30:1"] * 5 and service.calls == 1
+        assert await service.get_price("AAPL", days=30) == "AAPL:30:1" # Defaults are part of the key
+
+        await asyncio.sleep(0.06) # Expired but still within the stale window
+        assert await service.get_price("AAPL") == "AAPL:30:1"
+        await asyncio.sleep(0.02) # Background refresh finishes
+        assert await service.get_price("AAPL") == "AAPL:30:2"
+
+    asyncio.run(main())
+    stats = PriceService.get_price.cache.get_stats()
+    assert stats["stale_hits"] == 1 and stats["refreshes"] == 1
+
+def test_sync_cache_is_per_instance_and_skips_none():
+    first, second = PriceService(), PriceService()
+    assert first.get_profile("MSFT") == {"ticker": "MSFT"}
+    assert first.get_profile("MSFT") == {"ticker": "MSFT"}
+    assert first.calls == 1
+    assert second.get_profile("MSFT") == {"ticker": "MSFT"}
+    assert second.calls == 1 # Another instance doesn't see the first one's results
+
+    first.get_profile("MISSING")
+    first.get_profile("MISSING")
+    assert first.calls == 3 # None results are retried, not cached
+
+def test_cache_does_not_keep_instances_alive():
+    service = PriceService()
+    service.get_profile("AAPL")
+    instance = weakref.ref(service)
+    del service
+    gc.collect()
+    assert instance() is None
+
+def test_concurrent_misses_share_one_load_even_when_it_fails_or_a_caller_leaves():
+    cache = TTLCache("test_shared_loads")
+    attempts = []
+
+    async def failing():
+        attempts.append("failing")
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def slow():
+        attempts.append("slow")
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def main():
+        results = await asyncio.gather(*(cache.get_or_load("down", failing, ttl=60) for _ in range(3)),
+                                       return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError): # Errors are not remembered
+            await cache.get_or_load("down", failing, ttl=60)
+
+        leaving = asyncio.ensure_future(cache.get_or_load("up", slow, ttl=60))
+        staying = asyncio.ensure_future(cache.get_or_load("up", slow, ttl=60))
+        await asyncio.sleep(0)
+        leaving.cancel() # Must not cancel the load the other caller is waiting on
+        assert await staying == "value"
+
+    asyncio.run(main())
+    assert attempts == ["failing", "failing", "slow"]
+
+def test_cache_is_bounded():
+    cache = TTLCache("bounded", max_items=2)
+    for key in "abc":
+        cache.set(key, key, ttl=60)
+    assert cache.get_stats()["size"] == 2 and cache.get_stats()["evictions"] == 1
+
+def test_prices_stay_fresh_until_next_market_close():
+    tz = datetime.timezone(datetime.timedelta(hours=-4))
+    friday_evening = datetime.datetime(2024, 6, 14, 18, 0, tzinfo=tz) # After Friday's close (EDT)
+    assert seconds_until_market_close(now=friday_evening) == (2 * 24 + 22) * 3600 + 15 * 60 # Monday 16:15
+    monday_morning = datetime.datetime(2024, 6, 17, 10, 0, tzinfo=tz)
+    assert seconds_until_market_close(now=monday_morning) == 6 * 3600 + 15 * 60